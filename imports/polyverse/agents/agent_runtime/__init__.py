@@ -0,0 +1,9 @@
+"""
+Shared runtime for PolyVerse agents: stream consumer, retries, batched
+result writing, health endpoint and Prometheus metrics.
+"""
+
+from .config import RuntimeConfig
+from .runtime import Agent, AgentRuntime, run_agent
+
+__all__ = ["Agent", "AgentRuntime", "RuntimeConfig", "run_agent"]
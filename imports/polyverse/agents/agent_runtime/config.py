@@ -0,0 +1,45 @@
+import os
+import socket
+from dataclasses import dataclass, field
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+@dataclass
+class RuntimeConfig:
+    """Settings shared by every agent runtime (overridable via environment)"""
+    redis_host: str = 'redis'
+    redis_port: int = 6379
+    consumer_name: str = field(default_factory=socket.gethostname)
+    concurrency: int = 8            # Tasks processed at the same time
+    batch_size: int = 16            # Messages fetched per XREADGROUP call
+    block_ms: int = 1000            # How long a read waits for new messages
+    max_retries: int = 3            # In-process attempts before dead-lettering
+    retry_backoff_s: float = 0.5    # Base delay between attempts (doubles each try)
+    claim_idle_ms: int = 30000      # Reclaim messages left pending by dead consumers
+    result_ttl: int = 3600          # Seconds a result stays in task_result:<id>
+    health_port: int = 8080
+    slow_task_ms: int = 1000        # Tasks slower than this are logged individually
+    queue_sample_s: float = 5.0     # How often queue depth/lag gauges are refreshed
+
+    @classmethod
+    def from_env(cls) -> 'RuntimeConfig':
+        """Build a config from AGENT_* / REDIS_* environment variables"""
+        return cls(
+            redis_host=os.getenv('REDIS_HOST', 'redis'),
+            redis_port=_env_int('REDIS_PORT', 6379),
+            consumer_name=os.getenv('AGENT_CONSUMER_NAME', socket.gethostname()),
+            concurrency=_env_int('AGENT_CONCURRENCY', 8),
+            batch_size=_env_int('AGENT_BATCH_SIZE', 16),
+            block_ms=_env_int('AGENT_BLOCK_MS', 1000),
+            max_retries=_env_int('AGENT_MAX_RETRIES', 3),
+            retry_backoff_s=float(os.getenv('AGENT_RETRY_BACKOFF_S', '0.5')),
+            claim_idle_ms=_env_int('AGENT_CLAIM_IDLE_MS', 30000),
+            result_ttl=_env_int('AGENT_RESULT_TTL', 3600),
+            health_port=_env_int('AGENT_HEALTH_PORT', 8080),
+            slow_task_ms=_env_int('AGENT_SLOW_TASK_MS', 1000),
+            queue_sample_s=float(os.getenv('AGENT_QUEUE_SAMPLE_S', '5')),
+        )
@@ -0,0 +1,52 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Any
+
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+
+class HealthServer:
+    """Minimal HTTP server exposing /healthz and /metrics for an agent"""
+
+    def __init__(self, port: int, check: Callable[[], Awaitable[Dict[str, Any]]]):
+        self.port = port
+        self.check = check
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, '0.0.0.0', self.port)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # Drain headers; we only route on the request path
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            path = parts[1] if len(parts) > 1 else '/'
+
+            if path == '/metrics':
+                status, content_type, body = 200, CONTENT_TYPE_LATEST, generate_latest()
+            elif path == '/healthz':
+                health = await self.check()
+                status = 200 if health['status'] == 'healthy' else 503
+                content_type, body = 'application/json', json.dumps(health).encode('utf-8')
+            else:
+                status, content_type, body = 404, 'text/plain', b'Not found'
+
+            reason = {200: 'OK', 404: 'Not Found', 503: 'Service Unavailable'}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,73 @@
+from prometheus_client import Counter, Histogram, Gauge
+
+# Agent runtime metrics (labelled by agent so every agent shares one definition).
+# Throughput is rate(polyverse_agent_tasks_total[1m]) on the Prometheus side.
+tasks_total = Counter(
+    'polyverse_agent_tasks_total',
+    'Total number of tasks handled by an agent',
+    ['agent', 'status']
+)
+
+task_retries_total = Counter(
+    'polyverse_agent_task_retries_total',
+    'Total number of task retry attempts',
+    ['agent']
+)
+
+task_errors_total = Counter(
+    'polyverse_agent_task_errors_total',
+    'Total number of task processing errors by exception type',
+    ['agent', 'error_type']
+)
+
+task_processing_duration = Histogram(
+    'polyverse_agent_task_processing_duration_seconds',
+    'Duration of a single process_task attempt in seconds',
+    ['agent'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+task_end_to_end_duration = Histogram(
+    'polyverse_agent_task_end_to_end_duration_seconds',
+    'Time from enqueue (stream entry ID) until the result is written',
+    ['agent'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+result_batch_size = Histogram(
+    'polyverse_agent_result_batch_size',
+    'Number of results flushed per Redis pipeline',
+    ['agent'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+# Gauges
+tasks_in_flight = Gauge(
+    'polyverse_agent_tasks_in_flight',
+    'Number of tasks currently being processed',
+    ['agent']
+)
+
+queue_lag = Gauge(
+    'polyverse_agent_queue_lag',
+    'Stream entries not yet delivered to the agent consumer group',
+    ['agent']
+)
+
+queue_pending = Gauge(
+    'polyverse_agent_queue_pending',
+    'Stream entries delivered but not yet acknowledged',
+    ['agent']
+)
+
+queue_oldest_age = Gauge(
+    'polyverse_agent_queue_oldest_age_seconds',
+    'Age of the oldest unacknowledged task (use for autoscaling on lag)',
+    ['agent']
+)
+
+dead_letter_depth = Gauge(
+    'polyverse_agent_dead_letter_depth',
+    'Number of entries in the agent dead-letter stream',
+    ['agent']
+)
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+import signal
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from . import metrics
+from .config import RuntimeConfig
+from .health import HealthServer
+from .logs import configure_logging
+
+logger = logging.getLogger('agent_runtime')
+
+# (message_id, task_id, result, error, raw stream fields)
+ResultItem = Tuple[str, str, Optional[Dict[str, Any]], Optional[str], Dict[str, str]]
+
+
+class Agent:
+    """Base class for agents driven by the shared runtime.
+
+    Subclasses set ``name`` (also used as the consumer group) and ``stream``
+    (the Redis stream the ai-router enqueues tasks on) and implement
+    ``process_task``.
+    """
+    name: str = 'agent'
+    stream: str = ''
+
+    async def setup(self, runtime: 'AgentRuntime') -> None:
+        """Called once the runtime's Redis connection is ready"""
+        self.redis = runtime.redis
+
+    async def teardown(self) -> None:
+        """Called after in-flight tasks have drained, before Redis is closed"""
+
+    async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class AgentRuntime:
+    """Consume an agent's task stream and write results back to Redis.
+
+    Tasks are read from a Redis stream with a consumer group, processed with
+    bounded concurrency and retried in-process. Results are written in
+    batches: one pipeline stores ``task_result:<id>``, publishes on
+    ``task_result_<id>`` and acknowledges the stream entry, so a task is only
+    acked once its result is durable. Entries left pending by a crashed
+    consumer are reclaimed after ``claim_idle_ms``; tasks that keep failing
+    get an error result and are copied to ``<stream>:dead``.
+    """
+
+    def __init__(self, agent: Agent, config: RuntimeConfig = None):
+        self.agent = agent
+        self.config = config or RuntimeConfig.from_env()
+        self.group = agent.name
+        self.dead_letter_stream = f"{agent.stream}:dead"
+        self.redis = aioredis.Redis(
+            host=self.config.redis_host,
+            port=self.config.redis_port,
+            decode_responses=True
+        )
+        self._running = False
+        self._inflight = set()
+        self._inflight_ids = set()
+
+    async def run(self):
+        """Run the consumer until SIGINT/SIGTERM, then drain in-flight tasks"""
+        self._slots = asyncio.Semaphore(self.config.concurrency)
+        self._results = asyncio.Queue()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        await self._ensure_group()
+        await self.agent.setup(self)
+
+        health = HealthServer(self.config.health_port, self.health)
+        await health.start()
+
+        logger.info("Starting agent", extra={'fields': {
+            'agent': self.agent.name, 'stream': self.agent.stream, 'consumer': self.config.consumer_name
+        }})
+        self._running = True
+        writer = asyncio.create_task(self._write_results())
+        sampler = asyncio.create_task(self._sample_queue())
+        try:
+            await self._consume()
+        finally:
+            self._running = False
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+            if self._inflight:
+                await asyncio.gather(*self._inflight, return_exceptions=True)
+            await self._results.put(None)
+            await writer
+            await self.agent.teardown()
+            await health.stop()
+            await self.redis.close()
+
+    def stop(self):
+        self._running = False
+
+    async def health(self) -> Dict[str, Any]:
+        try:
+            redis_ok = bool(await self.redis.ping())
+        except Exception:
+            redis_ok = False
+
+        return {
+            "status": "healthy" if redis_ok and self._running else "unhealthy",
+            "service": self.agent.name,
+            "redis": redis_ok,
+            "in_flight": len(self._inflight)
+        }
+
+    async def _ensure_group(self):
+        try:
+            await self.redis.xgroup_create(self.agent.stream, self.group, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        next_claim = 0.0
+
+        while self._running:
+            messages = []
+            if loop.time() >= next_claim:
+                messages = await self._claim_stale()
+                next_claim = loop.time() + self.config.claim_idle_ms / 1000
+
+            if not messages:
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.config.consumer_name,
+                    {self.agent.stream: '>'},
+                    count=self.config.batch_size,
+                    block=self.config.block_ms
+                )
+                messages = response[0][1] if response else []
+
+            for message_id, fields in messages:
+                await self._slots.acquire()
+                self._dispatch(message_id, fields)
+
+    async def _claim_stale(self) -> List[Tuple[str, Dict[str, str]]]:
+        """Take over entries another consumer read but never acknowledged"""
+        claimed = await self.redis.xautoclaim(
+            self.agent.stream,
+            self.group,
+            self.config.consumer_name,
+            min_idle_time=self.config.claim_idle_ms,
+            start_id='0-0',
+            count=self.config.batch_size
+        )
+        return [
+            (message_id, fields or {}) for message_id, fields in claimed[1]
+            if message_id not in self._inflight_ids
+        ]
+
+    def _dispatch(self, message_id: str, fields: Dict[str, str]):
+        self._inflight_ids.add(message_id)
+        task = asyncio.create_task(self._handle(message_id, fields))
+        self._inflight.add(task)
+        metrics.tasks_in_flight.labels(self.agent.name).inc()
+
+        def _done(t):
+            self._inflight.discard(t)
+            self._inflight_ids.discard(message_id)
+            self._slots.release()
+            metrics.tasks_in_flight.labels(self.agent.name).dec()
+
+        task.add_done_callback(_done)
+
+    async def _handle(self, message_id: str, fields: Dict[str, str]):
+        try:
+            task = json.loads(fields['task'])
+        except (KeyError, TypeError, ValueError) as e:
+            metrics.tasks_total.labels(self.agent.name, 'malformed').inc()
+            await self._results.put((message_id, '', None, f"Malformed task: {e}", fields))
+            return
+
+        task_id = task.get('task_id', '')
+        started = time.monotonic()
+        result, error, attempts = await self._process_with_retry(task)
+        duration_ms = (time.monotonic() - started) * 1000
+
+        if duration_ms >= self.config.slow_task_ms:
+            logger.warning("Slow task", extra={'fields': {
+                'agent': self.agent.name,
+                'task_id': task_id,
+                'message_id': message_id,
+                'duration_ms': round(duration_ms, 1),
+                'queue_wait_ms': round(_entry_age_ms(message_id) - duration_ms, 1),
+                'attempts': attempts,
+                'status': 'failed' if error else 'success'
+            }})
+
+        await self._results.put((message_id, task_id, result, error, fields))
+
+    async def _process_with_retry(self, task: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str], int]:
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                result = await self.agent.process_task(task)
+                metrics.task_processing_duration.labels(self.agent.name).observe(time.monotonic() - started)
+                metrics.tasks_total.labels(self.agent.name, 'success').inc()
+                return result, None, attempt + 1
+            except Exception as e:
+                metrics.task_processing_duration.labels(self.agent.name).observe(time.monotonic() - started)
+                metrics.task_errors_total.labels(self.agent.name, type(e).__name__).inc()
+                attempt += 1
+                if attempt >= self.config.max_retries:
+                    metrics.tasks_total.labels(self.agent.name, 'failed').inc()
+                    logger.error("Task failed", exc_info=True, extra={'fields': {
+                        'agent': self.agent.name,
+                        'task_id': task.get('task_id', ''),
+                        'attempts': attempt
+                    }})
+                    return {
+                        'task_id': task.get('task_id', ''),
+                        'status': 'error',
+                        'message': str(e)
+                    }, str(e), attempt
+
+                metrics.task_retries_total.labels(self.agent.name).inc()
+                await asyncio.sleep(self.config.retry_backoff_s * 2 ** (attempt - 1))
+
+    async def _write_results(self):
+        """Drain finished tasks and flush them to Redis in batches"""
+        done = False
+        while not done:
+            item = await self._results.get()
+            if item is None:
+                break
+
+            batch = [item]
+            while len(batch) < self.config.batch_size and not self._results.empty():
+                item = self._results.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+
+            try:
+                await self._flush(batch)
+            except Exception:
+                # Entries stay pending and are reclaimed after claim_idle_ms
+                logger.exception("Failed to write results", extra={'fields': {
+                    'agent': self.agent.name, 'batch_size': len(batch)
+                }})
+
+    async def _flush(self, batch: List[ResultItem]):
+        pipe = self.redis.pipeline(transaction=False)
+        for message_id, task_id, result, error, fields in batch:
+            if result is not None and task_id:
+                payload = json.dumps(result)
+                pipe.setex(f"task_result:{task_id}", self.config.result_ttl, payload)
+                pipe.publish(f"task_result_{task_id}", payload)
+            if error is not None:
+                pipe.xadd(self.dead_letter_stream, {**fields, 'error': error})
+            pipe.xack(self.agent.stream, self.group, message_id)
+        await pipe.execute()
+
+        metrics.result_batch_size.labels(self.agent.name).observe(len(batch))
+        for message_id, *_ in batch:
+            metrics.task_end_to_end_duration.labels(self.agent.name).observe(_entry_age_ms(message_id) / 1000)
+
+    async def _sample_queue(self):
+        """Refresh queue depth/lag gauges from the consumer group state"""
+        while True:
+            try:
+                await self._refresh_queue_metrics()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Queue sampling failed", exc_info=True, extra={'fields': {'agent': self.agent.name}})
+            await asyncio.sleep(self.config.queue_sample_s)
+
+    async def _refresh_queue_metrics(self):
+        groups = await self.redis.xinfo_groups(self.agent.stream)
+        group = next((g for g in groups if g['name'] == self.group), None)
+        if group is None:
+            return
+
+        undelivered = await self.redis.xrange(
+            self.agent.stream, min=f"({group['last-delivered-id']}", count=1
+        )
+        # 'lag' is only reported by Redis >= 7 (and is None when it cannot be
+        # computed); fall back to the stream length as an upper bound
+        lag = group.get('lag')
+        if lag is None:
+            lag = await self.redis.xlen(self.agent.stream) if undelivered else 0
+
+        oldest_ids = [undelivered[0][0]] if undelivered else []
+        if group['pending']:
+            summary = await self.redis.xpending(self.agent.stream, self.group)
+            oldest_ids.append(summary['min'])
+
+        name = self.agent.name
+        metrics.queue_lag.labels(name).set(lag)
+        metrics.queue_pending.labels(name).set(group['pending'])
+        metrics.queue_oldest_age.labels(name).set(
+            max(_entry_age_ms(i) for i in oldest_ids) / 1000 if oldest_ids else 0
+        )
+        metrics.dead_letter_depth.labels(name).set(await self.redis.xlen(self.dead_letter_stream))
+
+
+def _entry_age_ms(message_id: str) -> float:
+    """Milliseconds since a stream entry was added (IDs start with a ms timestamp)"""
+    return max(time.time() * 1000 - int(message_id.split('-')[0]), 0.0)
+
+
+def run_agent(agent: Agent, config: RuntimeConfig = None):
+    """Entry point used by each agent's ``main.py``"""
+    configure_logging()
+    asyncio.run(AgentRuntime(agent, config).run())
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+# agent_runtime is imported as a package from the agents directory (/app in Docker)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from prometheus_client import REGISTRY
+from redis.exceptions import ResponseError
+
+from agent_runtime import Agent, AgentRuntime, RuntimeConfig
+
+
+def _id_key(message_id):
+    ms, seq = message_id.split('-')
+    return int(ms), int(seq)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def setex(self, key, ttl, value):
+        self.ops.append(('setex', key, value))
+
+    def publish(self, channel, message):
+        self.ops.append(('publish', channel, message))
+
+    def xadd(self, stream, fields):
+        self.ops.append(('xadd', stream, fields))
+
+    def xack(self, stream, group, message_id):
+        self.ops.append(('xack', stream, group, message_id))
+
+    async def execute(self):
+        for op, *args in self.ops:
+            if op == 'setex':
+                self.redis.values[args[0]] = args[1]
+            elif op == 'publish':
+                self.redis.published.append((args[0], args[1]))
+            else:
+                await getattr(self.redis, op)(*args)
+        return []
+
+
+class FakeRedis:
+    """In-memory streams with the consumer-group commands the runtime issues"""
+
+    def __init__(self):
+        self.streams = {}
+        # (stream, group) -> {'last': id, 'pending': {id: [consumer, delivered_at, deliveries]}}
+        self.groups = {}
+        self.values = {}
+        self.published = []
+        self.acked = []
+        self._seq = 0
+
+    def add(self, stream, fields):
+        self._seq += 1
+        message_id = f"{int(time.time() * 1000)}-{self._seq}"
+        self.streams.setdefault(stream, []).append((message_id, dict(fields)))
+        return message_id
+
+    async def xadd(self, stream, fields):
+        return self.add(stream, fields)
+
+    async def xgroup_create(self, stream, group, id='0', mkstream=False):
+        if (stream, group) in self.groups:
+            raise ResponseError('BUSYGROUP Consumer Group name already exists')
+        self.streams.setdefault(stream, [])
+        self.groups[(stream, group)] = {'last': '0-0', 'pending': {}}
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        (stream, _), = streams.items()
+        state = self.groups[(stream, group)]
+        entries = [(i, f) for i, f in self.streams[stream] if _id_key(i) > _id_key(state['last'])][:count]
+        if not entries:
+            await asyncio.sleep((block or 0) / 1000)
+            return []
+        for message_id, _ in entries:
+            state['pending'][message_id] = [consumer, time.monotonic(), 1]
+        state['last'] = entries[-1][0]
+        return [[stream, entries]]
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, start_id='0-0', count=None):
+        state = self.groups[(stream, group)]
+        fields = dict(self.streams[stream])
+        claimed = []
+        for message_id, entry in sorted(state['pending'].items(), key=lambda item: _id_key(item[0])):
+            if (time.monotonic() - entry[1]) * 1000 >= min_idle_time:
+                state['pending'][message_id] = [consumer, time.monotonic(), entry[2] + 1]
+                claimed.append((message_id, fields[message_id]))
+        return ['0-0', claimed[:count], []]
+
+    async def xack(self, stream, group, message_id):
+        if self.groups[(stream, group)]['pending'].pop(message_id, None) is not None:
+            self.acked.append(message_id)
+
+    async def xinfo_groups(self, stream):
+        return [
+            {'name': group, 'last-delivered-id': state['last'], 'pending': len(state['pending']),
+             'lag': sum(_id_key(i) > _id_key(state['last']) for i, _ in self.streams[stream])}
+            for (name, group), state in self.groups.items() if name == stream
+        ]
+
+    async def xrange(self, stream, min='-', max='+', count=None):
+        low = _id_key(min.lstrip('(')) if min != '-' else (-1, -1)
+        return [(i, f) for i, f in self.streams.get(stream, []) if _id_key(i) > low][:count]
+
+    async def xlen(self, stream):
+        return len(self.streams.get(stream, []))
+
+    async def xpending(self, stream, group):
+        pending = sorted(self.groups[(stream, group)]['pending'], key=_id_key)
+        return {'pending': len(pending), 'min': pending[0] if pending else None,
+                'max': pending[-1] if pending else None, 'consumers': []}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def ping(self):
+        return True
+
+    async def close(self):
+        pass
+
+
+class EchoAgent(Agent):
+    name = 'echo-agent'
+    stream = 'echo_tasks'
+
+    def __init__(self, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    async def process_task(self, task):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ValueError('model unavailable')
+        return {'task_id': task['task_id'], 'echo': task['text']}
+
+
+def make_runtime(agent, redis=None):
+    config = RuntimeConfig(redis_host='localhost', consumer_name='worker-1', concurrency=2, batch_size=4,
+                           block_ms=10, max_retries=2, retry_backoff_s=0, claim_idle_ms=50,
+                           health_port=0, queue_sample_s=0.01)
+    runtime = AgentRuntime(agent, config)
+    runtime.redis = redis or FakeRedis()
+    return runtime
+
+
+def enqueue(redis, stream, *task_ids):
+    return [redis.add(stream, {'task': json.dumps({'task_id': t, 'text': f"hello {t}"})}) for t in task_ids]
+
+
+async def run_until(runtime, condition, timeout=5.0):
+    """Run the consumer until ``condition()`` holds, then stop it and wait for the drain"""
+    runner = asyncio.create_task(runtime.run())
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        assert not runner.done(), runner.exception()
+        await asyncio.sleep(0.005)
+    runtime.stop()
+    await asyncio.wait_for(runner, timeout)
+
+
+def test_group_reads_store_results_and_ack():
+    """Tasks read through the consumer group get their result stored, published and acked"""
+    redis = FakeRedis()
+    runtime = make_runtime(EchoAgent(), redis)
+    ids = enqueue(redis, 'echo_tasks', 't1', 't2', 't3')
+
+    asyncio.run(run_until(runtime, lambda: len(redis.acked) == 3))
+
+    assert sorted(redis.acked) == sorted(ids)
+    assert json.loads(redis.values['task_result:t2']) == {'task_id': 't2', 'echo': 'hello t2'}
+    assert ('task_result_t3', redis.values['task_result:t3']) in redis.published
+    assert redis.groups[('echo_tasks', 'echo-agent')]['pending'] == {}
+    assert 'echo_tasks:dead' not in redis.streams
+
+
+def test_stale_entries_of_a_crashed_consumer_are_reclaimed():
+    """An entry another consumer read but never acked is claimed with XAUTOCLAIM and finished"""
+    redis = FakeRedis()
+    agent = EchoAgent()
+    runtime = make_runtime(agent, redis)
+
+    async def scenario():
+        await redis.xgroup_create('echo_tasks', 'echo-agent', id='0', mkstream=True)
+        message_id, = enqueue(redis, 'echo_tasks', 'orphan')
+        await redis.xreadgroup('echo-agent', 'crashed-worker', {'echo_tasks': '>'}, count=1)
+        await run_until(runtime, lambda: message_id in redis.acked)
+        return message_id
+
+    asyncio.run(scenario())
+    assert agent.calls == 1
+    assert json.loads(redis.values['task_result:orphan'])['echo'] == 'hello orphan'
+
+
+def test_failing_tasks_are_dead_lettered_after_max_retries():
+    """A task failing every attempt gets an error result, a dead-letter copy and is still acked"""
+    redis = FakeRedis()
+    agent = EchoAgent(fail=True)
+    runtime = make_runtime(agent, redis)
+    message_id, = enqueue(redis, 'echo_tasks', 'doomed')
+
+    asyncio.run(run_until(runtime, lambda: message_id in redis.acked))
+
+    assert agent.calls == 2
+    (_, dead), = redis.streams['echo_tasks:dead']
+    assert dead['error'] == 'model unavailable'
+    assert json.loads(dead['task'])['task_id'] == 'doomed'
+    assert json.loads(redis.values['task_result:doomed'])['status'] == 'error'
+
+
+def test_stop_drains_in_flight_tasks_before_closing():
+    """Stopping mid-task waits for the task, writes and acks its result and leaves no tasks behind"""
+    redis = FakeRedis()
+    runtime = make_runtime(EchoAgent(delay=0.1), redis)
+    message_id, = enqueue(redis, 'echo_tasks', 'slow')
+
+    async def scenario():
+        await run_until(runtime, lambda: len(runtime._inflight) == 1)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    leftover = asyncio.run(scenario())
+    assert redis.acked == [message_id]
+    assert 'task_result:slow' in redis.values
+    # The queue sampler and result writer are finished, not just cancelled
+    assert leftover == []
+
+
+class MeteredAgent(EchoAgent):
+    # Metrics are process-wide; a separate label keeps other tests' tasks out
+    name = 'metered-agent'
+    stream = 'metered_tasks'
+
+
+def sample(metric, agent='metered-agent', **labels):
+    return REGISTRY.get_sample_value(metric, {'agent': agent, **labels})
+
+
+def test_processed_tasks_update_throughput_latency_and_lag_metrics():
+    """Counters, latency histograms and queue gauges follow the tasks through the runtime"""
+    redis = FakeRedis()
+    runtime = make_runtime(MeteredAgent(delay=0.01), redis)
+
+    async def scenario():
+        await runtime._ensure_group()
+        enqueue(redis, 'metered_tasks', 'm1', 'm2', 'm3')
+        await runtime._refresh_queue_metrics()
+        waiting = sample('polyverse_agent_queue_lag'), sample('polyverse_agent_queue_oldest_age_seconds')
+        await run_until(runtime, lambda: len(redis.acked) == 3)
+        await runtime._refresh_queue_metrics()
+        return waiting
+
+    lag, oldest_age = asyncio.run(scenario())
+    assert lag == 3 and oldest_age >= 0
+    assert sample('polyverse_agent_tasks_total', status='success') == 3
+    assert sample('polyverse_agent_task_processing_duration_seconds_count') == 3
+    assert sample('polyverse_agent_task_processing_duration_seconds_sum') >= 3 * 0.01
+    assert sample('polyverse_agent_task_end_to_end_duration_seconds_count') == 3
+    assert sample('polyverse_agent_tasks_in_flight') == 0
+    assert sample('polyverse_agent_queue_lag') == 0
+    assert sample('polyverse_agent_queue_pending') == 0
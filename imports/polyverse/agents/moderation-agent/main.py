@@ -1,36 +1,25 @@
 
 
 
-import asyncio
-import json
-import redis
+import logging
+import os
+import sys
 from typing import Dict, Any
 
-class ModerationAgent:
-    def __init__(self, redis_host: str = 'redis', redis_port: int = 6379):
-        self.redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
-        self.pubsub = self.redis.pubsub()
-        
-    async def start(self):
-        """Start listening for moderation tasks"""
-        print("Starting Moderation Agent...")
-        self.pubsub.subscribe('moderation_tasks')
-        
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                try:
-                    task = json.loads(message['data'])
-                    result = await self.process_task(task)
-                    # Store result in Redis and publish
-                    result_key = f"task_result:{task['task_id']}"
-                    self.redis.setex(result_key, 3600, json.dumps(result))  # Store for 1 hour
-                    self.redis.publish(f"task_result_{task['task_id']}", json.dumps(result))
-                except Exception as e:
-                    print(f"Error processing task: {e}")
-    
+# The shared runtime lives next to the agent directories (copied to /app in Docker)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from agent_runtime import Agent, run_agent
+
+logger = logging.getLogger(__name__)
+
+class ModerationAgent(Agent):
+    name = 'moderation-agent'
+    stream = 'moderation_tasks'
+
     async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Process a moderation task"""
-        print(f"Processing moderation task: {task}")
+        logger.debug('Processing moderation task %s', task.get('task_id'))
         
         # Extract task data
         content = task.get('content', '')
@@ -84,8 +73,7 @@ class ModerationAgent:
             'content_preview': content[:100] + '...' if len(content) > 100 else content
         }
 
-if __name__ == "__main__":
-    agent = ModerationAgent()
-    asyncio.run(agent.start())
+if __name__ == '__main__':
+    run_agent(ModerationAgent())
 
 
@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import os
+from collections import deque
+from concurrent.futures import Executor
+from typing import Dict, List
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from prometheus_client import Counter, Gauge
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+ED25519_MULTICODEC = b'\xed\x01'
+SEAL_INFO = b'polyverse-onboarding-private-key'
+
+key_pool_size = Gauge(
+    'polyverse_onboarding_key_pool_size',
+    'Number of pre-generated DID keys ready to hand out'
+)
+
+key_pool_misses_total = Counter(
+    'polyverse_onboarding_key_pool_misses_total',
+    'Key requests that found the pool empty and generated a key on demand'
+)
+
+
+def _base58btc(data: bytes) -> str:
+    num = int.from_bytes(data, 'big')
+    encoded = ''
+    while num > 0:
+        num, rem = divmod(num, 58)
+        encoded = BASE58_ALPHABET[rem] + encoded
+    # Leading zero bytes are encoded as '1'
+    pad = len(data) - len(data.lstrip(b'\0'))
+    return '1' * pad + encoded
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _seal_key(shared_secret: bytes) -> bytes:
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=SEAL_INFO).derive(shared_secret)
+
+
+def seal_private_key(keypair: Dict[str, str], client_public_key: str) -> Dict[str, str]:
+    """Encrypt a keypair's private key to the client's X25519 public key
+
+    Only the client holding the matching X25519 private key can open the
+    result, so it can travel through Redis like any other task result. The
+    DID is bound as associated data.
+
+    Raises:
+        ValueError: If ``client_public_key`` is not a base64url X25519 key
+    """
+    try:
+        recipient = X25519PublicKey.from_public_bytes(_unb64(client_public_key))
+    except Exception as e:
+        raise ValueError('client_public_key must be a base64url X25519 public key') from e
+    ephemeral = X25519PrivateKey.generate()
+    nonce = os.urandom(12)
+    ciphertext = ChaCha20Poly1305(_seal_key(ephemeral.exchange(recipient))).encrypt(
+        nonce, _unb64(keypair['private_key']), keypair['did'].encode('utf-8'))
+    return {
+        'ephemeral_public_key': _b64(ephemeral.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)),
+        'nonce': _b64(nonce),
+        'ciphertext': _b64(ciphertext)
+    }
+
+
+def open_private_key(sealed: Dict[str, str], did: str, client_private_key: X25519PrivateKey) -> str:
+    """Client side of ``seal_private_key``: return the base64url private key"""
+    ephemeral = X25519PublicKey.from_public_bytes(_unb64(sealed['ephemeral_public_key']))
+    plaintext = ChaCha20Poly1305(_seal_key(client_private_key.exchange(ephemeral))).decrypt(
+        _unb64(sealed['nonce']), _unb64(sealed['ciphertext']), did.encode('utf-8'))
+    return _b64(plaintext)
+
+
+def generate_keypairs(count: int) -> List[Dict[str, str]]:
+    """Generate Ed25519 did:key keypairs (runs in a worker process)"""
+    keypairs = []
+    for _ in range(count):
+        private_key = Ed25519PrivateKey.generate()
+        public_bytes = private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+        private_bytes = private_key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption())
+        multibase = 'z' + _base58btc(ED25519_MULTICODEC + public_bytes)
+        keypairs.append({
+            'did': f"did:key:{multibase}",
+            'public_key_multibase': multibase,
+            'private_key': _b64(private_bytes)
+        })
+    return keypairs
+
+
+class KeyPool:
+    """In-memory pool of pre-generated keypairs refilled from a process pool.
+
+    Keys are kept only in this process's memory and handed out once, so
+    private keys are never written to Redis. When the pool drops below
+    ``low_watermark`` a background task refills it to ``target`` in batches;
+    a request that finds it empty generates its own key on the executor
+    instead of waiting for the refill.
+    """
+
+    def __init__(self, executor: Executor, target: int = 64, low_watermark: int = 16, batch_size: int = 16):
+        self.executor = executor
+        self.target = target
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+        self._keys = deque()
+        self._refill_needed = None
+        self._refill_task = None
+
+    def start(self):
+        self._refill_needed = asyncio.Event()
+        self._refill_needed.set()
+        self._refill_task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    async def acquire(self) -> Dict[str, str]:
+        if self._keys:
+            keypair = self._keys.popleft()
+        else:
+            key_pool_misses_total.inc()
+            loop = asyncio.get_running_loop()
+            keypair = (await loop.run_in_executor(self.executor, generate_keypairs, 1))[0]
+
+        key_pool_size.set(len(self._keys))
+        if len(self._keys) < self.low_watermark and self._refill_needed is not None:
+            self._refill_needed.set()
+        return keypair
+
+    def release(self, keypair: Dict[str, str]):
+        """Return a keypair that was acquired but never handed to a user"""
+        self._keys.appendleft(keypair)
+        key_pool_size.set(len(self._keys))
+
+    async def _refill_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._refill_needed.wait()
+            self._refill_needed.clear()
+            while len(self._keys) < self.target:
+                count = min(self.batch_size, self.target - len(self._keys))
+                self._keys.extend(await loop.run_in_executor(self.executor, generate_keypairs, count))
+                key_pool_size.set(len(self._keys))
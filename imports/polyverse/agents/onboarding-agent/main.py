@@ -1,43 +1,93 @@
 
 
 
-import asyncio
-import json
-import redis
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any
 
-class OnboardingAgent:
-    def __init__(self, redis_host: str = 'redis', redis_port: int = 6379):
-        self.redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
-        self.pubsub = self.redis.pubsub()
-        
-    async def start(self):
-        """Start listening for onboarding tasks"""
-        print("Starting Onboarding Agent...")
-        self.pubsub.subscribe('onboarding_tasks')
-        
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                try:
-                    task = json.loads(message['data'])
-                    result = await self.process_task(task)
-                    # Store result in Redis and publish
-                    result_key = f"task_result:{task['task_id']}"
-                    self.redis.setex(result_key, 3600, json.dumps(result))  # Store for 1 hour
-                    self.redis.publish(f"task_result_{task['task_id']}", json.dumps(result))
-                except Exception as e:
-                    print(f"Error processing task: {e}")
-    
+# The shared runtime lives next to the agent directories (copied to /app in Docker)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from agent_runtime import Agent, run_agent
+from keys import KeyPool, seal_private_key
+
+logger = logging.getLogger(__name__)
+
+BUNDLES = ['default-strict', 'family-friendly', 'developer-community']
+
+# Onboarding steps in order; a session's 'state' is the next step it expects
+STEP_ORDER = ['init', 'key_generation', 'bundle_selection', 'complete']
+
+# Compare-and-set on the session hash so concurrent tasks for the same user
+# cannot both advance it. Returns {applied, current_state}.
+ADVANCE_SESSION_LUA = """
+local current = redis.call('HGET', KEYS[1], 'state') or 'init'
+if current ~= ARGV[1] then
+  return {0, current}
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return {1, current}
+"""
+
+class OnboardingAgent(Agent):
+    name = 'onboarding-agent'
+    stream = 'onboarding_tasks'
+
+    def __init__(self):
+        self.session_ttl = int(os.getenv('ONBOARDING_SESSION_TTL', str(7 * 24 * 3600)))
+        self.executor = ProcessPoolExecutor(max_workers=int(os.getenv('ONBOARDING_KEYGEN_WORKERS', '2')))
+        self.key_pool = KeyPool(self.executor, target=int(os.getenv('ONBOARDING_KEY_POOL_SIZE', '64')))
+
+    async def setup(self, runtime):
+        await super().setup(runtime)
+        self._advance = self.redis.register_script(ADVANCE_SESSION_LUA)
+        self.key_pool.start()
+
+    async def teardown(self):
+        await self.key_pool.stop()
+        self.executor.shutdown(wait=False)
+
+    def session_key(self, user_id: str) -> str:
+        return f"onboarding:session:{user_id}"
+
     async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Process an onboarding task"""
-        print(f"Processing onboarding task: {task}")
+        """Process an onboarding task against the user's persisted session"""
+        logger.debug('Processing onboarding task %s', task.get('task_id'))
         
         task_id = task.get('task_id', '')
         user_id = task.get('user_id', '')
-        step = task.get('step', 'init')
-        
-        # Simple onboarding logic
+
+        if not user_id:
+            return self._error(task_id, 'user_id is required for onboarding')
+
+        session = await self.redis.hgetall(self.session_key(user_id))
+        state = session.get('state', 'init')
+        step = task.get('step', state)
+
+        if step == 'complete' and state == 'complete':
+            return {
+                'task_id': task_id,
+                'step': 'complete',
+                'message': f"Onboarding already complete. Selected bundle: {session.get('selected_bundle')}",
+                'did': session.get('did'),
+                'status': 'success'
+            }
+        if step not in STEP_ORDER[:-1]:
+            return self._error(task_id, 'Unknown onboarding step')
+        if step != state:
+            return self._error(task_id, f"Expected step '{state}', got '{step}'", expected_step=state)
+
         if step == 'init':
+            now = str(time.time())
+            if not await self._advance_session(user_id, step, {
+                'state': 'key_generation', 'user_id': user_id,
+                'created_at': now, 'updated_at': now, 'last_task_id': task_id
+            }):
+                return await self._conflict(task_id, user_id)
             return {
                 'task_id': task_id,
                 'step': 'key_generation',
@@ -45,30 +95,74 @@ class OnboardingAgent:
                 'next_steps': ['generate_keys', 'select_bundle']
             }
         elif step == 'key_generation':
+            # Results are stored, published and dead-lettered in Redis, so the
+            # private key only leaves this process sealed to the client's key
+            client_public_key = task.get('client_public_key')
+            if not client_public_key:
+                return self._error(task_id, 'client_public_key is required for key generation',
+                                   expected_step=state)
+            # Keys come from the pre-generated pool; only the public DID is persisted
+            keypair = await self.key_pool.acquire()
+            try:
+                sealed_private_key = seal_private_key(keypair, client_public_key)
+            except ValueError as e:
+                self.key_pool.release(keypair)
+                return self._error(task_id, str(e), expected_step=state)
+            if not await self._advance_session(user_id, step, {
+                'state': 'bundle_selection', 'did': keypair['did'],
+                'updated_at': str(time.time()), 'last_task_id': task_id
+            }):
+                self.key_pool.release(keypair)
+                return await self._conflict(task_id, user_id)
             return {
                 'task_id': task_id,
                 'step': 'bundle_selection',
                 'message': 'Keys generated successfully. Now select your moderation bundle.',
-                'bundles': ['default-strict', 'family-friendly', 'developer-community']
+                'did': keypair['did'],
+                'public_key_multibase': keypair['public_key_multibase'],
+                'sealed_private_key': sealed_private_key,
+                'bundles': BUNDLES
             }
-        elif step == 'bundle_selection':
+        else:
             selected_bundle = task.get('selected_bundle', 'default-strict')
+            if selected_bundle not in BUNDLES:
+                return self._error(task_id, f"Unknown bundle '{selected_bundle}'", expected_step=state)
+            if not await self._advance_session(user_id, step, {
+                'state': 'complete', 'selected_bundle': selected_bundle,
+                'updated_at': str(time.time()), 'last_task_id': task_id
+            }):
+                return await self._conflict(task_id, user_id)
             return {
                 'task_id': task_id,
                 'step': 'complete',
                 'message': f'Onboarding complete! Selected bundle: {selected_bundle}',
+                'did': session.get('did'),
                 'status': 'success'
             }
-        else:
-            return {
-                'task_id': task_id,
-                'step': 'error',
-                'message': 'Unknown onboarding step',
-                'status': 'error'
-            }
 
-if __name__ == "__main__":
-    agent = OnboardingAgent()
-    asyncio.run(agent.start())
+    async def _advance_session(self, user_id: str, expected_state: str, fields: Dict[str, str]) -> bool:
+        args = [expected_state, self.session_ttl]
+        for field, value in fields.items():
+            args.extend([field, value])
+        applied, _ = await self._advance(keys=[self.session_key(user_id)], args=args)
+        return bool(applied)
+
+    async def _conflict(self, task_id: str, user_id: str) -> Dict[str, Any]:
+        state = await self.redis.hget(self.session_key(user_id), 'state') or 'init'
+        return self._error(task_id, 'Onboarding session was updated concurrently', expected_step=state)
+
+    def _error(self, task_id: str, message: str, expected_step: str = None) -> Dict[str, Any]:
+        result = {
+            'task_id': task_id,
+            'step': 'error',
+            'message': message,
+            'status': 'error'
+        }
+        if expected_step:
+            result['expected_step'] = expected_step
+        return result
+
+if __name__ == '__main__':
+    run_agent(OnboardingAgent())
 
 
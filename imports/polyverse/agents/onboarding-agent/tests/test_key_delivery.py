@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import sys
+
+# main.py and keys.py live one directory up (the agent's /app in Docker)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from main import OnboardingAgent  # also puts agent_runtime on the path
+from agent_runtime.config import RuntimeConfig
+from agent_runtime.runtime import AgentRuntime
+from keys import ED25519_MULTICODEC, _b64, _base58btc, _unb64, generate_keypairs, open_private_key
+
+
+class FakePipeline:
+    def __init__(self, writes):
+        self.writes = writes
+
+    def setex(self, key, ttl, value):
+        self.writes.append(('setex', key, value))
+
+    def publish(self, channel, message):
+        self.writes.append(('publish', channel, message))
+
+    def xadd(self, stream, fields):
+        self.writes.append(('xadd', stream, json.dumps(fields)))
+
+    def xack(self, stream, group, message_id):
+        pass
+
+    async def execute(self):
+        return []
+
+
+class FakeRedis:
+    """Records every value written; sessions are always at key_generation"""
+
+    def __init__(self):
+        self.writes = []
+
+    async def hgetall(self, key):
+        return {'state': 'key_generation', 'user_id': 'alice'}
+
+    def register_script(self, script):
+        async def advance(keys, args):
+            self.writes.append(('hset', keys[0], json.dumps(args[2:])))
+            return [1, args[0]]
+        return advance
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.writes)
+
+
+def run_key_generation(task):
+    agent = OnboardingAgent()
+    runtime = AgentRuntime(agent, RuntimeConfig.from_env())
+    runtime.redis = agent.redis = FakeRedis()
+    agent._advance = agent.redis.register_script(None)
+    keypair = generate_keypairs(1)[0]
+    agent.key_pool._keys.append(keypair)
+
+    async def run():
+        result = await agent.process_task(task)
+        fields = {k: str(v) for k, v in task.items()}
+        # Stored and published as a result, and copied to the dead-letter stream as on failure
+        await runtime._flush([('1700000000000-0', task['task_id'], result, 'retries exhausted', fields)])
+        return result
+
+    try:
+        return asyncio.run(run()), keypair, runtime.redis.writes
+    finally:
+        agent.executor.shutdown(wait=False)
+
+
+def test_private_key_never_reaches_redis():
+    client_key = X25519PrivateKey.generate()
+    client_public_key = _b64(client_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw))
+
+    result, keypair, writes = run_key_generation({
+        'task_id': 't1', 'user_id': 'alice', 'step': 'key_generation', 'client_public_key': client_public_key
+    })
+
+    assert result['did'] == keypair['did']
+    assert 'private_key' not in result
+    assert {kind for kind, _, _ in writes} == {'hset', 'setex', 'publish', 'xadd'}
+    for _, _, value in writes:
+        assert keypair['private_key'] not in value
+        assert '"private_key"' not in value
+
+    # Only the client can open the sealed key, and it is the DID's key
+    opened = open_private_key(result['sealed_private_key'], result['did'], client_key)
+    assert opened == keypair['private_key']
+    public_bytes = Ed25519PrivateKey.from_private_bytes(_unb64(opened)).public_key().public_bytes(
+        Encoding.Raw, PublicFormat.Raw)
+    assert result['did'] == 'did:key:z' + _base58btc(ED25519_MULTICODEC + public_bytes)
+
+
+def test_key_generation_requires_client_public_key():
+    result, keypair, writes = run_key_generation({'task_id': 't2', 'user_id': 'alice', 'step': 'key_generation'})
+
+    assert result['status'] == 'error'
+    assert result['expected_step'] == 'key_generation'
+    assert not any(kind == 'hset' for kind, _, _ in writes)
@@ -1,31 +1,22 @@
-import asyncio
-import json
-import redis
+import logging
+import os
+import sys
 from typing import Dict, Any
 
-class SummarizerAgent:
-    def __init__(self, redis_host: str = "redis", redis_port: int = 6379):
-        self.redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
-        self.pubsub = self.redis.pubsub()
-        
-    async def start(self):
-        """Start listening for summarization tasks"""
-        print("Starting Summarizer Agent...")
-        self.pubsub.subscribe("summarization_tasks")
-        
-        for message in self.pubsub.listen():
-            if message["type"] == "message":
-                try:
-                    task = json.loads(message["data"])
-                    result = await self.process_task(task)
-                    # Publish result
-                    result_key = f"task_result:{task['task_id']}"; self.redis.setex(result_key, 3600, json.dumps(result)); self.redis.publish(f"task_result_{task['task_id']}", json.dumps(result))
-                except Exception as e:
-                    print(f"Error processing task: {e}")
-    
+# The shared runtime lives next to the agent directories (copied to /app in Docker)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from agent_runtime import Agent, run_agent
+
+logger = logging.getLogger(__name__)
+
+class SummarizerAgent(Agent):
+    name = "summarizer-agent"
+    stream = "summarization_tasks"
+
     async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Process a summarization task"""
-        print(f"Processing summarization task: {task}")
+        logger.debug("Processing summarization task %s", task.get("task_id"))
         
         task_id = task.get("task_id", "")
         content = task.get("content", "")
@@ -48,5 +39,4 @@ class SummarizerAgent:
         }
 
 if __name__ == "__main__":
-    agent = SummarizerAgent()
-    asyncio.run(agent.start())
+    run_agent(SummarizerAgent())
@@ -0,0 +1,41 @@
+"""
+Database access for API routers.
+"""
+
+import os
+from typing import Optional
+
+import psycopg2.pool
+
+from ledger.archive import ArchiveStore
+
+_pool = None
+
+def get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    """Create the connection pool on first use."""
+    global _pool
+    if _pool is None:
+        _pool = psycopg2.pool.ThreadedConnectionPool(
+            1, int(os.getenv("API_DB_MAX_CONNECTIONS", "10")), os.environ["DATABASE_URL"]
+        )
+    return _pool
+
+def get_db():
+    """
+    FastAPI dependency yielding a pooled connection.
+
+    Routers only read, so the transaction is rolled back before the
+    connection goes back to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        pool.putconn(conn)
+
+def get_archive_store() -> Optional[ArchiveStore]:
+    """Return the ledger archive store, or None when LEDGER_ARCHIVE_DIR is unset."""
+    root = os.getenv("LEDGER_ARCHIVE_DIR")
+    return ArchiveStore(root) if root else None
@@ -35,6 +35,7 @@ def read_root():
             "/orders/daily",
             "/appeals/file",
             "/ledger/decisions",
+            "/ledger/proof/{decision_id}",
             "/weights/set"
         ]
     }
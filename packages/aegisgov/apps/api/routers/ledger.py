@@ -13,9 +13,16 @@
 
 
 
-from fastapi import APIRouter, HTTPException
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from ledger.merkle import get_inclusion_proof
+from ledger.query import fetch_decisions, stream_decisions, resolve_fields, MAX_PAGE_SIZE
+from ..db import get_archive_store, get_db, get_pool
 
 router = APIRouter(
     prefix="/ledger",
@@ -26,67 +33,119 @@ router = APIRouter(
 class Decision(BaseModel):
     decision_id: int
     ts: str
-    inputs_bundle: Dict[str, Any]
-    objectives: Dict[str, float]
-    options_considered: List[Dict[str, Any]]
-    chosen_action: Dict[str, Any]
-    tests_passed: Dict[str, bool]
+    prev_decision_id: Optional[int] = None
+    inputs_bundle: Dict[str, Any] = None
+    objectives: Dict[str, float] = None
+    options_considered: List[Dict[str, Any]] = None
+    chosen_action: Dict[str, Any] = None
+    tests_passed: Dict[str, bool] = None
     approvals: Dict[str, Any] = None
     appeals: Dict[str, Any] = None
     post_hoc_metrics: Dict[str, float] = None
+    prev_hash: Optional[str] = None
+    curr_hash: Optional[str] = None
 
-class PaginatedDecisions(BaseModel):
-    total: int
-    page: int
-    page_size: int
+class DecisionPage(BaseModel):
+    limit: int
+    next_cursor: Optional[str]
     decisions: List[Decision]
 
-@router.get("/decisions", response_model=PaginatedDecisions)
-def get_decisions(page: int = 1, page_size: int = 10):
+class InclusionProof(BaseModel):
+    decision_id: int
+    curr_hash: str
+    batch_id: int
+    period_start: str
+    period_end: str
+    leaf_index: int
+    tree_size: int
+    merkle_root: str
+    proof: List[str]
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    try:
+        return resolve_fields([f.strip() for f in fields.split(",") if f.strip()])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/decisions", response_model=DecisionPage, response_model_exclude_unset=True)
+def get_decisions(limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                  cursor: Optional[str] = None,
+                  action_type: Optional[str] = None,
+                  appeal_status: Optional[str] = None,
+                  since: Optional[datetime] = None,
+                  until: Optional[datetime] = None,
+                  fields: Optional[str] = None,
+                  order: str = Query("desc", regex="^(asc|desc)$"),
+                  conn=Depends(get_db)):
     """
-    Get paginated list of decisions from the ledger
+    Get a page of decisions from the ledger, newest first by default
+
+    Pass the returned next_cursor to get the following page. fields is a
+    comma-separated projection; decision_id and ts are always included.
+    Archived months are included once the hot table is exhausted.
     """
     try:
-        # In a real system, this would query the database
-        # For demo purposes, return mock data
-        mock_decisions = [
-            Decision(
-                decision_id=1,
-                ts="2023-01-01T12:00:00Z",
-                inputs_bundle={"kpi_data": {"unemployment": 5.0}},
-                objectives={"rights_protection": 1.0, "prosperity": 0.8},
-                options_considered=[],
-                chosen_action={"action_type": "carbon_fee"},
-                tests_passed={"constitution_check": True}
-            ),
-            Decision(
-                decision_id=2,
-                ts="2023-01-02T12:00:00Z",
-                inputs_bundle={"kpi_data": {"unemployment": 4.8}},
-                objectives={"rights_protection": 1.0, "prosperity": 0.85},
-                options_considered=[],
-                chosen_action={"action_type": "housing_credits"},
-                tests_passed={"constitution_check": True}
-            )
-        ]
-
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-
-        return PaginatedDecisions(
-            total=len(mock_decisions),
-            page=page,
-            page_size=page_size,
-            decisions=mock_decisions[start_idx:end_idx]
+        page = fetch_decisions(
+            conn,
+            limit=limit,
+            cursor=cursor,
+            fields=_parse_fields(fields),
+            action_type=action_type,
+            appeal_status=appeal_status,
+            since=since,
+            until=until,
+            descending=order == "desc",
+            archive=get_archive_store()
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return DecisionPage(limit=limit, next_cursor=page["next_cursor"], decisions=page["decisions"])
+
+@router.get("/decisions/export")
+def export_decisions(action_type: Optional[str] = None,
+                     appeal_status: Optional[str] = None,
+                     since: Optional[datetime] = None,
+                     until: Optional[datetime] = None,
+                     fields: Optional[str] = None):
+    """
+    Stream all matching decisions, oldest first, as newline-delimited JSON
+    """
+    selected = _parse_fields(fields)
+
+    def generate():
+        # The connection is held for the whole stream, not just the request
+        pool = get_pool()
+        conn = pool.getconn()
+        try:
+            for decision in stream_decisions(conn, fields=selected, action_type=action_type,
+                                             appeal_status=appeal_status, since=since, until=until,
+                                             archive=get_archive_store()):
+                yield json.dumps(decision) + "\n"
+        finally:
+            conn.rollback()
+            pool.putconn(conn)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/proof/{decision_id}", response_model=InclusionProof)
+def get_decision_proof(decision_id: int, conn=Depends(get_db)):
+    """
+    Get a Merkle inclusion proof for a decision against its batch's committed root
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-
-
-
-
-
-
+    Verify by hashing SHA-256(0x00 || curr_hash) and folding in each proof
+    hash with SHA-256(0x01 || left || right) as in RFC 9162; the result must
+    equal merkle_root.
+    """
+    try:
+        proof = get_inclusion_proof(conn, decision_id, archive=get_archive_store())
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if proof is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Decision {decision_id} not found or not yet sealed into a Merkle batch"
+        )
+    return InclusionProof(**proof)
@@ -14,6 +14,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
+from packages.planner.cache import fingerprint, planning_cache
+from packages.planner.optimizer import MultiObjectiveOptimizer
+
 router = APIRouter(
     prefix="/plan",
     tags=["planning"],
@@ -40,6 +43,37 @@ class PlanningResponse(BaseModel):
     pareto_set: List[ParetoOption]
     chosen_plan: ChosenPlan
 
+# Demo candidate plans and the objectives they are scored on
+DEMO_OPTIONS = [
+    {"action_type": "carbon_fee_dividend", "profit": 500000, "social_impact": 0.8, "risk": 1.2},
+    {"action_type": "housing_build_credits", "profit": 300000, "social_impact": 0.9, "risk": 1.5}
+]
+DEMO_OBJECTIVES = {
+    "profit": {"sense": "max", "min": 0, "max": 1000000},
+    "social_impact": {"sense": "max", "min": 0, "max": 1},
+    "risk": {"sense": "min", "min": 0, "max": 5}
+}
+DEMO_OPTIONS_KEY = fingerprint(DEMO_OPTIONS)
+
+demo_optimizer = MultiObjectiveOptimizer(DEMO_OBJECTIVES)
+
+def preview_plan(weight_vector: List[float]) -> Dict[str, Any]:
+    """
+    Score the candidate plans under a weight vector.
+
+    Normalization, scores and the Pareto set come from the shared planning
+    cache, so repeated what-if calls with the same weights are lookups.
+    """
+    scores = planning_cache.scores(demo_optimizer, DEMO_OPTIONS, weight_vector, options_key=DEMO_OPTIONS_KEY)
+    pareto = planning_cache.pareto(demo_optimizer, DEMO_OPTIONS, options_key=DEMO_OPTIONS_KEY)
+    # Ties go to the later option, as in optimize_with_weights
+    chosen = len(scores) - 1 - int(scores[::-1].argmax())
+    return {
+        "pareto_set": [DEMO_OPTIONS[i] for i in pareto],
+        "chosen_action": DEMO_OPTIONS[chosen]["action_type"],
+        "scores": {option["action_type"]: float(score) for option, score in zip(DEMO_OPTIONS, scores)}
+    }
+
 @router.post("/run", response_model=PlanningResponse)
 def run_planning_cycle(request: PlanningRequest):
     """
@@ -52,27 +86,17 @@ def run_planning_cycle(request: PlanningRequest):
         # 3. Validate against constitution
         # 4. Run assurance monitors
 
-        # For demo purposes, return mock response
-        pareto_set = [
-            ParetoOption(
-                action_type="carbon_fee_dividend",
-                profit=500000,
-                social_impact=0.8,
-                risk=1.2
-            ),
-            ParetoOption(
-                action_type="housing_build_credits",
-                profit=300000,
-                social_impact=0.9,
-                risk=1.5
-            )
-        ]
+        # For demo purposes, score the demo candidates
+        preview = preview_plan(request.weight_vector)
+        pareto_set = [ParetoOption(**option) for option in preview["pareto_set"]]
 
+        chosen_action = preview["chosen_action"]
         chosen_plan = ChosenPlan(
-            action_type="carbon_fee_dividend",
-            explanation="Maximizes profit while maintaining high social impact",
+            action_type=chosen_action,
+            explanation="Highest weighted score among the candidate plans",
             tradeoffs=[
-                {"option": "housing_build_credits", "score": 0.85}
+                {"option": action_type, "score": score}
+                for action_type, score in preview["scores"].items() if action_type != chosen_action
             ]
         )
 
@@ -18,6 +18,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 
+from .planning import preview_plan
+
 router = APIRouter(
     prefix="/weights",
     tags=["weights"],
@@ -46,7 +48,8 @@ def set_weight_vector(weight_vector: WeightVector):
             "status": "success",
             "message": "Weight vector updated successfully",
             "new_weights": weight_vector.weights,
-            "validation": "change_rules_compliant"
+            "validation": "change_rules_compliant",
+            "preview": preview_plan(weight_vector.weights)
         }
 
     except Exception as e:
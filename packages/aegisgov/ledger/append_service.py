@@ -0,0 +1,151 @@
+"""
+Asynchronous ledger append service with group commit.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Tuple
+
+from .writer import LedgerWriter
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class LedgerAppendService:
+    def __init__(self, writer: LedgerWriter, max_batch: int = 256, max_delay_ms: float = 5.0):
+        """
+        Initialize the append service.
+
+        Callers enqueue decisions and get a future back instead of waiting on
+        their own commit. A single worker thread collects appends for up to
+        ``max_delay_ms`` (or until ``max_batch`` are queued) and writes them
+        with one ``write_decisions`` transaction. Because one thread drains
+        the queue in FIFO order and each batch continues from the ledger tail
+        under an advisory lock, ``prev_decision_id``/``prev_hash`` are
+        assigned in strict append order even with many concurrent callers.
+        If a group commit fails, its halves are retried separately until
+        only the decisions that fail on their own get the error.
+
+        Args:
+            writer: Pooled ledger writer used for group commits
+            max_batch: Maximum decisions per commit
+            max_delay_ms: Maximum time the first queued decision waits for company
+        """
+        self.writer = writer
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopping = False
+        self._stats = {'commits': 0, 'decisions': 0, 'failed_commits': 0}
+
+    def start(self) -> 'LedgerAppendService':
+        """Start the group-commit worker thread."""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='ledger-append', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Flush everything queued so far and stop the worker thread."""
+        if self._thread is not None:
+            self._stopping = True
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def append(self, decision: Dict[str, Any]) -> Future:
+        """
+        Queue a decision for the next group commit.
+
+        Args:
+            decision: Decision with the same keys as ``LedgerWriter.write_decision`` arguments
+
+        Returns:
+            Future: Resolves to the ``write_decisions`` result for this decision
+        """
+        if self._thread is None or self._stopping:
+            raise RuntimeError("Ledger append service is not running")
+        future = Future()
+        self._queue.put((decision, future))
+        return future
+
+    async def append_async(self, decision: Dict[str, Any]) -> Dict:
+        """Awaitable variant of ``append`` for asyncio callers."""
+        return await asyncio.wrap_future(self.append(decision))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return commit counters and the current queue depth."""
+        stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        stats['avg_batch_size'] = stats['decisions'] / stats['commits'] if stats['commits'] else 0.0
+        return stats
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._commit(batch)
+            except Exception:
+                # Never let one batch take down the group-commit thread
+                logger.exception("Ledger group commit failed unexpectedly")
+
+    def _commit(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        # Decisions whose caller cancelled before the commit are not written;
+        # the rest can no longer be cancelled once marked running
+        batch = [(decision, future) for decision, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self._write(batch)
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        decisions = [decision for decision, _ in batch]
+        try:
+            results = self.writer.write_decisions(decisions, link_to_tail=True)
+        except Exception as e:
+            self._stats['failed_commits'] += 1
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # One bad decision must not fail the callers batched with it: retry
+            # each half on its own, left first so append order is kept
+            middle = len(batch) // 2
+            self._write(batch[:middle])
+            self._write(batch[middle:])
+            return
+
+        self._stats['commits'] += 1
+        self._stats['decisions'] += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,355 @@
+"""
+Partition maintenance and archival tier for the decision ledger.
+
+``decisions`` is range-partitioned by month (``decisions_YYYY_MM``). This
+module keeps partitions created ahead of time and moves months older than
+the retention window out of Postgres into compressed segment files
+(gzipped JSONL, or Parquet when pyarrow is installed). Each archived month
+is recorded in ``ledger_archive_segments`` together with its boundary
+hashes and the signed checkpoints that cover it, so the hash chain stays
+verifiable across the hot/archive boundary.
+"""
+
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet segments are optional
+    pa = None
+    pq = None
+
+from .query import DECISION_FIELDS, _row_to_dict
+
+PARTITION_NAME = re.compile(r'^decisions_(\d{4})_(\d{2})$')
+
+# JSON columns are stored as JSON text in Parquet segments
+JSON_FIELDS = ('inputs_bundle', 'objectives', 'options_considered', 'chosen_action',
+               'tests_passed', 'approvals', 'appeals', 'post_hoc_metrics')
+
+def ensure_partitions(conn, months_ahead: int = 3) -> None:
+    """Create partitions for the current month and the next ``months_ahead``."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT ensure_decisions_partitions(%s)", (months_ahead,))
+
+def list_partitions(conn) -> List[Tuple[str, datetime]]:
+    """Return (partition name, month start) for every monthly partition, oldest first."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'decisions'::regclass
+            """
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda p: p[1])
+
+def _next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+class ArchiveStore:
+    """
+    Directory of archived month segments.
+
+    Rows are stored in the same shape the query layer returns: ``ts`` as an
+    ISO 8601 string and hashes as hex.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def segment_path(self, partition_name: str, fmt: str) -> str:
+        suffix = 'jsonl.gz' if fmt == 'jsonl' else 'parquet'
+        return os.path.join(self.root, f"{partition_name}.{suffix}")
+
+    def write_segment(self, partition_name: str, rows: Iterable[Dict[str, Any]],
+                      fmt: str = 'jsonl', batch_size: int = 10000) -> Tuple[str, int, bytes]:
+        """
+        Write rows to a new segment file.
+
+        The file is written under a temporary name and renamed once complete,
+        so a crashed archival run never leaves a partial segment in place.
+
+        Returns:
+            Tuple[str, int, bytes]: Path, row count and SHA-256 of the file
+        """
+        if fmt == 'parquet' and pq is None:
+            raise RuntimeError("Parquet segments require pyarrow")
+        if fmt not in ('jsonl', 'parquet'):
+            raise ValueError(f"Unknown segment format: {fmt}")
+
+        os.makedirs(self.root, exist_ok=True)
+        path = self.segment_path(partition_name, fmt)
+        tmp_path = path + '.tmp'
+        count = 0
+
+        if fmt == 'jsonl':
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, separators=(',', ':')) + '\n')
+                    count += 1
+        else:
+            writer = None
+            batch = []
+            try:
+                for row in rows:
+                    batch.append({k: json.dumps(v) if k in JSON_FIELDS else v for k, v in row.items()})
+                    count += 1
+                    if len(batch) >= batch_size:
+                        table = pa.Table.from_pylist(batch)
+                        writer = writer or pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                        writer.write_table(table)
+                        batch = []
+                if batch or writer is None:
+                    table = pa.Table.from_pylist(batch) if batch else pa.table({f: [] for f in DECISION_FIELDS})
+                    writer = writer or pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        digest = _file_sha256(tmp_path)
+        os.replace(tmp_path, path)
+        return path, count, digest
+
+    def read_segment(self, location: str, fmt: str) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a segment in (ts, decision_id) order."""
+        if fmt == 'jsonl':
+            with gzip.open(location, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+            return
+
+        if pq is None:
+            raise RuntimeError("Parquet segments require pyarrow")
+        for batch in pq.ParquetFile(location).iter_batches():
+            for row in batch.to_pylist():
+                yield {k: json.loads(v) if k in JSON_FIELDS and v is not None else v for k, v in row.items()}
+
+    def segments(self, conn, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, after: Optional[datetime] = None,
+                 descending: bool = False) -> List[Dict[str, Any]]:
+        """
+        Return archived segments overlapping [since, until), oldest first.
+
+        ``after`` is the ``ts`` of a keyset cursor: only segments that can
+        hold rows past it in the read direction are returned.
+        """
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("period_end > %s")
+            params.append(since)
+        if until is not None:
+            conditions.append("period_start < %s")
+            params.append(until)
+        if after is not None:
+            conditions.append("period_start <= %s" if descending else "period_end > %s")
+            params.append(after)
+        sql = "SELECT partition_name, period_start, period_end, format, location FROM ledger_archive_segments"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY period_start"
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [dict(zip(('partition_name', 'period_start', 'period_end', 'format', 'location'), row))
+                    for row in cursor.fetchall()]
+
+    def iter_decisions(self, conn, fields: Sequence[str],
+                       action_type: Optional[str] = None,
+                       appeal_status: Optional[str] = None,
+                       since: Optional[datetime] = None,
+                       until: Optional[datetime] = None,
+                       after: Optional[Tuple[datetime, int]] = None,
+                       descending: bool = False,
+                       limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield archived decisions with the same filters and ordering as the hot query.
+
+        Ascending reads stream each segment. Segments are stored oldest
+        first, so a descending read keeps the ``limit`` newest matches of a
+        segment (the whole segment when unbounded) and reverses them.
+        Naive ``since``/``until`` are taken as UTC, like archived ``ts`` values.
+        """
+        since, until = _as_utc(since), _as_utc(until)
+        if after is not None:
+            after = (_as_utc(after[0]), after[1])
+
+        def keep(row):
+            if not _matches(row, action_type, appeal_status, since, until):
+                return False
+            if after is not None:
+                key = _row_key(row)
+                return key < after if descending else key > after
+            return True
+
+        # Segments wholly on the far side of the cursor are never opened, so a
+        # page costs the segments it reads rather than the whole archive
+        segments = self.segments(conn, since, until, after[0] if after is not None else None, descending)
+        if descending:
+            segments.reverse()
+
+        for segment in segments:
+            rows = (row for row in self.read_segment(segment['location'], segment['format']) if keep(row))
+            if descending:
+                rows = (heapq.nlargest(limit, rows, key=_row_key) if limit is not None
+                        else sorted(rows, key=_row_key, reverse=True))
+            for row in rows:
+                yield {f: row.get(f) for f in fields}
+
+def _file_sha256(path: str) -> bytes:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.digest()
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Make a datetime timezone-aware, reading naive values as UTC."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+def _row_key(row: Dict[str, Any]) -> Tuple[datetime, int]:
+    return datetime.fromisoformat(row['ts']), row['decision_id']
+
+def _matches(row: Dict[str, Any], action_type: Optional[str], appeal_status: Optional[str],
+             since: Optional[datetime], until: Optional[datetime]) -> bool:
+    if action_type is not None and (row.get('chosen_action') or {}).get('action_type') != action_type:
+        return False
+    if appeal_status is not None and (row.get('appeals') or {}).get('status') != appeal_status:
+        return False
+    if since is not None or until is not None:
+        ts = datetime.fromisoformat(row['ts'])
+        if since is not None and ts < since:
+            return False
+        if until is not None and ts >= until:
+            return False
+    return True
+
+def archive_partitions(conn, store: ArchiveStore, keep_months: int = 12,
+                       fmt: str = 'jsonl', now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Move partitions older than ``keep_months`` into archive segments.
+
+    For each month: stream the partition to a segment file, record the
+    segment with its boundary hashes and covering checkpoints, then detach
+    and drop the partition in the same transaction as the record.
+
+    Args:
+        conn: Database connection (not autocommit; committed per partition)
+        store: Segment destination
+        keep_months: Months kept in Postgres, including the current one
+        fmt: 'jsonl' (gzip) or 'parquet'
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        List[Dict]: The segments written
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(keep_months - 1):
+        cutoff = cutoff.replace(year=cutoff.year - (cutoff.month == 1), month=(cutoff.month - 2) % 12 + 1)
+
+    archived = []
+    for partition_name, month in list_partitions(conn):
+        if _next_month(month) > cutoff:
+            break
+
+        summary = {'first_decision_id': None, 'last_decision_id': None,
+                   'first_prev_hash': None, 'last_hash': None}
+
+        def rows():
+            with conn.cursor(name='ledger_archive') as cursor:
+                cursor.itersize = 10000
+                cursor.execute(
+                    f"SELECT {', '.join(DECISION_FIELDS)} FROM {partition_name} ORDER BY ts, decision_id"
+                )
+                for row in cursor:
+                    decision = _row_to_dict(list(DECISION_FIELDS), row)
+                    # The chain ends of the month are its lowest and highest decision_id
+                    if summary['first_decision_id'] is None or decision['decision_id'] < summary['first_decision_id']:
+                        summary['first_decision_id'] = decision['decision_id']
+                        summary['first_prev_hash'] = decision['prev_hash']
+                    if summary['last_decision_id'] is None or decision['decision_id'] > summary['last_decision_id']:
+                        summary['last_decision_id'] = decision['decision_id']
+                        summary['last_hash'] = decision['curr_hash']
+                    yield decision
+
+        location, row_count, digest = store.write_segment(partition_name, rows(), fmt)
+
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT decision_id, encode(curr_hash, 'hex'), verified_count, encode(signature, 'hex')
+                FROM ledger_checkpoints
+                WHERE decision_id BETWEEN %s AND %s
+                ORDER BY decision_id
+                """,
+                (summary['first_decision_id'], summary['last_decision_id'])
+            )
+            checkpoints = [dict(zip(('decision_id', 'curr_hash', 'verified_count', 'signature'), row))
+                           for row in cursor.fetchall()]
+
+            segment = {
+                'partition_name': partition_name,
+                'period_start': month,
+                'period_end': _next_month(month),
+                **summary,
+                'row_count': row_count,
+                'format': fmt,
+                'location': location,
+                'sha256': digest.hex(),
+                'checkpoints': checkpoints
+            }
+            cursor.execute(
+                """
+                INSERT INTO ledger_archive_segments
+                    (partition_name, period_start, period_end, first_decision_id, last_decision_id,
+                     first_prev_hash, last_hash, row_count, format, location, sha256, checkpoints)
+                VALUES (%s, %s, %s, %s, %s, decode(%s, 'hex'), decode(%s, 'hex'), %s, %s, %s, %s, %s)
+                """,
+                (partition_name, segment['period_start'], segment['period_end'],
+                 summary['first_decision_id'], summary['last_decision_id'],
+                 summary['first_prev_hash'], summary['last_hash'], row_count, fmt, location,
+                 psycopg2.Binary(digest), json.dumps(checkpoints))
+            )
+            cursor.execute(f"ALTER TABLE decisions DETACH PARTITION {partition_name}")
+            cursor.execute(f"DROP TABLE {partition_name}")
+        conn.commit()
+        archived.append(segment)
+
+    return archived
+
+if __name__ == '__main__':
+    # Run daily (e.g. from cron): keep partitions ahead of inserts and archive old months
+    connection = psycopg2.connect(os.environ['DATABASE_URL'])
+    try:
+        ensure_partitions(connection, int(os.getenv('LEDGER_PARTITIONS_AHEAD', '3')))
+        connection.commit()
+        for written in archive_partitions(
+            connection,
+            ArchiveStore(os.environ['LEDGER_ARCHIVE_DIR']),
+            keep_months=int(os.getenv('LEDGER_HOT_MONTHS', '12')),
+            fmt=os.getenv('LEDGER_ARCHIVE_FORMAT', 'jsonl')
+        ):
+            print(f"Archived {written['partition_name']}: {written['row_count']} decisions -> {written['location']}")
+    finally:
+        connection.close()
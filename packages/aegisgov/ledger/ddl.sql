@@ -18,7 +18,7 @@
 CREATE EXTENSION IF NOT EXISTS pgcrypto;
 
 CREATE TABLE decisions (
-  decision_id BIGSERIAL PRIMARY KEY,
+  decision_id BIGSERIAL,
   ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
   prev_decision_id BIGINT,
   inputs_bundle JSONB NOT NULL,
@@ -30,32 +30,146 @@ CREATE TABLE decisions (
   appeals JSONB,
   post_hoc_metrics JSONB,
   prev_hash BYTEA,
-  curr_hash BYTEA,
-  UNIQUE (curr_hash)
+  curr_hash BYTEA NOT NULL,
+  -- Canonical hash of the payload alone; LedgerWriter's idempotency key
+  payload_hash BYTEA NOT NULL,
+  -- 1: sha256 over jsonb text (rows before canonical hashing), 2: canonical CBOR
+  hash_version SMALLINT NOT NULL DEFAULT 2,
+  -- The partition key must be part of every unique constraint
+  PRIMARY KEY (decision_id, ts)
+) PARTITION BY RANGE (ts);
+
+-- Months moved out of Postgres by ledger.archive
+CREATE TABLE ledger_archive_segments (
+  segment_id BIGSERIAL PRIMARY KEY,
+  partition_name TEXT NOT NULL UNIQUE,
+  period_start TIMESTAMPTZ NOT NULL,
+  period_end TIMESTAMPTZ NOT NULL,
+  first_decision_id BIGINT,
+  last_decision_id BIGINT,
+  first_prev_hash BYTEA,
+  last_hash BYTEA,
+  row_count BIGINT NOT NULL,
+  format TEXT NOT NULL,
+  location TEXT NOT NULL,
+  sha256 BYTEA NOT NULL,
+  checkpoints JSONB NOT NULL DEFAULT '[]',
+  archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
-CREATE OR REPLACE FUNCTION compute_hashes() RETURNS TRIGGER AS $$
-DECLARE payload TEXT;
+CREATE INDEX idx_archive_segments_period ON ledger_archive_segments (period_start, period_end);
+CREATE INDEX idx_archive_segments_last_decision ON ledger_archive_segments (last_decision_id);
+
+-- curr_hash is computed by LedgerWriter over canonical CBOR (hash_version 2);
+-- the trigger only checks that prev_hash is the stored hash of the parent
+CREATE OR REPLACE FUNCTION check_hash_link() RETURNS TRIGGER AS $$
+DECLARE parent_hash BYTEA;
 BEGIN
-  IF NEW.prev_decision_id IS NOT NULL THEN
-    SELECT curr_hash INTO NEW.prev_hash FROM decisions WHERE decision_id = NEW.prev_decision_id;
+  IF NEW.prev_decision_id IS NULL THEN
+    IF NEW.prev_hash IS NOT NULL THEN
+      RAISE EXCEPTION 'decision % has prev_hash without prev_decision_id', NEW.decision_id;
+    END IF;
+    RETURN NEW;
+  END IF;
+  SELECT curr_hash INTO parent_hash FROM decisions WHERE decision_id = NEW.prev_decision_id;
+  -- A parent in an archived month is the last decision of its segment
+  IF NOT FOUND THEN
+    SELECT last_hash INTO parent_hash FROM ledger_archive_segments
+    WHERE last_decision_id = NEW.prev_decision_id;
+  END IF;
+  IF parent_hash IS NULL OR NEW.prev_hash IS DISTINCT FROM parent_hash THEN
+    RAISE EXCEPTION 'prev_hash of decision % does not match decision %',
+      NEW.decision_id, NEW.prev_decision_id;
   END IF;
-  payload := COALESCE(encode(NEW.prev_hash,'hex'),'') || '|' ||
-             COALESCE(NEW.inputs_bundle::text,'') || '|' ||
-             COALESCE(NEW.objectives::text,'') || '|' ||
-             COALESCE(NEW.options_considered::text,'') || '|' ||
-             COALESCE(NEW.chosen_action::text,'') || '|' ||
-             COALESCE(NEW.tests_passed::text,'');
-  NEW.curr_hash := digest(payload, 'sha256');
   RETURN NEW;
 END $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_compute_hashes
+CREATE TRIGGER trg_check_hash_link
+BEFORE INSERT ON decisions
+FOR EACH ROW EXECUTE FUNCTION check_hash_link();
+
+-- One decision per payload across all partitions (a unique index on the
+-- partitioned table would have to include ts); kept when months are archived
+CREATE TABLE decision_payload_keys (
+  payload_hash BYTEA PRIMARY KEY,
+  decision_id BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION record_payload_key() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO decision_payload_keys (payload_hash, decision_id)
+  VALUES (NEW.payload_hash, NEW.decision_id);
+  RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_record_payload_key
 BEFORE INSERT ON decisions
-FOR EACH ROW EXECUTE FUNCTION compute_hashes();
+FOR EACH ROW EXECUTE FUNCTION record_payload_key();
 
 CREATE INDEX idx_decisions_ts ON decisions (ts);
 CREATE INDEX idx_decisions_appeals ON decisions USING GIN (appeals);
+CREATE INDEX idx_decisions_curr_hash ON decisions (curr_hash);
+CREATE INDEX idx_decisions_payload_hash ON decisions (payload_hash);
+
+-- Monthly partitions named decisions_YYYY_MM, bounded at UTC month starts
+CREATE OR REPLACE FUNCTION create_decisions_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+  month_start TIMESTAMPTZ := date_trunc('month', month::timestamp) AT TIME ZONE 'UTC';
+  partition_name TEXT := 'decisions_' || to_char(month, 'YYYY_MM');
+BEGIN
+  EXECUTE format(
+    'CREATE TABLE IF NOT EXISTS %I PARTITION OF decisions FOR VALUES FROM (%L) TO (%L)',
+    partition_name, month_start, month_start + INTERVAL '1 month'
+  );
+  RETURN partition_name;
+END $$ LANGUAGE plpgsql;
+
+-- Run ahead of inserts by the ledger.archive maintenance job
+CREATE OR REPLACE FUNCTION ensure_decisions_partitions(months_ahead INT DEFAULT 3) RETURNS VOID AS $$
+BEGIN
+  FOR i IN 0..months_ahead LOOP
+    PERFORM create_decisions_partition(
+      (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => i))::date
+    );
+  END LOOP;
+END $$ LANGUAGE plpgsql;
+
+SELECT ensure_decisions_partitions(3);
+
+-- Signed checkpoints written by ledger.verifier; audits resume from the latest
+CREATE TABLE ledger_checkpoints (
+  checkpoint_id BIGSERIAL PRIMARY KEY,
+  decision_id BIGINT NOT NULL UNIQUE,
+  curr_hash BYTEA NOT NULL,
+  verified_count BIGINT NOT NULL,
+  signature BYTEA NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Merkle roots over contiguous decision ranges, sealed daily by ledger.merkle
+CREATE TABLE ledger_batches (
+  batch_id BIGSERIAL PRIMARY KEY,
+  period_start TIMESTAMPTZ NOT NULL,
+  period_end TIMESTAMPTZ NOT NULL,
+  first_decision_id BIGINT NOT NULL UNIQUE,
+  last_decision_id BIGINT NOT NULL UNIQUE,
+  leaf_count INTEGER NOT NULL,
+  merkle_root BYTEA NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Every node of each batch's tree, so inclusion proofs read O(log n) rows;
+-- leaves (level 0) carry their decision_id
+CREATE TABLE ledger_batch_nodes (
+  batch_id BIGINT NOT NULL,
+  level SMALLINT NOT NULL,
+  node_index BIGINT NOT NULL,
+  hash BYTEA NOT NULL,
+  decision_id BIGINT,
+  PRIMARY KEY (batch_id, level, node_index)
+);
+
+CREATE UNIQUE INDEX idx_ledger_batch_nodes_decision ON ledger_batch_nodes (decision_id);
 
 
 
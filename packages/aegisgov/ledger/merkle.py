@@ -0,0 +1,405 @@
+"""
+Merkle-tree batch commitments for the decision ledger.
+
+Decisions are sealed into batches (one per UTC day) and the Merkle root of
+each batch's ``curr_hash`` values is stored in ``ledger_batches``. Any single
+decision can then be proven to be part of a committed batch with
+O(log n) sibling hashes instead of walking the hash chain.
+
+Trees follow RFC 6962/9162: leaves are hashed as ``SHA-256(0x00 || curr_hash)``
+and interior nodes as ``SHA-256(0x01 || left || right)``, with the left
+subtree always the largest power of two below the leaf count, so no leaf is
+ever duplicated.
+
+The same tree can be read level by level: node ``i`` of level ``L`` covers
+leaves ``[i * 2**L, (i + 1) * 2**L)`` (cut off at the leaf count), and the
+last node of a level without a sibling is carried up unchanged. Every node
+is stored in ``ledger_batch_nodes`` when a batch is sealed, so a proof reads
+its O(log n) siblings instead of rebuilding the tree.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+# Decisions younger than this are left for the next run, so transactions
+# still committing around midnight land in a later batch instead of
+# changing a sealed one.
+SEAL_GRACE = timedelta(minutes=5)
+
+# Tree nodes are inserted in pages of this many rows while a batch is sealed
+NODE_PAGE_SIZE = 10000
+
+# (level, node_index, hash, decision_id); decision_id is set on leaves only
+TreeNode = Tuple[int, int, bytes, Optional[int]]
+
+def leaf_hash(curr_hash: bytes) -> bytes:
+    """Hash a decision's curr_hash as a Merkle leaf."""
+    return hashlib.sha256(b'\x00' + bytes(curr_hash)).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash two child nodes into their parent."""
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+class MerkleTreeBuilder:
+    """
+    Compute a Merkle root incrementally from a stream of leaves.
+
+    Only the roots of the perfect subtrees seen so far are kept (at most
+    log2(n) hashes), so arbitrarily large batches are sealed in constant
+    memory. The nodes each leaf completes are returned as it is appended
+    and the right edge of the tree by ``edge_nodes``, so together they
+    describe every node without holding the tree.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._stack: List[Tuple[int, bytes]] = []
+
+    def append(self, curr_hash: bytes, decision_id: Optional[int] = None) -> List[TreeNode]:
+        """
+        Add the next decision's curr_hash as a leaf.
+
+        Returns:
+            List[TreeNode]: The leaf and the perfect subtree roots it completes
+        """
+        size, node = 1, leaf_hash(curr_hash)
+        self.size += 1
+        nodes = [(0, self.size - 1, node, decision_id)]
+        while self._stack and self._stack[-1][0] == size:
+            left_size, left = self._stack.pop()
+            size, node = left_size + size, node_hash(left, node)
+            level = size.bit_length() - 1
+            nodes.append((level, (self.size >> level) - 1, node, None))
+        self._stack.append((size, node))
+        return nodes
+
+    def edge_nodes(self) -> List[TreeNode]:
+        """
+        Return the nodes over the incomplete right edge of the tree.
+
+        At each level whose last node covers fewer than ``2**level`` leaves,
+        that node is the root of the trailing perfect subtrees; the last
+        one returned is the tree's root unless the leaf count is a power
+        of two.
+        """
+        nodes = []
+        for level in range(1, (self.size - 1).bit_length() + 1):
+            if self.size % (1 << level) == 0:
+                continue
+            tail = [node for size, node in self._stack if size < 1 << level]
+            node = tail[-1]
+            for left in reversed(tail[:-1]):
+                node = node_hash(left, node)
+            nodes.append((level, self.size >> level, node, None))
+        return nodes
+
+    def root(self) -> bytes:
+        """Return the root of all leaves appended so far."""
+        if not self._stack:
+            return hashlib.sha256(b'').digest()
+        node = self._stack[-1][1]
+        for _, left in reversed(self._stack[:-1]):
+            node = node_hash(left, node)
+        return node
+
+def _subtree_root(leaves: List[bytes], start: int, end: int) -> bytes:
+    if end - start == 1:
+        return leaves[start]
+    split = 1 << ((end - start - 1).bit_length() - 1)
+    return node_hash(_subtree_root(leaves, start, start + split),
+                     _subtree_root(leaves, start + split, end))
+
+def merkle_root(curr_hashes: List[bytes]) -> bytes:
+    """Return the Merkle root of a list of curr_hash values."""
+    builder = MerkleTreeBuilder()
+    for curr_hash in curr_hashes:
+        builder.append(curr_hash)
+    return builder.root()
+
+def inclusion_proof(curr_hashes: List[bytes], index: int) -> List[bytes]:
+    """
+    Return the audit path for the leaf at ``index``.
+
+    Args:
+        curr_hashes: All curr_hash values of the batch, in decision_id order
+        index: Position of the decision within the batch
+
+    Returns:
+        List[bytes]: Sibling hashes from the leaf up to the root
+    """
+    if not 0 <= index < len(curr_hashes):
+        raise IndexError(f"Leaf index {index} outside batch of {len(curr_hashes)}")
+    leaves = [leaf_hash(h) for h in curr_hashes]
+    path = []
+    start, end = 0, len(leaves)
+    # Descend from the root, collecting the sibling of each subtree we enter
+    while end - start > 1:
+        split = start + (1 << ((end - start - 1).bit_length() - 1))
+        if index < split:
+            path.append(_subtree_root(leaves, split, end))
+            end = split
+        else:
+            path.append(_subtree_root(leaves, start, split))
+            start = split
+    path.reverse()
+    return path
+
+def proof_nodes(index: int, tree_size: int) -> List[Tuple[int, int]]:
+    """
+    Return the (level, node_index) of every sibling on a leaf's audit path.
+
+    The positions are in proof order, from the leaf up to the root; a node
+    carried up without a sibling contributes nothing.
+    """
+    if not 0 <= index < tree_size:
+        raise IndexError(f"Leaf index {index} outside batch of {tree_size}")
+    positions = []
+    level = 0
+    while (tree_size - 1) >> level:
+        sibling = index ^ 1
+        if sibling <= (tree_size - 1) >> level:
+            positions.append((level, sibling))
+        index >>= 1
+        level += 1
+    return positions
+
+def tree_nodes(leaves: Iterable[Tuple[int, bytes]]) -> Iterator[TreeNode]:
+    """Yield every node of the tree over (decision_id, curr_hash) pairs."""
+    builder = MerkleTreeBuilder()
+    for decision_id, curr_hash in leaves:
+        yield from builder.append(bytes(curr_hash), decision_id)
+    yield from builder.edge_nodes()
+
+def _insert_nodes(cursor, batch_id: int, nodes: List[TreeNode]) -> None:
+    execute_values(
+        cursor,
+        "INSERT INTO ledger_batch_nodes (batch_id, level, node_index, hash, decision_id) VALUES %s",
+        [(batch_id, level, index, psycopg2.Binary(node), decision_id)
+         for level, index, node, decision_id in nodes],
+        page_size=len(nodes)
+    )
+
+def verify_inclusion(curr_hash: bytes, index: int, tree_size: int,
+                     proof: List[bytes], root: bytes) -> bool:
+    """
+    Check an inclusion proof against a committed root (RFC 9162 section 2.1.3.2).
+
+    Returns:
+        bool: True if the decision is leaf ``index`` of the tree with this root
+    """
+    if not 0 <= index < tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    node = leaf_hash(curr_hash)
+    for sibling in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            node = node_hash(sibling, node)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            node = node_hash(node, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and node == root
+
+def seal_batches(conn, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Commit Merkle roots for every complete UTC day not yet sealed.
+
+    Batches cover contiguous decision_id ranges, continuing after the last
+    sealed decision, so every decision belongs to exactly one batch. Every
+    node of each batch's tree is written to ``ledger_batch_nodes`` as the
+    decisions are streamed, for ``get_inclusion_proof``.
+
+    Args:
+        conn: Database connection (committed by the caller)
+        until: Seal decisions with ``ts`` before this instant (defaults to the
+            start of the current UTC day, minus the grace period)
+
+    Returns:
+        List[Dict]: The batches written
+    """
+    if until is None:
+        until = (datetime.now(timezone.utc) - SEAL_GRACE).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    with conn.cursor() as cursor:
+        # Only one sealer may extend the batch sequence at a time
+        cursor.execute("LOCK TABLE ledger_batches IN EXCLUSIVE MODE")
+        cursor.execute("SELECT COALESCE(MAX(last_decision_id), 0) FROM ledger_batches")
+        last_sealed = cursor.fetchone()[0]
+
+    batches = []
+    current_day, builder, first_id, last_id, batch_id = None, None, None, None, None
+    pending: List[TreeNode] = []
+
+    with conn.cursor() as writer:
+        def flush_nodes():
+            if pending:
+                _insert_nodes(writer, batch_id, pending)
+                pending.clear()
+
+        def close_batch():
+            pending.extend(builder.edge_nodes())
+            flush_nodes()
+            batches.append({
+                'batch_id': batch_id,
+                'period_start': current_day,
+                'period_end': current_day + timedelta(days=1),
+                'first_decision_id': first_id,
+                'last_decision_id': last_id,
+                'leaf_count': builder.size,
+                'merkle_root': builder.root()
+            })
+
+        # Server-side cursor: a day of decisions is streamed, not loaded
+        with conn.cursor(name='ledger_seal') as cursor:
+            cursor.itersize = 10000
+            cursor.execute(
+                """
+                SELECT decision_id, ts, date_trunc('day', ts AT TIME ZONE 'UTC') AS day, curr_hash
+                FROM decisions
+                WHERE decision_id > %s
+                ORDER BY decision_id
+                """,
+                (last_sealed,)
+            )
+            for decision_id, ts, day, curr_hash in cursor:
+                # Stop at the first unsealable decision so batches stay contiguous
+                if ts >= until:
+                    break
+                day = day.replace(tzinfo=timezone.utc)
+                if current_day is not None and day > current_day:
+                    close_batch()
+                    builder = None
+                if builder is None:
+                    current_day, builder, first_id = day, MerkleTreeBuilder(), decision_id
+                    # Reserved up front so the nodes can be written before the batch row
+                    writer.execute("SELECT nextval(pg_get_serial_sequence('ledger_batches', 'batch_id'))")
+                    batch_id = writer.fetchone()[0]
+                pending.extend(builder.append(bytes(curr_hash), decision_id))
+                last_id = decision_id
+                if len(pending) >= NODE_PAGE_SIZE:
+                    flush_nodes()
+            if builder is not None:
+                close_batch()
+
+        for batch in batches:
+            writer.execute(
+                """
+                INSERT INTO ledger_batches
+                    (batch_id, period_start, period_end, first_decision_id, last_decision_id,
+                     leaf_count, merkle_root)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (batch['batch_id'], batch['period_start'], batch['period_end'], batch['first_decision_id'],
+                 batch['last_decision_id'], batch['leaf_count'], psycopg2.Binary(batch['merkle_root']))
+            )
+    return batches
+
+def _archived_curr_hash(conn, archive, decision_id: int, period_start: datetime,
+                        period_end: datetime) -> Optional[bytes]:
+    """Find a decision's hash in the archive segment covering its batch's day."""
+    for row in archive.iter_decisions(conn, ['decision_id', 'curr_hash'], since=period_start, until=period_end):
+        if row['decision_id'] == decision_id:
+            return bytes.fromhex(row['curr_hash'])
+    return None
+
+def get_inclusion_proof(conn, decision_id: int, archive=None) -> Optional[Dict[str, Any]]:
+    """
+    Build the inclusion proof for one decision from its batch's stored tree.
+
+    Only the decision's leaf and its O(log n) siblings are read; the proof
+    is checked against the committed root before it is returned. Batch trees
+    outlive archival, so a decision whose month has left Postgres is proven
+    with its hash read back from ``archive``.
+
+    Args:
+        conn: Database connection
+        decision_id: Decision to prove
+        archive: ``ArchiveStore`` holding archived months, if any
+
+    Returns:
+        Optional[Dict]: Proof with hex-encoded hashes, or None if the decision
+        is not in a sealed batch (or is archived and no archive was given)
+
+    Raises:
+        ValueError: If the decision or the stored tree no longer produce the
+            batch's committed root
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT b.batch_id, b.period_start, b.period_end, b.leaf_count, b.merkle_root,
+                   n.node_index, n.hash
+            FROM ledger_batch_nodes n
+            JOIN ledger_batches b ON b.batch_id = n.batch_id
+            WHERE n.decision_id = %s AND n.level = 0
+            """,
+            (decision_id,)
+        )
+        leaf = cursor.fetchone()
+        if leaf is None:
+            return None
+        batch_id, period_start, period_end, leaf_count, root, index, stored_leaf = leaf
+        root = bytes(root)
+
+        cursor.execute("SELECT curr_hash FROM decisions WHERE decision_id = %s", (decision_id,))
+        row = cursor.fetchone()
+        if row is not None:
+            curr_hash = bytes(row[0])
+        elif archive is not None:
+            curr_hash = _archived_curr_hash(conn, archive, decision_id, period_start, period_end)
+        else:
+            curr_hash = None
+        if curr_hash is None:
+            return None
+        if leaf_hash(curr_hash) != bytes(stored_leaf):
+            raise ValueError(f"Decision {decision_id} no longer matches its leaf in batch {batch_id}")
+
+        positions = proof_nodes(index, leaf_count)
+        siblings = {}
+        if positions:
+            cursor.execute(
+                "SELECT level, node_index, hash FROM ledger_batch_nodes "
+                "WHERE batch_id = %s AND (level, node_index) IN %s",
+                (batch_id, tuple(positions))
+            )
+            siblings = {(level, node_index): bytes(node) for level, node_index, node in cursor.fetchall()}
+
+    if len(siblings) != len(positions):
+        raise ValueError(f"Batch {batch_id} is missing nodes of its Merkle tree")
+    proof = [siblings[position] for position in positions]
+    if not verify_inclusion(curr_hash, index, leaf_count, proof, root):
+        raise ValueError(f"Batch {batch_id} no longer matches its committed Merkle root")
+
+    return {
+        'decision_id': decision_id,
+        'curr_hash': curr_hash.hex(),
+        'batch_id': batch_id,
+        'period_start': period_start.isoformat(),
+        'period_end': period_end.isoformat(),
+        'leaf_index': index,
+        'tree_size': leaf_count,
+        'merkle_root': root.hex(),
+        'proof': [h.hex() for h in proof]
+    }
+
+if __name__ == '__main__':
+    # Run daily (e.g. from cron) to seal the previous day's decisions
+    connection = psycopg2.connect(os.environ['DATABASE_URL'])
+    try:
+        with connection:
+            for sealed in seal_batches(connection):
+                print(f"Sealed batch {sealed['batch_id']}: decisions "
+                      f"{sealed['first_decision_id']}-{sealed['last_decision_id']} "
+                      f"({sealed['leaf_count']}) root {sealed['merkle_root'].hex()}")
+    finally:
+        connection.close()
@@ -0,0 +1,29 @@
+"""
+Add signed verification checkpoints for the decision hash chain.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Create the ledger_checkpoints table."""
+    # One row per verified prefix of the chain, signed by the verifier
+    op.create_table(
+        'ledger_checkpoints',
+        sa.Column('checkpoint_id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('decision_id', sa.BigInteger(), nullable=False, unique=True),
+        sa.Column('curr_hash', sa.LargeBinary(), nullable=False),
+        sa.Column('verified_count', sa.BigInteger(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    )
+
+def downgrade():
+    """Drop the ledger_checkpoints table."""
+    op.drop_table('ledger_checkpoints')
@@ -0,0 +1,31 @@
+"""
+Add Merkle-tree batch commitments for the decision ledger.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Create the ledger_batches table."""
+    # One Merkle root per sealed, contiguous range of decisions
+    op.create_table(
+        'ledger_batches',
+        sa.Column('batch_id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('period_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('period_end', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('first_decision_id', sa.BigInteger(), nullable=False, unique=True),
+        sa.Column('last_decision_id', sa.BigInteger(), nullable=False, unique=True),
+        sa.Column('leaf_count', sa.Integer(), nullable=False),
+        sa.Column('merkle_root', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    )
+
+def downgrade():
+    """Drop the ledger_batches table."""
+    op.drop_table('ledger_batches')
@@ -0,0 +1,204 @@
+"""
+Partition the decisions table by month and add the archive segment index.
+
+Postgres requires the partition key in every unique constraint, so the
+primary key becomes (decision_id, ts) and curr_hash is indexed per
+partition instead of globally unique. Global uniqueness of decisions is
+restored by the decision_payload_keys table in 0007.
+"""
+
+from alembic import op
+
+# Revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+DECISION_COLUMNS = """
+    decision_id, ts, prev_decision_id, inputs_bundle, objectives,
+    options_considered, chosen_action, tests_passed,
+    approvals, appeals, post_hoc_metrics, prev_hash, curr_hash
+"""
+
+def compute_hashes_function(parent_lookup: str) -> str:
+    return f"""
+    CREATE OR REPLACE FUNCTION compute_hashes() RETURNS TRIGGER AS $$
+    DECLARE payload TEXT;
+    BEGIN
+      IF NEW.prev_decision_id IS NOT NULL THEN
+        {parent_lookup}
+      END IF;
+      payload := COALESCE(encode(NEW.prev_hash,'hex'),'') || '|' ||
+                 COALESCE(NEW.inputs_bundle::text,'') || '|' ||
+                 COALESCE(NEW.objectives::text,'') || '|' ||
+                 COALESCE(NEW.options_considered::text,'') || '|' ||
+                 COALESCE(NEW.chosen_action::text,'') || '|' ||
+                 COALESCE(NEW.tests_passed::text,'');
+      NEW.curr_hash := digest(payload, 'sha256');
+      RETURN NEW;
+    END $$ LANGUAGE plpgsql;
+    """
+
+HOT_PARENT_LOOKUP = """
+        SELECT curr_hash INTO NEW.prev_hash FROM decisions WHERE decision_id = NEW.prev_decision_id;
+"""
+
+# A parent in an archived month is the last decision of its segment
+ARCHIVED_PARENT_LOOKUP = """
+        SELECT curr_hash INTO NEW.prev_hash FROM decisions WHERE decision_id = NEW.prev_decision_id;
+        IF NOT FOUND THEN
+          SELECT last_hash INTO NEW.prev_hash FROM ledger_archive_segments
+          WHERE last_decision_id = NEW.prev_decision_id;
+        END IF;
+"""
+
+COMPUTE_HASHES_TRIGGER = """
+    CREATE TRIGGER trg_compute_hashes
+    BEFORE INSERT ON decisions
+    FOR EACH ROW EXECUTE FUNCTION compute_hashes();
+"""
+
+def upgrade():
+    """Move decisions into a monthly range-partitioned table."""
+    # Keep the existing rows (and the id sequence) aside while the new table is built
+    op.execute("DROP TRIGGER IF EXISTS trg_compute_hashes ON decisions")
+    op.execute("ALTER TABLE decisions RENAME TO decisions_unpartitioned")
+    op.execute("ALTER TABLE decisions_unpartitioned RENAME CONSTRAINT decisions_pkey TO decisions_unpartitioned_pkey")
+    op.execute("ALTER INDEX idx_decisions_ts RENAME TO idx_decisions_unpartitioned_ts")
+    op.execute("ALTER INDEX idx_decisions_appeals RENAME TO idx_decisions_unpartitioned_appeals")
+
+    op.execute("""
+    CREATE TABLE decisions (
+      decision_id BIGINT NOT NULL DEFAULT nextval('decisions_decision_id_seq'),
+      ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      prev_decision_id BIGINT,
+      inputs_bundle JSONB NOT NULL,
+      objectives JSONB NOT NULL,
+      options_considered JSONB NOT NULL,
+      chosen_action JSONB NOT NULL,
+      tests_passed JSONB NOT NULL,
+      approvals JSONB,
+      appeals JSONB,
+      post_hoc_metrics JSONB,
+      prev_hash BYTEA,
+      curr_hash BYTEA NOT NULL,
+      PRIMARY KEY (decision_id, ts)
+    ) PARTITION BY RANGE (ts)
+    """)
+    op.execute("ALTER SEQUENCE decisions_decision_id_seq OWNED BY decisions.decision_id")
+
+    # Indexes on the parent are created on every partition automatically
+    op.execute("CREATE INDEX idx_decisions_ts ON decisions (ts)")
+    op.execute("CREATE INDEX idx_decisions_appeals ON decisions USING GIN (appeals)")
+    op.execute("CREATE INDEX idx_decisions_curr_hash ON decisions (curr_hash)")
+
+    # Partitions are named decisions_YYYY_MM and bounded at UTC month starts
+    op.execute("""
+    CREATE OR REPLACE FUNCTION create_decisions_partition(month DATE) RETURNS TEXT AS $$
+    DECLARE
+      month_start TIMESTAMPTZ := date_trunc('month', month::timestamp) AT TIME ZONE 'UTC';
+      partition_name TEXT := 'decisions_' || to_char(month, 'YYYY_MM');
+    BEGIN
+      EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF decisions FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_start + INTERVAL '1 month'
+      );
+      RETURN partition_name;
+    END $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION ensure_decisions_partitions(months_ahead INT DEFAULT 3) RETURNS VOID AS $$
+    BEGIN
+      FOR i IN 0..months_ahead LOOP
+        PERFORM create_decisions_partition(
+          (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => i))::date
+        );
+      END LOOP;
+    END $$ LANGUAGE plpgsql;
+    """)
+
+    # One partition per month that already has decisions, then the months ahead
+    op.execute("""
+    DO $$
+    DECLARE month_start TIMESTAMP;
+    BEGIN
+      FOR month_start IN
+        SELECT generate_series(
+          (SELECT date_trunc('month', COALESCE(MIN(ts), NOW()) AT TIME ZONE 'UTC') FROM decisions_unpartitioned),
+          date_trunc('month', NOW() AT TIME ZONE 'UTC'),
+          INTERVAL '1 month'
+        )
+      LOOP
+        PERFORM create_decisions_partition(month_start::date);
+      END LOOP;
+      PERFORM ensure_decisions_partitions(3);
+    END $$;
+    """)
+
+    # Copy before the trigger exists so stored hashes are kept as they are
+    op.execute(f"""
+    INSERT INTO decisions ({DECISION_COLUMNS})
+    SELECT decision_id, ts, prev_decision_id, inputs_bundle::jsonb, objectives::jsonb,
+           options_considered::jsonb, chosen_action::jsonb, tests_passed::jsonb,
+           approvals::jsonb, appeals::jsonb, post_hoc_metrics::jsonb, prev_hash, curr_hash
+    FROM decisions_unpartitioned
+    """)
+    op.execute(COMPUTE_HASHES_TRIGGER)
+    op.execute("DROP TABLE decisions_unpartitioned")
+
+    # Months moved out of Postgres by ledger.archive
+    op.execute("""
+    CREATE TABLE ledger_archive_segments (
+      segment_id BIGSERIAL PRIMARY KEY,
+      partition_name TEXT NOT NULL UNIQUE,
+      period_start TIMESTAMPTZ NOT NULL,
+      period_end TIMESTAMPTZ NOT NULL,
+      first_decision_id BIGINT,
+      last_decision_id BIGINT,
+      first_prev_hash BYTEA,
+      last_hash BYTEA,
+      row_count BIGINT NOT NULL,
+      format TEXT NOT NULL,
+      location TEXT NOT NULL,
+      sha256 BYTEA NOT NULL,
+      checkpoints JSONB NOT NULL DEFAULT '[]',
+      archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """)
+    op.execute("CREATE INDEX idx_archive_segments_period ON ledger_archive_segments (period_start, period_end)")
+    op.execute("CREATE INDEX idx_archive_segments_last_decision ON ledger_archive_segments (last_decision_id)")
+    op.execute(compute_hashes_function(ARCHIVED_PARENT_LOOKUP))
+
+def downgrade():
+    """Fold the partitions back into one table (archived months stay archived)."""
+    op.execute(compute_hashes_function(HOT_PARENT_LOOKUP))
+    op.execute("DROP TABLE ledger_archive_segments")
+    op.execute("DROP TRIGGER IF EXISTS trg_compute_hashes ON decisions")
+    op.execute("ALTER TABLE decisions RENAME TO decisions_partitioned")
+    op.execute("ALTER TABLE decisions_partitioned RENAME CONSTRAINT decisions_pkey TO decisions_partitioned_pkey")
+    op.execute("""
+    CREATE TABLE decisions (
+      decision_id BIGINT PRIMARY KEY DEFAULT nextval('decisions_decision_id_seq'),
+      ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+      prev_decision_id BIGINT,
+      inputs_bundle JSONB NOT NULL,
+      objectives JSONB NOT NULL,
+      options_considered JSONB NOT NULL,
+      chosen_action JSONB NOT NULL,
+      tests_passed JSONB NOT NULL,
+      approvals JSONB,
+      appeals JSONB,
+      post_hoc_metrics JSONB,
+      prev_hash BYTEA,
+      curr_hash BYTEA NOT NULL UNIQUE
+    )
+    """)
+    op.execute(f"INSERT INTO decisions ({DECISION_COLUMNS}) SELECT {DECISION_COLUMNS} FROM decisions_partitioned")
+    op.execute("ALTER SEQUENCE decisions_decision_id_seq OWNED BY decisions.decision_id")
+    op.execute("DROP TABLE decisions_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS ensure_decisions_partitions")
+    op.execute("DROP FUNCTION IF EXISTS create_decisions_partition")
+    op.execute("CREATE INDEX idx_decisions_ts ON decisions (ts)")
+    op.execute("CREATE INDEX idx_decisions_appeals ON decisions USING GIN (appeals)")
+    op.execute(COMPUTE_HASHES_TRIGGER)
@@ -0,0 +1,50 @@
+"""
+Store each decision's payload hash as its idempotency key.
+
+The compute_hashes trigger derives curr_hash from the parent's hash and the
+jsonb text of the row, so it never equals the hash LedgerWriter computes
+from the payload and cannot be used to find an already-written decision.
+The writer's canonical payload hash is stored in payload_hash instead, and
+rows written before this revision get theirs backfilled.
+"""
+
+from alembic import op
+
+from packages.ledger.canonical import decision_payload_hash
+
+# Revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+def upgrade():
+    """Add and backfill decisions.payload_hash."""
+    op.execute("ALTER TABLE decisions ADD COLUMN payload_hash BYTEA")
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.exec_driver_sql(
+            "SELECT decision_id, inputs_bundle, objectives, options_considered, chosen_action, tests_passed "
+            "FROM decisions WHERE decision_id > %s ORDER BY decision_id LIMIT %s",
+            (last_id, BACKFILL_BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        for decision_id, *payload in rows:
+            conn.exec_driver_sql(
+                "UPDATE decisions SET payload_hash = %s WHERE decision_id = %s",
+                (decision_payload_hash(*payload), decision_id)
+            )
+        last_id = rows[-1][0]
+
+    op.execute("ALTER TABLE decisions ALTER COLUMN payload_hash SET NOT NULL")
+    op.execute("CREATE INDEX idx_decisions_payload_hash ON decisions (payload_hash)")
+
+def downgrade():
+    """Drop decisions.payload_hash."""
+    op.execute("DROP INDEX IF EXISTS idx_decisions_payload_hash")
+    op.execute("ALTER TABLE decisions DROP COLUMN payload_hash")
@@ -0,0 +1,91 @@
+"""
+Keep the writer's canonical CBOR hashes instead of recomputing them in SQL.
+
+compute_hashes rebuilt curr_hash from the jsonb text of each row, so stored
+hashes depended on how Postgres renders jsonb and the canonical hash that
+LedgerWriter computes was thrown away. Rows now carry a hash_version:
+existing rows stay at 1 (jsonb text, still recomputed by the verifier in
+SQL) and new rows default to 2 (canonical CBOR, computed by the writer).
+The replacement trigger no longer computes anything; it only checks that a
+row's prev_hash is the stored hash of its parent, hot or archived.
+"""
+
+from alembic import op
+
+# Revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+CHECK_HASH_LINK_FUNCTION = """
+    CREATE OR REPLACE FUNCTION check_hash_link() RETURNS TRIGGER AS $$
+    DECLARE parent_hash BYTEA;
+    BEGIN
+      IF NEW.prev_decision_id IS NULL THEN
+        IF NEW.prev_hash IS NOT NULL THEN
+          RAISE EXCEPTION 'decision % has prev_hash without prev_decision_id', NEW.decision_id;
+        END IF;
+        RETURN NEW;
+      END IF;
+      SELECT curr_hash INTO parent_hash FROM decisions WHERE decision_id = NEW.prev_decision_id;
+      -- A parent in an archived month is the last decision of its segment
+      IF NOT FOUND THEN
+        SELECT last_hash INTO parent_hash FROM ledger_archive_segments
+        WHERE last_decision_id = NEW.prev_decision_id;
+      END IF;
+      IF parent_hash IS NULL OR NEW.prev_hash IS DISTINCT FROM parent_hash THEN
+        RAISE EXCEPTION 'prev_hash of decision % does not match decision %',
+          NEW.decision_id, NEW.prev_decision_id;
+      END IF;
+      RETURN NEW;
+    END $$ LANGUAGE plpgsql;
+"""
+
+# compute_hashes as left by 0004
+COMPUTE_HASHES_FUNCTION = """
+    CREATE OR REPLACE FUNCTION compute_hashes() RETURNS TRIGGER AS $$
+    DECLARE payload TEXT;
+    BEGIN
+      IF NEW.prev_decision_id IS NOT NULL THEN
+        SELECT curr_hash INTO NEW.prev_hash FROM decisions WHERE decision_id = NEW.prev_decision_id;
+        IF NOT FOUND THEN
+          SELECT last_hash INTO NEW.prev_hash FROM ledger_archive_segments
+          WHERE last_decision_id = NEW.prev_decision_id;
+        END IF;
+      END IF;
+      payload := COALESCE(encode(NEW.prev_hash,'hex'),'') || '|' ||
+                 COALESCE(NEW.inputs_bundle::text,'') || '|' ||
+                 COALESCE(NEW.objectives::text,'') || '|' ||
+                 COALESCE(NEW.options_considered::text,'') || '|' ||
+                 COALESCE(NEW.chosen_action::text,'') || '|' ||
+                 COALESCE(NEW.tests_passed::text,'');
+      NEW.curr_hash := digest(payload, 'sha256');
+      RETURN NEW;
+    END $$ LANGUAGE plpgsql;
+"""
+
+def upgrade():
+    """Replace compute_hashes with a prev_hash link check."""
+    op.execute("ALTER TABLE decisions ADD COLUMN hash_version SMALLINT NOT NULL DEFAULT 1")
+    op.execute("ALTER TABLE decisions ALTER COLUMN hash_version SET DEFAULT 2")
+    op.execute("DROP TRIGGER IF EXISTS trg_compute_hashes ON decisions")
+    op.execute("DROP FUNCTION IF EXISTS compute_hashes")
+    op.execute(CHECK_HASH_LINK_FUNCTION)
+    op.execute("""
+    CREATE TRIGGER trg_check_hash_link
+    BEFORE INSERT ON decisions
+    FOR EACH ROW EXECUTE FUNCTION check_hash_link();
+    """)
+
+def downgrade():
+    """Restore compute_hashes; canonical rows written since then will no longer verify."""
+    op.execute("DROP TRIGGER IF EXISTS trg_check_hash_link ON decisions")
+    op.execute("DROP FUNCTION IF EXISTS check_hash_link")
+    op.execute(COMPUTE_HASHES_FUNCTION)
+    op.execute("""
+    CREATE TRIGGER trg_compute_hashes
+    BEFORE INSERT ON decisions
+    FOR EACH ROW EXECUTE FUNCTION compute_hashes();
+    """)
+    op.execute("ALTER TABLE decisions DROP COLUMN hash_version")
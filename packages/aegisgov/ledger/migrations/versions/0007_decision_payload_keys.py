@@ -0,0 +1,52 @@
+"""
+Enforce one decision per payload hash across all partitions.
+
+A unique index on the partitioned decisions table has to include ts, so it
+cannot stop the same payload being written in two different months. The
+keys live in a separate, unpartitioned table filled by a trigger on every
+insert; they are not dropped when ledger.archive moves a month out, so a
+payload stays claimed after its decision is archived.
+"""
+
+from alembic import op
+
+# Revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Create decision_payload_keys and the trigger that fills it."""
+    op.execute("""
+    CREATE TABLE decision_payload_keys (
+      payload_hash BYTEA PRIMARY KEY,
+      decision_id BIGINT NOT NULL
+    )
+    """)
+    # Rows duplicated before this revision keep the earliest decision as the key owner
+    op.execute("""
+    INSERT INTO decision_payload_keys (payload_hash, decision_id)
+    SELECT DISTINCT ON (payload_hash) payload_hash, decision_id
+    FROM decisions ORDER BY payload_hash, decision_id
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION record_payload_key() RETURNS TRIGGER AS $$
+    BEGIN
+      INSERT INTO decision_payload_keys (payload_hash, decision_id)
+      VALUES (NEW.payload_hash, NEW.decision_id);
+      RETURN NEW;
+    END $$ LANGUAGE plpgsql;
+    """)
+    # Fires after trg_check_hash_link (triggers run in name order)
+    op.execute("""
+    CREATE TRIGGER trg_record_payload_key
+    BEFORE INSERT ON decisions
+    FOR EACH ROW EXECUTE FUNCTION record_payload_key();
+    """)
+
+def downgrade():
+    """Drop decision_payload_keys and its trigger."""
+    op.execute("DROP TRIGGER IF EXISTS trg_record_payload_key ON decisions")
+    op.execute("DROP FUNCTION IF EXISTS record_payload_key")
+    op.execute("DROP TABLE decision_payload_keys")
@@ -0,0 +1,79 @@
+"""
+Store every node of each sealed batch's Merkle tree.
+
+Inclusion proofs used to read all curr_hash values of a batch and rebuild
+its tree, so each request cost O(n) in the batch size. The sealer now
+writes the tree to ledger_batch_nodes, one row per (level, node_index),
+and a proof reads only its leaf and siblings. Batches sealed before this
+revision get their trees backfilled; a batch whose decisions have been
+archived is left without nodes, as its decisions cannot be proven from
+Postgres anyway.
+"""
+
+from alembic import op
+
+from ledger.merkle import tree_nodes
+
+# Revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 10000
+
+def _batch_leaves(conn, first_id, last_id):
+    after = first_id - 1
+    while True:
+        rows = conn.exec_driver_sql(
+            "SELECT decision_id, curr_hash FROM decisions "
+            "WHERE decision_id > %s AND decision_id <= %s ORDER BY decision_id LIMIT %s",
+            (after, last_id, BACKFILL_BATCH)
+        ).fetchall()
+        if not rows:
+            return
+        yield from rows
+        after = rows[-1][0]
+
+def upgrade():
+    """Create ledger_batch_nodes and backfill the sealed batches."""
+    op.execute("""
+    CREATE TABLE ledger_batch_nodes (
+      batch_id BIGINT NOT NULL,
+      level SMALLINT NOT NULL,
+      node_index BIGINT NOT NULL,
+      hash BYTEA NOT NULL,
+      decision_id BIGINT,
+      PRIMARY KEY (batch_id, level, node_index)
+    )
+    """)
+    op.execute("CREATE UNIQUE INDEX idx_ledger_batch_nodes_decision ON ledger_batch_nodes (decision_id)")
+
+    conn = op.get_bind()
+    batches = conn.exec_driver_sql(
+        "SELECT batch_id, first_decision_id, last_decision_id, leaf_count FROM ledger_batches ORDER BY batch_id"
+    ).fetchall()
+    for batch_id, first_id, last_id, leaf_count in batches:
+        stored = conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM decisions WHERE decision_id BETWEEN %s AND %s", (first_id, last_id)
+        ).scalar()
+        if stored != leaf_count:
+            continue
+        page = []
+        for level, node_index, node, decision_id in tree_nodes(_batch_leaves(conn, first_id, last_id)):
+            page.append((batch_id, level, node_index, node, decision_id))
+            if len(page) >= BACKFILL_BATCH:
+                conn.exec_driver_sql(
+                    "INSERT INTO ledger_batch_nodes (batch_id, level, node_index, hash, decision_id) "
+                    "VALUES (%s, %s, %s, %s, %s)", page
+                )
+                page = []
+        if page:
+            conn.exec_driver_sql(
+                "INSERT INTO ledger_batch_nodes (batch_id, level, node_index, hash, decision_id) "
+                "VALUES (%s, %s, %s, %s, %s)", page
+            )
+
+def downgrade():
+    """Drop ledger_batch_nodes."""
+    op.execute("DROP TABLE ledger_batch_nodes")
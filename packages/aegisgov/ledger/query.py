@@ -0,0 +1,225 @@
+"""
+Read path for the decision ledger with keyset pagination.
+
+Months moved out of Postgres by ``ledger.archive`` are older than every hot
+row, so reads that pass an archive store continue into it after the hot
+table (newest first) or read it before the hot table (oldest first).
+"""
+
+import base64
+import json
+from itertools import islice
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+DECISION_FIELDS = (
+    'decision_id', 'ts', 'prev_decision_id', 'inputs_bundle', 'objectives',
+    'options_considered', 'chosen_action', 'tests_passed',
+    'approvals', 'appeals', 'post_hoc_metrics',
+    'prev_hash', 'curr_hash', 'hash_version'
+)
+
+# Always selected: the page cursor is built from them
+KEY_FIELDS = ('decision_id', 'ts')
+
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(ts: datetime, decision_id: int) -> str:
+    """Encode the position after a row as an opaque page cursor."""
+    raw = json.dumps([ts.isoformat(), decision_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a page cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ts, decision_id = json.loads(raw)
+        return datetime.fromisoformat(ts), int(decision_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def resolve_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """
+    Validate a column projection, keeping table order and the key fields.
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not fields:
+        return list(DECISION_FIELDS)
+    unknown = set(fields) - set(DECISION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    wanted = set(fields) | set(KEY_FIELDS)
+    return [f for f in DECISION_FIELDS if f in wanted]
+
+def build_decisions_query(fields: List[str],
+                          action_type: Optional[str] = None,
+                          appeal_status: Optional[str] = None,
+                          since: Optional[datetime] = None,
+                          until: Optional[datetime] = None,
+                          after: Optional[Tuple[datetime, int]] = None,
+                          descending: bool = True,
+                          limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT for one page (or an unbounded export) of decisions.
+
+    Keyset pagination continues strictly after ``after`` in
+    ``(ts, decision_id)`` order. The leading ``ts`` bound is a plain range
+    condition so ``idx_decisions_ts`` drives the scan; the appeal filter is
+    a JSONB containment test answered by the GIN ``idx_decisions_appeals``.
+
+    Returns:
+        Tuple[str, List]: SQL and its parameters
+    """
+    conditions, params = [], []
+
+    if action_type is not None:
+        conditions.append("chosen_action->>'action_type' = %s")
+        params.append(action_type)
+    if appeal_status is not None:
+        conditions.append("appeals @> %s::jsonb")
+        params.append(json.dumps({'status': appeal_status}))
+    if since is not None:
+        conditions.append("ts >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append("ts < %s")
+        params.append(until)
+    if after is not None:
+        after_ts, after_id = after
+        if descending:
+            conditions.append("ts <= %s AND (ts < %s OR decision_id < %s)")
+        else:
+            conditions.append("ts >= %s AND (ts > %s OR decision_id > %s)")
+        params.extend([after_ts, after_ts, after_id])
+
+    direction = 'DESC' if descending else 'ASC'
+    sql = f"SELECT {', '.join(fields)} FROM decisions"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY ts {direction}, decision_id {direction}"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, params
+
+def _row_to_dict(fields: List[str], row: Sequence[Any]) -> Dict[str, Any]:
+    decision = {}
+    for field, value in zip(fields, row):
+        if field == 'ts' and value is not None:
+            value = value.isoformat()
+        elif field in ('prev_hash', 'curr_hash') and value is not None:
+            value = bytes(value).hex()
+        decision[field] = value
+    return decision
+
+def fetch_decisions(conn, limit: int = 50, cursor: Optional[str] = None,
+                    fields: Optional[Sequence[str]] = None,
+                    action_type: Optional[str] = None,
+                    appeal_status: Optional[str] = None,
+                    since: Optional[datetime] = None,
+                    until: Optional[datetime] = None,
+                    descending: bool = True,
+                    archive=None) -> Dict[str, Any]:
+    """
+    Fetch one page of decisions.
+
+    Args:
+        conn: Database connection
+        limit: Page size (at most ``MAX_PAGE_SIZE``)
+        cursor: ``next_cursor`` from the previous page
+        fields: Columns to return (defaults to all)
+        action_type: Only decisions whose chosen action has this type
+        appeal_status: Only decisions with an appeal in this status
+        since: Only decisions at or after this time
+        until: Only decisions before this time
+        descending: Newest first
+        archive: ``ArchiveStore`` to continue into once hot rows run out
+
+    Returns:
+        Dict: ``decisions`` and ``next_cursor`` (None on the last page)
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    selected = resolve_fields(fields)
+    after = decode_cursor(cursor) if cursor else None
+
+    def hot(count):
+        sql, params = build_decisions_query(selected, action_type, appeal_status, since, until,
+                                            after, descending, count)
+        with conn.cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            return [_row_to_dict(selected, row) for row in db_cursor.fetchall()]
+
+    def archived(count):
+        return list(islice(archive.iter_decisions(conn, selected, action_type, appeal_status, since, until,
+                                                  after, descending, count), count))
+
+    # One extra row tells us whether another page exists
+    wanted = limit + 1
+    if archive is None:
+        decisions = hot(wanted)
+    elif descending:
+        decisions = hot(wanted)
+        if len(decisions) < wanted:
+            decisions += archived(wanted - len(decisions))
+    else:
+        decisions = archived(wanted)
+        if len(decisions) < wanted:
+            decisions += hot(wanted - len(decisions))
+
+    next_cursor = None
+    if len(decisions) > limit:
+        decisions = decisions[:limit]
+        last = decisions[-1]
+        next_cursor = encode_cursor(datetime.fromisoformat(last['ts']), last['decision_id'])
+
+    return {
+        'decisions': decisions,
+        'next_cursor': next_cursor
+    }
+
+def stream_decisions(conn, fields: Optional[Sequence[str]] = None,
+                     action_type: Optional[str] = None,
+                     appeal_status: Optional[str] = None,
+                     since: Optional[datetime] = None,
+                     until: Optional[datetime] = None,
+                     descending: bool = False,
+                     fetch_size: int = 1000,
+                     archive=None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every matching decision through a server-side cursor.
+
+    Memory use is bounded by ``fetch_size`` rows regardless of how many
+    decisions match, so this backs full exports. With an ``archive`` store
+    archived months are included in the same order.
+    """
+    selected = resolve_fields(fields)
+
+    def hot():
+        sql, params = build_decisions_query(selected, action_type, appeal_status, since, until,
+                                            descending=descending)
+        with conn.cursor(name='ledger_export') as db_cursor:
+            db_cursor.itersize = fetch_size
+            db_cursor.execute(sql, params)
+            for row in db_cursor:
+                yield _row_to_dict(selected, row)
+
+    if archive is None:
+        yield from hot()
+        return
+
+    archived = archive.iter_decisions(conn, selected, action_type, appeal_status, since, until,
+                                      descending=descending)
+    if descending:
+        yield from hot()
+        yield from archived
+    else:
+        yield from archived
+        yield from hot()
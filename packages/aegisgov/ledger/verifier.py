@@ -0,0 +1,349 @@
+"""
+Incremental verifier for the decision ledger hash chain.
+"""
+
+import hashlib
+import hmac
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+import psycopg2
+
+from packages.ledger.canonical import decision_payload_hash
+
+# Rows are streamed with the parent's hash joined in, so every check is
+# local to one row and the verifier needs no memory beyond the current fetch
+# batch. A parent that has been archived is matched against its segment's
+# recorded last hash. Rows hashed before canonical hashing (hash_version 1)
+# have their jsonb-text digest recomputed by Postgres; canonical rows are
+# recomputed from their payload columns in ``_recompute``.
+VERIFY_ROWS_SQL = """
+    SELECT d.decision_id, d.prev_decision_id, d.prev_hash, d.curr_hash,
+           CASE WHEN d.hash_version = 1 THEN
+             digest(COALESCE(encode(d.prev_hash, 'hex'), '') || '|' ||
+                    COALESCE(d.inputs_bundle::text, '') || '|' ||
+                    COALESCE(d.objectives::text, '') || '|' ||
+                    COALESCE(d.options_considered::text, '') || '|' ||
+                    COALESCE(d.chosen_action::text, '') || '|' ||
+                    COALESCE(d.tests_passed::text, ''), 'sha256')
+           END AS recomputed_hash,
+           p.decision_id IS NOT NULL OR s.segment_id IS NOT NULL AS parent_exists,
+           COALESCE(p.curr_hash, s.last_hash) AS parent_hash,
+           d.hash_version, d.inputs_bundle, d.objectives, d.options_considered,
+           d.chosen_action, d.tests_passed
+    FROM decisions d
+    LEFT JOIN decisions p ON p.decision_id = d.prev_decision_id
+    LEFT JOIN ledger_archive_segments s
+           ON p.decision_id IS NULL AND s.last_decision_id = d.prev_decision_id
+    WHERE d.decision_id > %s AND d.decision_id <= %s
+    ORDER BY d.decision_id
+"""
+
+# (decision_id, prev_decision_id, prev_hash, curr_hash, recomputed_hash, parent_exists, parent_hash)
+VerifyRow = Tuple[int, Optional[int], Optional[bytes], bytes, bytes, bool, Optional[bytes]]
+
+def _as_bytes(value) -> Optional[bytes]:
+    # psycopg2 returns BYTEA columns as memoryview
+    return bytes(value) if value is not None else None
+
+def _recompute(row) -> VerifyRow:
+    """Reduce a ``VERIFY_ROWS_SQL`` row to a ``VerifyRow``, hashing canonical rows here"""
+    base, hash_version, payload = row[:7], row[7], row[8:]
+    if hash_version == 1:
+        return base
+    # psycopg2 decodes jsonb, so the payload is hashed as the writer hashed it
+    recomputed = decision_payload_hash(*payload, prev_hash=_as_bytes(base[2]))
+    return base[:4] + (recomputed,) + base[5:]
+
+def check_row(row: VerifyRow) -> Optional[str]:
+    """
+    Check one decision against its recomputed hash and its parent.
+
+    Returns:
+        Optional[str]: Reason the row fails verification, or None if it is intact
+    """
+    decision_id, prev_decision_id, prev_hash, curr_hash, recomputed_hash, parent_exists, parent_hash = row
+    prev_hash, curr_hash = _as_bytes(prev_hash), _as_bytes(curr_hash)
+
+    if curr_hash is None or curr_hash != _as_bytes(recomputed_hash):
+        return "curr_hash does not match decision content"
+    if prev_decision_id is None:
+        if prev_hash is not None:
+            return "prev_hash set without prev_decision_id"
+        return None
+    if prev_decision_id >= decision_id:
+        return f"prev_decision_id {prev_decision_id} does not precede decision"
+    if not parent_exists:
+        return f"previous decision {prev_decision_id} is missing"
+    if prev_hash != _as_bytes(parent_hash):
+        return f"prev_hash does not match curr_hash of decision {prev_decision_id}"
+    return None
+
+def verify_rows(rows: Iterable[VerifyRow], verified_count: int = 0, checkpoint_every: int = 0,
+                on_checkpoint: Optional[Callable[[int, bytes, int], None]] = None,
+                max_errors: int = 100) -> Dict[str, Any]:
+    """
+    Walk an ordered stream of rows and report chain integrity.
+
+    ``on_checkpoint(decision_id, curr_hash, verified_count)`` is called every
+    ``checkpoint_every`` rows while no error has been seen, so checkpoints
+    only ever cover a fully verified prefix.
+
+    Args:
+        rows: Rows in ``VERIFY_ROWS_SQL`` column order, ascending by decision_id
+        verified_count: Rows already verified before this stream (from a checkpoint)
+        checkpoint_every: Rows between checkpoints (0 disables them)
+        on_checkpoint: Callback that persists a checkpoint
+        max_errors: Maximum number of errors kept in the report
+
+    Returns:
+        Dict: Report with counts, the last verified decision and any errors
+    """
+    report = {
+        'valid': True,
+        'verified': 0,
+        'first_decision_id': None,
+        'last_decision_id': None,
+        'last_hash': None,
+        'checkpoints_written': 0,
+        'error_count': 0,
+        'errors': []
+    }
+
+    for row in rows:
+        decision_id = row[0]
+        error = check_row(row)
+        if error is not None:
+            report['valid'] = False
+            report['error_count'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'decision_id': decision_id, 'reason': error})
+
+        if report['first_decision_id'] is None:
+            report['first_decision_id'] = decision_id
+        report['last_decision_id'] = decision_id
+        report['last_hash'] = _as_bytes(row[3])
+        report['verified'] += 1
+
+        if (report['valid'] and on_checkpoint is not None and checkpoint_every
+                and report['verified'] % checkpoint_every == 0):
+            on_checkpoint(decision_id, report['last_hash'], verified_count + report['verified'])
+            report['checkpoints_written'] += 1
+
+    return report
+
+def sign_checkpoint(key: bytes, decision_id: int, curr_hash: bytes, verified_count: int) -> bytes:
+    """Return the HMAC-SHA256 signature of a checkpoint."""
+    message = f"{decision_id}|{curr_hash.hex()}|{verified_count}".encode('utf-8')
+    return hmac.new(key, message, hashlib.sha256).digest()
+
+def split_segments(lower: int, upper: int, segment_size: int) -> List[Tuple[int, int]]:
+    """Split the decision_id range (lower, upper] into consecutive segments."""
+    return [(start, min(start + segment_size, upper)) for start in range(lower, upper, segment_size)]
+
+# Per-process connection used by parallel segment workers
+_worker_conn = None
+
+def _init_worker(db_url: str) -> None:
+    global _worker_conn
+    _worker_conn = psycopg2.connect(db_url)
+    _worker_conn.set_session(readonly=True)
+
+def _stream_rows(conn, lower: int, upper: int, fetch_size: int, name: str) -> Iterable[VerifyRow]:
+    # A named cursor is server-side: rows arrive fetch_size at a time
+    with conn.cursor(name=name) as cursor:
+        cursor.itersize = fetch_size
+        cursor.execute(VERIFY_ROWS_SQL, (lower, upper))
+        for row in cursor:
+            yield _recompute(row)
+
+def _verify_segment(segment: Tuple[int, int], fetch_size: int, max_errors: int) -> Dict[str, Any]:
+    lower, upper = segment
+    try:
+        return verify_rows(_stream_rows(_worker_conn, lower, upper, fetch_size, 'ledger_verify_segment'),
+                           max_errors=max_errors)
+    finally:
+        _worker_conn.rollback()
+
+class ChainVerifier:
+    def __init__(self, db_url: str, checkpoint_every: int = 10000, signing_key: Optional[bytes] = None,
+                 fetch_size: int = 5000, max_errors: int = 100):
+        """
+        Initialize the verifier.
+
+        Args:
+            db_url: Database connection URL
+            checkpoint_every: Decisions between signed checkpoints
+            signing_key: HMAC key for checkpoints (defaults to LEDGER_CHECKPOINT_KEY)
+            fetch_size: Rows fetched per round trip from the server-side cursor
+            max_errors: Maximum number of errors kept in a report
+        """
+        if signing_key is None:
+            env_key = os.getenv('LEDGER_CHECKPOINT_KEY')
+            signing_key = env_key.encode('utf-8') if env_key else None
+        if not signing_key:
+            raise ValueError("Checkpoint signing key not configured (set LEDGER_CHECKPOINT_KEY)")
+
+        self.db_url = db_url
+        self.checkpoint_every = checkpoint_every
+        self.signing_key = signing_key
+        self.fetch_size = fetch_size
+        self.max_errors = max_errors
+
+    def latest_checkpoint(self, conn) -> Optional[Dict[str, Any]]:
+        """
+        Return the newest checkpoint that is still trustworthy.
+
+        A checkpoint is used only if its signature is valid and the decision
+        it covers still carries the same curr_hash; otherwise older
+        checkpoints are tried.
+
+        Returns:
+            Optional[Dict]: decision_id, curr_hash and verified_count, or None
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.decision_id, c.curr_hash, c.verified_count, c.signature, d.curr_hash
+                FROM ledger_checkpoints c
+                LEFT JOIN decisions d ON d.decision_id = c.decision_id
+                ORDER BY c.decision_id DESC
+                """
+            )
+            for decision_id, curr_hash, verified_count, signature, current_hash in cursor:
+                curr_hash = _as_bytes(curr_hash)
+                expected = sign_checkpoint(self.signing_key, decision_id, curr_hash, verified_count)
+                if not hmac.compare_digest(expected, _as_bytes(signature)):
+                    continue
+                if _as_bytes(current_hash) != curr_hash:
+                    continue
+                return {'decision_id': decision_id, 'curr_hash': curr_hash, 'verified_count': verified_count}
+        return None
+
+    def _checkpoint_writer(self, conn) -> Callable[[int, bytes, int], None]:
+        def write(decision_id: int, curr_hash: bytes, verified_count: int) -> None:
+            signature = sign_checkpoint(self.signing_key, decision_id, curr_hash, verified_count)
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO ledger_checkpoints (decision_id, curr_hash, verified_count, signature)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (decision_id) DO NOTHING
+                    """,
+                    (decision_id, psycopg2.Binary(curr_hash), verified_count, psycopg2.Binary(signature))
+                )
+        return write
+
+    def _start_point(self, conn, from_checkpoint: bool) -> Tuple[int, int, Optional[Dict[str, Any]]]:
+        checkpoint = self.latest_checkpoint(conn) if from_checkpoint else None
+        if checkpoint is None:
+            return 0, 0, None
+        return checkpoint['decision_id'], checkpoint['verified_count'], checkpoint
+
+    def _max_decision_id(self, conn) -> int:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(decision_id), 0) FROM decisions")
+            return cursor.fetchone()[0]
+
+    def verify(self, from_checkpoint: bool = True) -> Dict[str, Any]:
+        """
+        Verify the chain in one streaming pass.
+
+        Args:
+            from_checkpoint: Resume after the latest valid checkpoint instead of the genesis decision
+
+        Returns:
+            Dict: Verification report
+        """
+        # Checkpoints are committed as they are written, on a separate
+        # connection so they do not end the streaming cursor's transaction
+        checkpoint_conn = psycopg2.connect(self.db_url)
+        checkpoint_conn.autocommit = True
+        read_conn = psycopg2.connect(self.db_url)
+        read_conn.set_session(readonly=True)
+        try:
+            lower, verified_count, checkpoint = self._start_point(checkpoint_conn, from_checkpoint)
+            upper = self._max_decision_id(read_conn)
+            report = verify_rows(
+                _stream_rows(read_conn, lower, upper, self.fetch_size, 'ledger_verify'),
+                verified_count=verified_count,
+                checkpoint_every=self.checkpoint_every,
+                on_checkpoint=self._checkpoint_writer(checkpoint_conn),
+                max_errors=self.max_errors
+            )
+        finally:
+            read_conn.close()
+            checkpoint_conn.close()
+
+        report['resumed_from'] = checkpoint['decision_id'] if checkpoint else None
+        report['total_verified'] = verified_count + report['verified']
+        report['last_hash'] = report['last_hash'].hex() if report['last_hash'] else None
+        return report
+
+    def verify_parallel(self, workers: int = 4, from_checkpoint: bool = True) -> Dict[str, Any]:
+        """
+        Verify the chain by splitting it into decision_id segments checked in worker processes.
+
+        Each segment spans ``checkpoint_every`` IDs. Segments are independent
+        because every row is checked against its parent's stored hash, so a
+        checkpoint is written at the end of each segment as long as it and
+        every segment before it verified cleanly.
+
+        Args:
+            workers: Number of worker processes
+            from_checkpoint: Resume after the latest valid checkpoint instead of the genesis decision
+
+        Returns:
+            Dict: Verification report merged across segments
+        """
+        conn = psycopg2.connect(self.db_url)
+        conn.autocommit = True
+        try:
+            lower, verified_count, checkpoint = self._start_point(conn, from_checkpoint)
+            upper = self._max_decision_id(conn)
+            segments = split_segments(lower, upper, self.checkpoint_every)
+            write_checkpoint = self._checkpoint_writer(conn)
+
+            report = {
+                'valid': True,
+                'verified': 0,
+                'first_decision_id': None,
+                'last_decision_id': None,
+                'last_hash': None,
+                'checkpoints_written': 0,
+                'error_count': 0,
+                'errors': [],
+                'segments': len(segments)
+            }
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.db_url,)) as executor:
+                results = executor.map(_verify_segment, segments,
+                                       [self.fetch_size] * len(segments),
+                                       [self.max_errors] * len(segments))
+                # map() yields in segment order, so checkpoints stay sequential
+                for segment_report in results:
+                    if segment_report['verified'] == 0:
+                        continue
+                    if report['first_decision_id'] is None:
+                        report['first_decision_id'] = segment_report['first_decision_id']
+                    report['last_decision_id'] = segment_report['last_decision_id']
+                    report['last_hash'] = segment_report['last_hash']
+                    report['verified'] += segment_report['verified']
+                    report['error_count'] += segment_report['error_count']
+                    report['errors'].extend(segment_report['errors'][:self.max_errors - len(report['errors'])])
+                    if not segment_report['valid']:
+                        report['valid'] = False
+
+                    if report['valid']:
+                        write_checkpoint(report['last_decision_id'], report['last_hash'],
+                                         verified_count + report['verified'])
+                        report['checkpoints_written'] += 1
+        finally:
+            conn.close()
+
+        report['resumed_from'] = checkpoint['decision_id'] if checkpoint else None
+        report['total_verified'] = verified_count + report['verified']
+        report['last_hash'] = report['last_hash'].hex() if report['last_hash'] else None
+        return report
@@ -18,64 +18,174 @@
 Idempotent decision ledger writer with hash chain support.
 """
 
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
 import psycopg2
+import psycopg2.pool
+from psycopg2.extras import execute_values
 import json
-import hashlib
+
+from packages.ledger.canonical import decision_payload_hash
+
+DECISION_COLUMNS = (
+    'decision_id', 'prev_decision_id', 'inputs_bundle', 'objectives',
+    'options_considered', 'chosen_action', 'tests_passed',
+    'approvals', 'appeals', 'post_hoc_metrics',
+    'prev_hash', 'curr_hash', 'payload_hash'
+)
+
+# Advisory lock serializing appends that link to the ledger tail
+LEDGER_APPEND_LOCK_ID = 0x4c454447
 
 class LedgerWriter:
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, min_connections: int = 1, max_connections: int = 10):
         """
         Initialize the ledger writer.
 
         Args:
             db_url: Database connection URL
+            min_connections: Connections kept open by the pool
+            max_connections: Upper bound on pooled connections
         """
         self.db_url = db_url
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        """Create the connection pool on first use."""
+        if self._pool is None:
+            self._pool = psycopg2.pool.ThreadedConnectionPool(
+                self.min_connections, self.max_connections, self.db_url
+            )
+        return self._pool
+
+    @contextmanager
+    def _connection(self):
+        """
+        Borrow a pooled connection for one transaction.
+
+        Commits on success, rolls back on error, and always returns the
+        connection to the pool.
+        """
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            conn.autocommit = False
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
 
     def _compute_payload_hash(self, inputs_bundle: Dict[str, Any],
                              objectives: Dict[str, float],
                              options_considered: list,
                              chosen_action: Dict[str, Any],
-                             tests_passed: Dict[str, bool]) -> str:
+                             tests_passed: Dict[str, bool],
+                             prev_hash: Optional[bytes] = None) -> str:
         """
         Compute the payload hash for a decision.
 
+        Without ``prev_hash`` this is the decision's idempotency key
+        (``payload_hash``); with the parent's hash it is the chained
+        ``curr_hash`` stored with ``hash_version`` 2.
+
         Args:
             inputs_bundle: Input data bundle
             objectives: Objectives considered
             options_considered: Options that were considered
             chosen_action: The chosen action
             tests_passed: Tests that passed
+            prev_hash: Stored hash of the previous decision (optional)
 
         Returns:
             str: Hex digest of the payload hash
         """
-        # Convert all components to JSON strings and concatenate
-        payload = json.dumps(inputs_bundle, sort_keys=True) + '|' + \
-                  json.dumps(objectives, sort_keys=True) + '|' + \
-                  json.dumps(options_considered, sort_keys=True) + '|' + \
-                  json.dumps(chosen_action, sort_keys=True) + '|' + \
-                  json.dumps(tests_passed, sort_keys=True)
+        # Canonical CBOR streamed into SHA-256, shared with packages/ledger
+        return decision_payload_hash(inputs_bundle, objectives, options_considered,
+                                     chosen_action, tests_passed, prev_hash=prev_hash).hex()
 
-        # Compute SHA-256 hash
-        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    def _get_prev_hashes(self, cursor, prev_decision_ids: List[int]) -> Dict[int, str]:
+        """
+        Get the hashes of previous decisions in one query.
 
-    def _get_prev_hash(self, conn, prev_decision_id: int) -> str:
+        A parent in an archived month is found as the last decision of its
+        archive segment, matching the fallback in the check_hash_link trigger.
+
+        Args:
+            cursor: Database cursor
+            prev_decision_ids: IDs of the previous decisions
+
+        Returns:
+            Dict[int, str]: Hex hash per decision ID (missing IDs are omitted)
         """
-        Get the previous decision's hash.
+        if not prev_decision_ids:
+            return {}
+        cursor.execute(
+            """
+            SELECT decision_id, curr_hash FROM decisions WHERE decision_id = ANY(%s)
+            UNION ALL
+            SELECT last_decision_id, last_hash FROM ledger_archive_segments WHERE last_decision_id = ANY(%s)
+            """,
+            (list(prev_decision_ids), list(prev_decision_ids))
+        )
+        return {row[0]: bytes(row[1]).hex() for row in cursor.fetchall()}
+
+    def _get_existing_decisions(self, cursor, payload_hashes: List[str]) -> Dict[str, Tuple[int, str]]:
+        """
+        Look up already-written decisions by payload hash in one query (idempotency).
+
+        The lookup uses the stored ``payload_hash`` column: ``curr_hash`` is
+        chained to the parent, so it differs for the same payload. A payload
+        whose decision has since been archived is not found here; the
+        ``decision_payload_keys`` table still rejects inserting it again.
 
         Args:
-            conn: Database connection
-            prev_decision_id: ID of the previous decision
+            cursor: Database cursor
+            payload_hashes: Hex payload hashes of the batch
 
         Returns:
-            str: Previous hash (empty string if no previous decision)
+            Dict[str, Tuple[int, str]]: (decision ID, hex curr_hash) per hex
+            payload hash that already exists
         """
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT curr_hash FROM decisions WHERE decision_id = %s", (prev_decision_id,))
-            result = cursor.fetchone()
-            return result[0].hex() if result else ''
+        cursor.execute(
+            "SELECT decision_id, payload_hash, curr_hash FROM decisions WHERE payload_hash = ANY(%s)",
+            ([bytes.fromhex(h) for h in payload_hashes],)
+        )
+        return {bytes(row[1]).hex(): (row[0], bytes(row[2]).hex()) for row in cursor.fetchall()}
+
+    def _lock_tail(self, cursor):
+        """
+        Serialize tail appends across writers and return the current tail.
+
+        The advisory lock is held until the transaction ends, so no other
+        writer can append between reading the tail and inserting after it.
+
+        Returns:
+            Tuple[int, str]: (decision_id, hex hash) of the last decision, or None
+        """
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (LEDGER_APPEND_LOCK_ID,))
+        cursor.execute("SELECT decision_id, curr_hash FROM decisions ORDER BY decision_id DESC LIMIT 1")
+        row = cursor.fetchone()
+        return (row[0], bytes(row[1]).hex()) if row else None
+
+    def _reserve_decision_ids(self, cursor, count: int) -> List[int]:
+        """Reserve decision IDs up front so rows can reference each other."""
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence('decisions', 'decision_id')) "
+            "FROM generate_series(1, %s)",
+            (count,)
+        )
+        return [row[0] for row in cursor.fetchall()]
 
     def write_decision(self, inputs_bundle: Dict[str, Any],
                       objectives: Dict[str, float],
@@ -103,79 +213,123 @@ class LedgerWriter:
         Returns:
             Dict: Result containing success status and decision ID
         """
-        conn = None
-        try:
-            # Connect to the database
-            conn = psycopg2.connect(self.db_url)
-            conn.autocommit = False
+        return self.write_decisions([{
+            'inputs_bundle': inputs_bundle,
+            'objectives': objectives,
+            'options_considered': options_considered,
+            'chosen_action': chosen_action,
+            'tests_passed': tests_passed,
+            'prev_decision_id': prev_decision_id,
+            'approvals': approvals,
+            'appeals': appeals,
+            'post_hoc_metrics': post_hoc_metrics
+        }], chain=False)[0]
+
+    def write_decisions(self, batch: List[Dict[str, Any]], chain: bool = True,
+                        link_to_tail: bool = False) -> List[Dict]:
+        """
+        Write a batch of decisions in a single transaction.
 
-            with conn.cursor() as cursor:
-                # Compute current hash
-                curr_hash_hex = self._compute_payload_hash(
-                    inputs_bundle, objectives, options_considered,
-                    chosen_action, tests_passed
-                )
-
-                # Get previous hash if applicable
-                prev_hash_hex = ''
-                if prev_decision_id is not None:
-                    prev_hash_hex = self._get_prev_hash(conn, prev_decision_id)
-
-                # Check if this decision already exists (idempotency)
-                cursor.execute(
-                    "SELECT decision_id FROM decisions WHERE curr_hash = %s",
-                    (bytes.fromhex(curr_hash_hex),)
-                )
-                existing_result = cursor.fetchone()
-
-                if existing_result:
-                    # Decision already exists, return the ID
-                    conn.commit()
-                    return {
-                        'status': 'idempotent',
-                        'decision_id': existing_result[0],
-                        'message': 'Decision already exists in ledger'
-                    }
-
-                # Insert new decision
-                cursor.execute("""
-                    INSERT INTO decisions (
-                        prev_decision_id, inputs_bundle, objectives,
-                        options_considered, chosen_action, tests_passed,
-                        approvals, appeals, post_hoc_metrics,
-                        prev_hash, curr_hash
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING decision_id
-                """, (
-                    prev_decision_id,
-                    json.dumps(inputs_bundle),
-                    json.dumps(objectives),
-                    json.dumps(options_considered),
-                    json.dumps(chosen_action),
-                    json.dumps(tests_passed),
-                    json.dumps(approvals) if approvals else None,
-                    json.dumps(appeals) if appeals else None,
-                    json.dumps(post_hoc_metrics) if post_hoc_metrics else None,
-                    bytes.fromhex(prev_hash_hex) if prev_decision_id else None,
-                    bytes.fromhex(curr_hash_hex)
-                ))
-
-                new_id = cursor.fetchone()[0]
-                conn.commit()
-
-                return {
-                    'status': 'success',
-                    'decision_id': new_id,
-                    'message': 'Decision written to ledger'
-                }
+        Idempotency is checked for the whole batch with one query and new
+        rows are inserted with one multi-row INSERT. When ``chain`` is set,
+        a decision without an explicit ``prev_decision_id`` is linked to the
+        decision written before it in the batch (decisions that already
+        exist are skipped), so a replayed day of decisions forms one hash
+        chain. With ``link_to_tail`` the first such decision
+        is linked to the current last decision in the ledger, under a lock
+        that keeps concurrent appenders in strict order.
+
+        Args:
+            batch: Decisions with the same keys as ``write_decision`` arguments
+            chain: Link decisions without ``prev_decision_id`` to their predecessor
+            link_to_tail: Continue the chain from the ledger's last decision
+
+        Returns:
+            List[Dict]: One result per decision, in input order
+        """
+        if not batch:
+            return []
+
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                tail = self._lock_tail(cursor) if link_to_tail else None
+
+                payload_hashes = [
+                    self._compute_payload_hash(
+                        d['inputs_bundle'], d['objectives'], d['options_considered'],
+                        d['chosen_action'], d['tests_passed']
+                    )
+                    for d in batch
+                ]
+
+                existing = self._get_existing_decisions(cursor, payload_hashes)
+                prev_hashes = self._get_prev_hashes(cursor, {
+                    d['prev_decision_id'] for d in batch if d.get('prev_decision_id') is not None
+                })
+
+                new_count = len({h for h in payload_hashes if h not in existing})
+                new_ids = iter(self._reserve_decision_ids(cursor, new_count) if new_count else [])
+
+                rows, results = [], []
+                prev_in_batch = tail  # (decision_id, hex hash) of the previous decision
+                for decision, payload_hash_hex in zip(batch, payload_hashes):
+                    prev_decision_id = decision.get('prev_decision_id')
+                    if prev_decision_id is None and (chain or link_to_tail) and prev_in_batch:
+                        prev_decision_id = prev_in_batch[0]
+                        prev_hashes[prev_decision_id] = prev_in_batch[1]
+
+                    if payload_hash_hex in existing:
+                        # Decision already exists (possibly earlier in this batch)
+                        decision_id, curr_hash_hex = existing[payload_hash_hex]
+                        results.append({
+                            'status': 'idempotent',
+                            'decision_id': decision_id,
+                            'message': 'Decision already exists in ledger'
+                        })
+                    else:
+                        decision_id = next(new_ids)
+                        prev_hash = bytes.fromhex(prev_hashes.get(prev_decision_id, '')) if prev_decision_id else None
+                        # The check_hash_link trigger keeps this hash and checks prev_hash
+                        curr_hash_hex = self._compute_payload_hash(
+                            decision['inputs_bundle'], decision['objectives'], decision['options_considered'],
+                            decision['chosen_action'], decision['tests_passed'], prev_hash=prev_hash
+                        ) if prev_hash is not None else payload_hash_hex
+                        existing[payload_hash_hex] = (decision_id, curr_hash_hex)
+                        rows.append((
+                            decision_id,
+                            prev_decision_id,
+                            json.dumps(decision['inputs_bundle']),
+                            json.dumps(decision['objectives']),
+                            json.dumps(decision['options_considered']),
+                            json.dumps(decision['chosen_action']),
+                            json.dumps(decision['tests_passed']),
+                            json.dumps(decision['approvals']) if decision.get('approvals') else None,
+                            json.dumps(decision['appeals']) if decision.get('appeals') else None,
+                            json.dumps(decision['post_hoc_metrics']) if decision.get('post_hoc_metrics') else None,
+                            prev_hash,
+                            bytes.fromhex(curr_hash_hex),
+                            bytes.fromhex(payload_hash_hex)
+                        ))
+                        results.append({
+                            'status': 'success',
+                            'decision_id': decision_id,
+                            'message': 'Decision written to ledger'
+                        })
+                        # Only new rows extend the chain; a replayed decision stays where it was
+                        prev_in_batch = (decision_id, curr_hash_hex)
+
+                if rows:
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO decisions ({', '.join(DECISION_COLUMNS)}) VALUES %s",
+                        rows,
+                        page_size=len(rows)
+                    )
+
+                return results
 
         except Exception as e:
-            if conn:
-                conn.rollback()
-            raise RuntimeError(f"Failed to write decision: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
+            raise RuntimeError(f"Failed to write decisions: {str(e)}")
 
 
 
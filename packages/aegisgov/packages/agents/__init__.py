@@ -12,8 +12,9 @@
 # Agents package initialization
 
 from .orchestrator import AgentOrchestrator
+from .preconditions import PreconditionContext, compile_precondition
 
-__all__ = ['AgentOrchestrator']
+__all__ = ['AgentOrchestrator', 'PreconditionContext', 'compile_precondition']
 
 
 
@@ -13,18 +13,62 @@
 
 
 
+import os
+import time
 import yaml
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from packages.constitution.artifacts import artifact_cache
 from packages.constitution.engine import ConstitutionEngine
 from packages.planner.optimizer import MultiObjectiveOptimizer
+from packages.planner.cache import fingerprint, planning_cache
 from packages.assurance.monitors import AssuranceMonitors
+from .pipeline import Pipeline, StopPipeline
+from .preconditions import PreconditionContext, compile_precondition, compile_workflows
+
+# Threads running the independent steps of one planning cycle
+STEP_WORKERS = 4
+# Planning cycles (e.g. regions) run at once by execute_planning_cycles
+PLANNING_WORKERS = 4
+
+AGENT_GRAPH_PATH = os.path.join(os.path.dirname(__file__), 'agent_graph.yaml')
+
+def load_agent_graph(raw: bytes):
+    """Parse agent_graph.yaml and compile its workflow preconditions (an ArtifactCache loader)"""
+    graph = yaml.safe_load(raw)
+    return graph, compile_workflows(graph)
+
+artifact_cache.register('agent_graph', AGENT_GRAPH_PATH, load_agent_graph)
 
 class AgentOrchestrator:
     def __init__(self):
-        with open('/app/packages/agents/agent_graph.yaml', 'r') as f:
-            self.agent_graph = yaml.safe_load(f)
         self.constitution_engine = ConstitutionEngine()
         self.assurance_monitors = AssuranceMonitors()
+        # Precondition names that are not plain plan fields
+        self.precondition_providers = {
+            'assurance.pass': lambda plan: not self.assurance_monitors.run_all_monitors(
+                plan.get('metrics', {}))['tripwires_triggered'],
+            'impact_budget_pct': lambda plan: plan.get('budget_delta_pct', 0),
+            'no_active_appeals': lambda plan: not plan.get('has_active_appeals', False)
+        }
+        self.planning_pipeline = self._build_planning_pipeline()
+        # Threads start on first use, so constructing an orchestrator stays cheap
+        self.step_executor = ThreadPoolExecutor(max_workers=STEP_WORKERS, thread_name_prefix='planning-step')
+
+    def close(self) -> None:
+        """Shut down the planning step threads once the running cycles finish."""
+        self.step_executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def agent_graph(self) -> Dict:
+        # Shared, hot-reloaded snapshot of agent_graph.yaml
+        return artifact_cache.get('agent_graph').data
 
     def get_agent_permissions(self, agent_name: str) -> Dict:
         """Get permissions for a specific agent"""
@@ -35,99 +79,187 @@ class AgentOrchestrator:
 
     def validate_workflow(self, workflow_name: str, plan: Dict) -> bool:
         """Validate that a plan can be executed by the specified workflow"""
-        if workflow_name not in self.agent_graph['workflows']:
+        snapshot = artifact_cache.get('agent_graph')
+        if workflow_name not in snapshot.data['workflows']:
             raise ValueError(f"Workflow '{workflow_name}' not found")
 
-        workflow = self.agent_graph['workflows'][workflow_name]
-
-        # Check preconditions
-        for precondition in workflow.get('preconditions', []):
-            if not self._evaluate_precondition(precondition, plan):
-                return False
-
-        return True
+        # Preconditions are compiled with the graph; values they share
+        # (e.g. the monitor outcome) are computed once per plan
+        context = PreconditionContext(plan, self.precondition_providers)
+        return all(precondition(context) for precondition in snapshot.compiled[workflow_name])
 
     def _evaluate_precondition(self, precondition: str, plan: Dict) -> bool:
         """Evaluate a single precondition expression"""
-        # This is a simplified evaluation - in production you'd use a proper expression parser
-        if precondition == "assurance.pass":
-            return not self.assurance_monitors.run_all_monitors(plan.get('metrics', {}))['tripwires_triggered']
-        elif precondition == "impact_budget_pct < 1":
-            return plan.get('budget_delta_pct', 0) < 1
-        elif precondition == "no_active_appeals":
-            return not plan.get('has_active_appeals', False)
-        elif precondition.startswith("population_impact_pct > "):
-            threshold = float(precondition.split('> ')[1])
-            return plan.get('population_impact_pct', 0) > threshold
-        return True
+        return compile_precondition(precondition)(PreconditionContext(plan, self.precondition_providers))
 
-    def execute_planning_cycle(self, plan_data: Dict) -> Dict:
+    def _build_planning_pipeline(self) -> Pipeline:
         """
-        Execute the planning cycle workflow:
-        1. Load preferences and KPI data
-        2. Generate Pareto frontier
-        3. Validate against constitution
-        4. Run assurance monitors
-        5. Return chosen plan with explainer
+        Planning cycle steps and their dependencies. Monitors need nothing
+        but the metrics, so they run alongside validation and planning;
+        selection, scoring and weight regions run in parallel once the
+        Pareto frontier exists.
         """
-        # Step 1: Validate input plan
-        validation = self.constitution_engine.validate_plan(plan_data)
+        pipeline = Pipeline()
+        pipeline.add('validate', self._step_validate)
+        pipeline.add('monitors', lambda ctx: self.assurance_monitors.run_all_monitors(
+            ctx['plan_data'].get('metrics', {})))
+        pipeline.add('options', self._step_options, deps=['validate'])
+        pipeline.add('pareto', self._step_pareto, deps=['options'])
+        pipeline.add('select', self._step_select, deps=['pareto'])
+        pipeline.add('tradeoffs', self._step_tradeoffs, deps=['pareto'])
+        pipeline.add('tradeoff_regions', self._step_tradeoff_regions, deps=['pareto'],
+                     cache_key=lambda ctx: (fingerprint(ctx['optimizer'].kpi_meta),
+                                            ctx['options']['options_key']))
+        pipeline.add('explainer', self._step_explainer,
+                     deps=['monitors', 'select', 'tradeoffs', 'tradeoff_regions'])
+        return pipeline
+
+    def _step_validate(self, ctx: Dict) -> Dict:
+        validation = self.constitution_engine.validate_plan(ctx['plan_data'])
         if not validation['valid']:
-            return {
+            raise StopPipeline({
                 "status": "invalid",
                 "validation_errors": validation['results'],
                 "message": "Plan failed constitutional validation"
-            }
-
-        # Step 2: Generate Pareto frontier (simplified for demo)
-        optimizer = MultiObjectiveOptimizer(plan_data.get('kpis', {}))
-        options = [
-            {"action_type": "carbon_fee_dividend", "profit": 500000, "social_impact": 0.8},
-            {"action_type": "housing_build_credits", "profit": 300000, "social_impact": 0.9}
+            })
+        return validation
+
+    def _step_options(self, ctx: Dict) -> Dict:
+        # Defaults carry projected KPI_META values so they can be scored and traded off
+        options = ctx['plan_data'].get('options') or [
+            {"action_type": "carbon_fee_dividend", "domain": "energy", "profit": 500000, "social_impact": 0.8,
+             "real_wage": 31.0, "unemployment": 5.2, "atkinson_index": 0.29, "carbon_intensity": 360.0,
+             "reserve_margin": 16.0, "rent_burden": 31.0},
+            {"action_type": "housing_build_credits", "domain": "housing", "profit": 300000, "social_impact": 0.9,
+             "real_wage": 30.5, "unemployment": 4.9, "atkinson_index": 0.27, "carbon_intensity": 420.0,
+             "reserve_margin": 17.0, "rent_burden": 27.5}
         ]
 
-        pareto_set = optimizer.epsilon_constraint_optimization(
-            plan_data.get('weights', [0.2]*6),
-            options
-        )
+        # Drop candidates that break a constitutional rule before scoring
+        option_validation = self.constitution_engine.validate_plans(options, as_actions=True)
+        feasible = [option for option, ok in zip(options, option_validation['valid']) if ok]
+        return {
+            "feasible": feasible,
+            # Fingerprinted once here; every cached lookup of this cycle reuses it
+            "options_key": fingerprint(feasible),
+            "rejected": [
+                {"option": option.get('action_type'), "failed_rules": failed}
+                for option, failed in zip(options, option_validation['failed_rules']) if failed
+            ]
+        }
 
-        # Step 3: Select best option (simplified)
+    def _step_pareto(self, ctx: Dict) -> list:
+        options, options_key = ctx['options']['feasible'], ctx['options']['options_key']
+        pareto_set = [
+            options[i] for i in planning_cache.pareto(ctx['optimizer'], options, options_key=options_key)
+        ] if options else []
         if not pareto_set:
-            return {
+            raise StopPipeline({
                 "status": "error",
-                "message": "No feasible plans found"
+                "message": "No feasible plans found",
+                "rejected_options": ctx['options']['rejected']
+            })
+        return pareto_set
+
+    def _step_select(self, ctx: Dict) -> Dict:
+        options = ctx['options']['feasible']
+        optimizer = ctx['optimizer']
+        if ctx['plan_data'].get('planner_mode') == 'portfolio':
+            portfolio = optimizer.select_portfolio(options, ctx['weights'],
+                                                   self.constitution_engine.planning_constraints())
+            if portfolio['status'] == 'node_limit':
+                raise StopPipeline({
+                    "status": "error",
+                    "message": "Portfolio search stopped at its node limit before proving a plan optimal"
+                })
+            if portfolio['status'] != 'optimal':
+                raise StopPipeline({
+                    "status": "error",
+                    "message": "No plan satisfies the constitutional constraints"
+                })
+            return {
+                "actions": [options[i] for i in portfolio['selected']],
+                "objective": portfolio['objective'],
+                "solver": portfolio['solver'],
+                "constraint_totals": portfolio['totals']
             }
+        return optimizer.optimize_with_weights(options, ctx['weights'])
+
+    def _step_tradeoffs(self, ctx: Dict) -> list:
+        options = ctx['options']['feasible']
+        return [
+            {"option": opt['action_type'], "score": float(score)}
+            for opt, score in zip(options, planning_cache.scores(ctx['optimizer'], options, ctx['weights'],
+                                                                 options_key=ctx['options']['options_key']))
+        ]
 
-        chosen_plan = optimizer.optimize_with_weights(options, plan_data.get('weights', [0.2]*6))
-
-        # Step 4: Run assurance monitors
-        monitor_results = self.assurance_monitors.run_all_monitors(plan_data.get('metrics', {}))
+    def _step_tradeoff_regions(self, ctx: Dict) -> list:
+        options = ctx['options']['feasible']
+        optimizer = ctx['optimizer']
+        if not any(name in optimizer.kpi_index for option in options for name in option):
+            # Without a shared KPI every weight vector ties; a sweep would only show the tie-break
+            return []
+        return [
+            {"option": options[region['option_index']]['action_type'], "share": region['share'],
+             "centroid": region['centroid'], "weight_min": region['weight_min'], "weight_max": region['weight_max']}
+            for region in optimizer.weight_regions(options, n_points=1024)['regions']
+        ]
 
-        # Step 5: Create explainer
-        explainer = {
-            "weight_vector": plan_data.get('weights', [0.2]*6),
-            "chosen_plan": chosen_plan,
-            "tradeoffs": [
-                {"option": opt['action_type'], "score": optimizer.weighted_sum_score(opt, plan_data.get('weights', [0.2]*6))}
-                for opt in options
-            ],
+    def _step_explainer(self, ctx: Dict) -> Dict:
+        return {
+            "weight_vector": ctx['weights'],
+            "chosen_plan": ctx['select'],
+            "tradeoffs": ctx['tradeoffs'],
+            "tradeoff_regions": ctx['tradeoff_regions'],
             "thresholds": {
                 "min_score": 0.7,
                 "max_risk": 3.0
             },
             "rollback_plan": "Revert to previous day's plan if any constraints are violated",
-            "monitor_results": monitor_results
+            "rejected_options": ctx['options']['rejected'],
+            "monitor_results": ctx['monitors']
         }
 
+    def execute_planning_cycle(self, plan_data: Dict) -> Dict:
+        """
+        Execute the planning cycle workflow:
+        1. Validate the plan and its candidate options
+        2. Generate Pareto frontier
+        3. Select a plan (planner_mode 'portfolio' solves for the best set of
+           actions with constitutional limits as hard constraints)
+        4. Run assurance monitors (concurrently with steps 1-3)
+        5. Return chosen plan with explainer, including per-step timings
+        """
+        started = time.perf_counter()
+        run = self.planning_pipeline.run({
+            "plan_data": plan_data,
+            "weights": plan_data.get('weights', [0.2]*6),
+            # None selects KPI_META
+            "optimizer": MultiObjectiveOptimizer(plan_data.get('kpis'))
+        }, executor=self.step_executor)
+        if run.stopped is not None:
+            return run.stopped
+
+        outputs = run.outputs
+        explainer = outputs['explainer']
+        explainer["step_timings_ms"] = dict(run.timings_ms, total=(time.perf_counter() - started) * 1000)
+
         return {
             "status": "success",
-            "pareto_set": pareto_set,
-            "chosen_plan": chosen_plan,
+            "pareto_set": outputs['pareto'],
+            "chosen_plan": outputs['select'],
             "explainer": explainer,
-            "validation": validation,
-            "monitors": monitor_results
+            "validation": outputs['validate'],
+            "monitors": outputs['monitors']
         }
 
+    def execute_planning_cycles(self, plans: List[Dict], workers: int = PLANNING_WORKERS) -> List[Dict]:
+        """Run several planning cycles (e.g. one per region) concurrently; results keep input order"""
+        if len(plans) <= 1 or workers <= 1:
+            return [self.execute_planning_cycle(plan) for plan in plans]
+        with ThreadPoolExecutor(max_workers=min(workers, len(plans))) as executor:
+            return list(executor.map(self.execute_planning_cycle, plans))
+
     def execute_low_risk_action(self, action_data: Dict) -> Dict:
         """
         Execute low-risk actions that don't require human approval:
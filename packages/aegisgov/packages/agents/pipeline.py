@@ -0,0 +1,128 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+class StopPipeline(Exception):
+    """Raised by a step to end the run early with ``result`` as its outcome"""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get('message', 'pipeline stopped'))
+        self.result = result
+
+class Step(NamedTuple):
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Sequence[str]
+    cache_key: Optional[Callable[[Dict[str, Any]], Any]]
+
+class PipelineRun(NamedTuple):
+    outputs: Dict[str, Any]
+    timings_ms: Dict[str, float]
+    stopped: Optional[Dict[str, Any]]
+
+class Pipeline:
+    """
+    A small DAG executor for orchestration steps.
+
+    Each step is a function of a context dict holding the run's inputs and
+    the outputs of earlier steps, keyed by step name. Steps start as soon as
+    their dependencies finish, so independent ones run in parallel on the
+    executor. A step with a ``cache_key`` reuses its output across runs
+    whenever the key (computed from its context) repeats; each run gets its
+    own copy, so a caller changing a result cannot change the cached one.
+    """
+
+    def __init__(self, max_cached: int = 256):
+        self.steps: Dict[str, Step] = {}
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Sequence[str] = (),
+            cache_key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> None:
+        """
+        Raises:
+            ValueError: If the name is taken or a dependency is not yet defined
+        """
+        if name in self.steps:
+            raise ValueError(f"Step '{name}' already defined")
+        missing = [dep for dep in deps if dep not in self.steps]
+        if missing:
+            raise ValueError(f"Step '{name}' depends on undefined steps: {', '.join(missing)}")
+        self.steps[name] = Step(name, fn, tuple(deps), cache_key)
+
+    def _execute(self, step: Step, context: Dict[str, Any]):
+        started = time.perf_counter()
+        key = None
+        if step.cache_key is not None:
+            key = (step.name, step.cache_key(context))
+            with self._lock:
+                hit = key in self._cache
+                if hit:
+                    self._cache.move_to_end(key)
+                    cached = self._cache[key]
+            if hit:
+                return copy.deepcopy(cached), (time.perf_counter() - started) * 1000
+
+        output = step.fn(context)
+        if key is not None:
+            with self._lock:
+                self._cache[key] = copy.deepcopy(output)
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return output, (time.perf_counter() - started) * 1000
+
+    def run(self, inputs: Dict[str, Any], executor: Optional[Executor] = None) -> PipelineRun:
+        """
+        Run every step once.
+
+        Args:
+            inputs: Initial context values
+            executor: Runs ready steps concurrently; without one, steps run
+                in definition order in the calling thread
+
+        Returns:
+            PipelineRun: Step outputs, per-step wall time in milliseconds and
+            the ``StopPipeline`` result if a step ended the run early
+        """
+        context = dict(inputs)
+        timings: Dict[str, float] = {}
+        done: set = set()
+        pending = dict(self.steps)
+
+        if executor is None:
+            for step in pending.values():
+                try:
+                    context[step.name], timings[step.name] = self._execute(step, context)
+                except StopPipeline as stop:
+                    return PipelineRun(context, timings, stop.result)
+            return PipelineRun(context, timings, None)
+
+        running: Dict[Any, Step] = {}
+        while pending or running:
+            for step in [s for s in pending.values() if all(dep in done for dep in s.deps)]:
+                del pending[step.name]
+                running[executor.submit(self._execute, step, dict(context))] = step
+            if not running:
+                raise RuntimeError(f"Unschedulable steps: {', '.join(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step = running.pop(future)
+                try:
+                    context[step.name], timings[step.name] = future.result()
+                except StopPipeline as stop:
+                    # Steps already running finish in the background; nothing new starts
+                    return PipelineRun(context, timings, stop.result)
+                done.add(step.name)
+        return PipelineRun(context, timings, None)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def step_names(self) -> List[str]:
+        return list(self.steps)
@@ -0,0 +1,180 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+# Precondition grammar (as written in agent_graph.yaml):
+#   expr       := and_expr ('or' and_expr)*
+#   and_expr   := not_expr ('and' not_expr)*
+#   not_expr   := 'not' not_expr | comparison
+#   comparison := operand (('<' | '<=' | '>' | '>=' | '==' | '!=') operand)?
+#   operand    := number | string | 'true' | 'false' | name | '(' expr ')'
+# Names may be dotted (``assurance.pass``). There are no calls or attribute
+# access, so nothing outside the evaluation context can be reached.
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d*)?|\.\d+)
+      | (?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+      | (?P<op><=|>=|==|!=|<|>|\(|\))
+      | (?P<string>'[^']*'|"[^"]*")
+    )""", re.VERBOSE)
+
+_COMPARE = {
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b
+}
+
+_KEYWORDS = {'and', 'or', 'not', 'true', 'false'}
+
+class PreconditionContext:
+    """
+    Values available to preconditions for one plan.
+
+    A name resolves through its provider (``provider(plan)``) if one is
+    registered, otherwise to the plan field of that name (0 when absent).
+    Every name is resolved at most once per context, so a provider such as
+    ``assurance.pass`` runs once however many preconditions use it.
+    """
+
+    def __init__(self, plan: Dict[str, Any], providers: Optional[Dict[str, Callable]] = None):
+        self.plan = plan
+        self.providers = providers or {}
+        self._memo: Dict[str, Any] = {}
+
+    def lookup(self, name: str) -> Any:
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        provider = self.providers.get(name)
+        value = provider(self.plan) if provider is not None else self.plan.get(name, 0)
+        self._memo[name] = value
+        return value
+
+def _tokenize(source: str) -> List[tuple]:
+    tokens, pos = [], 0
+    source = source.rstrip()
+    while pos < len(source):
+        match = _TOKEN.match(source, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unexpected character at {pos} in precondition: {source!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'name' and text in _KEYWORDS:
+            kind = text
+        tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+class _Parser:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def _take(self) -> tuple:
+        if self.pos >= len(self.tokens):
+            raise ValueError(f"Unexpected end of precondition: {self.source!r}")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self) -> Callable:
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.pos][1]}' in precondition: {self.source!r}")
+        return node
+
+    def _or(self) -> Callable:
+        terms = [self._and()]
+        while self._peek() == 'or':
+            self._take()
+            terms.append(self._and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda ctx: any(term(ctx) for term in terms)
+
+    def _and(self) -> Callable:
+        terms = [self._not()]
+        while self._peek() == 'and':
+            self._take()
+            terms.append(self._not())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda ctx: all(term(ctx) for term in terms)
+
+    def _not(self) -> Callable:
+        if self._peek() == 'not':
+            self._take()
+            operand = self._not()
+            return lambda ctx: not operand(ctx)
+        return self._comparison()
+
+    def _comparison(self) -> Callable:
+        left = self._operand()
+        kind = self._peek()
+        if kind == 'op' and self.tokens[self.pos][1] in _COMPARE:
+            compare = _COMPARE[self._take()[1]]
+            right = self._operand()
+            return lambda ctx: compare(left(ctx), right(ctx))
+        return left
+
+    def _operand(self) -> Callable:
+        kind, text = self._take()
+        if kind == 'number':
+            value = float(text)
+            return lambda ctx: value
+        if kind == 'string':
+            value = text[1:-1]
+            return lambda ctx: value
+        if kind in ('true', 'false'):
+            value = kind == 'true'
+            return lambda ctx: value
+        if kind == 'name':
+            return lambda ctx: ctx.lookup(text)
+        if text == '(':
+            node = self._or()
+            if self._take()[1] != ')':
+                raise ValueError(f"Expected ')' in precondition: {self.source!r}")
+            return node
+        raise ValueError(f"Unexpected '{text}' in precondition: {self.source!r}")
+
+@lru_cache(maxsize=1024)
+def compile_precondition(source: str) -> Callable[[PreconditionContext], bool]:
+    """
+    Compile a precondition expression into a closure over a context.
+
+    Raises:
+        ValueError: If the expression does not parse
+    """
+    node = _Parser(source).parse()
+    return lambda ctx: bool(node(ctx))
+
+class CompiledWorkflows(dict):
+    """
+    Workflow name -> compiled preconditions.
+
+    Pickles as the source expressions and recompiles on load, so snapshots
+    of the agent graph can be handed to worker processes.
+    """
+
+    def __init__(self, sources: Dict[str, List[str]]):
+        super().__init__((name, [compile_precondition(s) for s in exprs]) for name, exprs in sources.items())
+        self.sources = sources
+
+    def __reduce__(self):
+        return CompiledWorkflows, (self.sources,)
+
+def compile_workflows(agent_graph: Dict[str, Any]) -> CompiledWorkflows:
+    """Compiled preconditions of every workflow in an agent graph"""
+    return CompiledWorkflows({
+        name: list(workflow.get('preconditions', []))
+        for name, workflow in agent_graph.get('workflows', {}).items()
+    })
@@ -28,8 +28,11 @@ AegisGov Assurance Package
 """
 
 from .monitors import AssuranceMonitors
+from .streaming import EwmaStats, StreamingMonitors, WelfordStats, WindowStats
+from .tripwires import TripwireEvent, TripwireService
 
-__all__ = ["AssuranceMonitors"]
+__all__ = ["AssuranceMonitors", "StreamingMonitors", "WelfordStats", "EwmaStats", "WindowStats",
+           "TripwireService", "TripwireEvent"]
 
 
 
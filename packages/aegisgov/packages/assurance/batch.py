@@ -0,0 +1,151 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .streaming import MIN_OOD_HISTORY, OOD_KPIS, RESERVE_MARGIN_TARGET
+
+MONITORS = ('fairness_regression', 'safety_margin', 'ood_detection', 'appeal_rates')
+
+def kpi_cube(columns: Dict[str, Any], kpis: Sequence[str],
+             region_key: str = 'region', time_key: str = 'ts') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pivot a long columnar table (one row per region and time) into a cube.
+
+    Args:
+        columns: Column name -> values (a dict of arrays, e.g. a pyarrow
+            Table's ``to_pydict()``)
+        kpis: KPI columns to include; absent columns become all-NaN
+
+    Returns:
+        Tuple: (regions, times, values) with values shaped (regions x KPIs x
+        times), sorted by region and time, NaN where a row is missing
+    """
+    regions, region_idx = np.unique(np.asarray(columns[region_key]), return_inverse=True)
+    times, time_idx = np.unique(np.asarray(columns[time_key]), return_inverse=True)
+    cube = np.full((len(regions), len(kpis), len(times)), np.nan)
+    for k, kpi in enumerate(kpis):
+        if kpi in columns:
+            cube[region_idx, k, time_idx] = np.asarray(columns[kpi], dtype=float)
+    return regions, times, cube
+
+def _history_stats(history: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count, mean and population std along the last axis, ignoring NaN"""
+    valid = ~np.isnan(history)
+    count = valid.sum(axis=-1)
+    filled = np.where(valid, history, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=-1) / count
+        centered = np.where(valid, history - mean[..., None], 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=-1) / count)
+    return count, mean, std
+
+def _split_current(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Last non-NaN value along the time axis, and the values with it masked out"""
+    valid = ~np.isnan(values)
+    n_times = values.shape[-1]
+    last = n_times - 1 - np.argmax(valid[..., ::-1], axis=-1)
+    observed = valid.any(axis=-1)
+    current = np.where(observed, np.take_along_axis(values, last[..., None], axis=-1)[..., 0], np.nan)
+    is_current = (np.arange(n_times) == last[..., None]) & observed[..., None]
+    return current, np.where(is_current, np.nan, values)
+
+def evaluate_regions(values: np.ndarray, kpis: Sequence[str], monitors,
+                     appeals: Optional[Dict[str, Any]] = None,
+                     regions: Optional[Sequence[Any]] = None) -> Dict[str, Any]:
+    """
+    Evaluate every tripwire for every region in one vectorized pass.
+
+    Each region's last non-NaN observation of a KPI is its current value
+    and the earlier ones are its history, matching ``current_metrics`` and
+    ``historical_data`` of ``run_all_monitors``, so a region whose latest
+    row lags the others is still checked. A KPI never observed for a
+    region does not trigger a tripwire.
+
+    Args:
+        values: (regions x KPIs x times) array, e.g. from ``kpi_cube``
+        kpis: Name of each KPI row
+        monitors: AssuranceMonitors supplying thresholds
+        appeals: Optional per-region arrays ``total_appeals``,
+            ``upheld_appeals`` and ``population_size``
+        regions: Region labels used in the reasons (indices if None)
+
+    Returns:
+        Dict: ``monitors`` (column names), ``triggered`` (regions x monitors
+        boolean matrix), ``tripwires_triggered`` per region, ``reasons``
+        (per region, monitor -> reason for triggered monitors only),
+        ``ood`` (regions x OOD KPIs boolean matrix) with ``ood_kpis`` and
+        ``z_scores``
+    """
+    values = np.asarray(values, dtype=float)
+    n_regions = values.shape[0]
+    if values.shape[2] < 1:
+        raise ValueError("values need at least one time step")
+    kpi_index = {name: i for i, name in enumerate(kpis)}
+    current, history = _split_current(values)
+    count, mean, std = _history_stats(history)
+    triggered = np.zeros((n_regions, len(MONITORS)), dtype=bool)
+    messages = {}
+
+    # Fairness regression: Atkinson index vs its historical average
+    if 'atkinson_index' in kpi_index:
+        k = kpi_index['atkinson_index']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct_change = (current[:, k] - mean[:, k]) / mean[:, k] * 100
+        triggered[:, 0] = (count[:, k] >= 2) & (pct_change > monitors.fairness_regression_pct)
+        messages[0] = lambda r: f"Fairness regression detected: {pct_change[r]:.2f}% increase in Atkinson index"
+
+    # Safety margin: reserve margin below target minus slack
+    floor = RESERVE_MARGIN_TARGET - monitors.safety_margin_slack_pct
+    if 'reserve_margin' in kpi_index:
+        reserve = current[:, kpi_index['reserve_margin']]
+        triggered[:, 1] = reserve < floor
+        messages[1] = lambda r: f"Safety margin breach: {reserve[r]} < {floor}"
+
+    # OOD: z-score of each KPI against its own history
+    ood_kpis = [kpi for kpi in OOD_KPIS if kpi in kpi_index]
+    ood_rows = [kpi_index[kpi] for kpi in ood_kpis]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_scores = (current[:, ood_rows] - mean[:, ood_rows]) / std[:, ood_rows]
+    usable = (count[:, ood_rows] >= MIN_OOD_HISTORY) & (std[:, ood_rows] > 0)
+    ood = usable & (np.abs(z_scores) > monitors.ood_zscore)
+    z_scores = np.where(usable, z_scores, np.nan)
+    triggered[:, 2] = ood.any(axis=1)
+    messages[2] = lambda r: "OOD detected in KPIs: " + ", ".join(
+        kpi for kpi, hit in zip(ood_kpis, ood[r]) if hit)
+
+    # Appeal rates
+    if appeals is not None:
+        total = np.asarray(appeals['total_appeals'], dtype=float)
+        upheld = np.asarray(appeals['upheld_appeals'], dtype=float)
+        population = np.asarray(appeals['population_size'], dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            appeal_rate = np.where(population > 0, total / population * 100, np.nan)
+            upheld_rate = np.where(total > 0, upheld / total * 100, 0.0)
+        appeal_hit = appeal_rate > monitors.appeal_rate_pct
+        upheld_hit = (population > 0) & (upheld_rate > monitors.upheld_appeal_rate_pct)
+        triggered[:, 3] = appeal_hit | upheld_hit
+
+        def appeal_message(r):
+            parts = []
+            if appeal_hit[r]:
+                parts.append(f"Appeal rate: {appeal_rate[r]:.2f}% > {monitors.appeal_rate_pct}%")
+            if upheld_hit[r]:
+                parts.append(f"Upheld appeal rate: {upheld_rate[r]:.2f}% > {monitors.upheld_appeal_rate_pct}%")
+            return "; ".join(parts)
+        messages[3] = appeal_message
+
+    # Reason strings only for the (usually few) triggered cells
+    reasons = [{} for _ in range(n_regions)]
+    for r, m in zip(*np.nonzero(triggered)):
+        reasons[r][MONITORS[m]] = messages[m](r)
+
+    return {
+        'regions': list(regions) if regions is not None else list(range(n_regions)),
+        'monitors': list(MONITORS),
+        'triggered': triggered,
+        'tripwires_triggered': triggered.any(axis=1),
+        'reasons': reasons,
+        'ood_kpis': ood_kpis,
+        'ood': ood,
+        'z_scores': z_scores
+    }
@@ -10,7 +10,11 @@
 
 
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from .batch import evaluate_regions, kpi_cube
+from .streaming import MIN_OOD_HISTORY, OOD_KPIS, RESERVE_MARGIN_TARGET
+from .tripwires import utc_now
 
 class AssuranceMonitors:
     def __init__(self):
@@ -51,7 +55,7 @@ class AssuranceMonitors:
             return {"status": "skipped", "reason": "Insufficient data"}
 
         current_reserve = metrics['current_metrics'].get('reserve_margin', 0)
-        target_reserve = 15.0  # Example target
+        target_reserve = RESERVE_MARGIN_TARGET
 
         if current_reserve < (target_reserve - self.safety_margin_slack_pct):
             return {
@@ -67,32 +71,26 @@ class AssuranceMonitors:
         if not metrics or 'historical_data' not in metrics or 'current_metrics' not in metrics:
             return {"status": "skipped", "reason": "Insufficient data"}
 
-        historical_values = []
-        current_values = {}
-
-        # Collect historical and current values for all KPIs
-        kpi_names = ['unemployment', 'carbon_intensity', 'rent_burden']
-        for kpi in kpi_names:
-            hist_kpis = [d.get(kpi, None) for d in metrics['historical_data']]
-            current_kpi = metrics['current_metrics'].get(kpi, None)
-
-            if hist_kpis and current_kpi is not None:
-                historical_values.extend([v for v in hist_kpis if v is not None])
-                current_values[kpi] = current_kpi
-
-        # Check each KPI for OOD
+        # Each KPI is compared against its own history
+        z_scores = {}
+        checked_kpis = []
         triggered_kpis = []
-        for kpi, current_val in current_values.items():
-            if len(historical_values) < 3:  # Need at least 3 points for z-score
+        for kpi in OOD_KPIS:
+            current_val = metrics['current_metrics'].get(kpi, None)
+            if current_val is None:
                 continue
+            checked_kpis.append(kpi)
 
-            mean_val = np.mean(historical_values)
-            std_val = np.std(historical_values)
+            history = np.array([d[kpi] for d in metrics['historical_data'] if d.get(kpi) is not None], dtype=float)
+            if len(history) < MIN_OOD_HISTORY:  # Need at least 3 points for z-score
+                continue
 
+            std_val = history.std()
             if std_val == 0:
                 continue
 
-            z_score = (current_val - mean_val) / std_val
+            z_score = (current_val - history.mean()) / std_val
+            z_scores[kpi] = float(z_score)
             if abs(z_score) > self.ood_zscore:
                 triggered_kpis.append(kpi)
 
@@ -100,10 +98,10 @@ class AssuranceMonitors:
             return {
                 "status": "triggered",
                 "reason": f"OOD detected in KPIs: {', '.join(triggered_kpis)}",
-                "details": {"z_scores": current_values}
+                "details": {"z_scores": z_scores}
             }
 
-        return {"status": "passed", "details": {"checked_kpis": list(current_values.keys())}}
+        return {"status": "passed", "details": {"checked_kpis": checked_kpis, "z_scores": z_scores}}
 
     def check_appeal_rates(self, metrics: Dict) -> Dict:
         """Check appeal rates"""
@@ -155,6 +153,37 @@ class AssuranceMonitors:
                        for k, v in results.items()}
         }
 
+    def run_region_monitors(self, columns: Dict, appeals: Optional[Dict] = None,
+                            region_key: str = 'region', time_key: str = 'ts') -> Dict:
+        """
+        Run every monitor for many regions at once.
+
+        Args:
+            columns: Long columnar table, one row per region and time, with a
+                column per KPI
+            appeals: Optional columns ``region``, ``total_appeals``,
+                ``upheld_appeals`` and ``population_size``, one row per region
+
+        Returns:
+            Dict: See ``batch.evaluate_regions``; rows follow ``regions``
+        """
+        kpis = [name for name in columns if name not in (region_key, time_key)]
+        regions, _, values = kpi_cube(columns, kpis, region_key, time_key)
+
+        aligned = None
+        if appeals is not None:
+            # Regions without appeal rows get zero appeals and an invalid population
+            position = {region: i for i, region in enumerate(regions.tolist())}
+            rows = np.array([position.get(region, -1) for region in appeals[region_key]], dtype=int)
+            known = rows >= 0
+            aligned = {}
+            for name in ('total_appeals', 'upheld_appeals', 'population_size'):
+                column = np.zeros(len(regions))
+                column[rows[known]] = np.asarray(appeals[name], dtype=float)[known]
+                aligned[name] = column
+
+        return evaluate_regions(values, kpis, self, appeals=aligned, regions=regions.tolist())
+
     def auto_pause_on_tripwire(self, metrics: Dict) -> Dict:
         """Auto-pause system and log ledger entry when tripwires triggered"""
         result = self.run_all_monitors(metrics)
@@ -162,10 +191,8 @@ class AssuranceMonitors:
         if not result['tripwires_triggered']:
             return {"status": "running", "message": "All monitors passed"}
 
-        # In a real system, this would:
-        # 1. Pause all agents
-        # 2. Create ledger entry with reason
-        # 3. Notify human operators
+        # The event-driven TripwireService debounces triggers and writes
+        # pauses to the ledger; this one-shot check only reports the entry
 
         triggered_reasons = [v for v in result['details'].values() if v is not None]
         pause_reason = "; ".join(triggered_reasons)
@@ -173,18 +200,11 @@ class AssuranceMonitors:
         return {
             "status": "paused",
             "message": f"System auto-paused due to tripwires: {pause_reason}",
+            "reason": pause_reason,
             "ledger_entry": {
-                "ts": "2025-08-22T12:00:00Z",
+                "ts": utc_now(),
                 "severity": "critical",
                 "reason": pause_reason,
                 "action_taken": "auto_pause"
             }
         }
-
-
-
-
-
-
-
-
@@ -0,0 +1,208 @@
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Reserve margin the safety tripwire protects (percent)
+RESERVE_MARGIN_TARGET = 15.0
+# KPIs checked for out-of-distribution values
+OOD_KPIS = ('unemployment', 'carbon_intensity', 'rent_burden')
+# Observations needed before a KPI's z-score is trusted
+MIN_OOD_HISTORY = 3
+
+class WelfordStats:
+    """Running mean and (population) variance over every observation, O(1) per update"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+class EwmaStats:
+    """Exponentially weighted mean and variance; recent observations dominate"""
+
+    def __init__(self, alpha: float = 0.05):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.mean = float(value)
+            return
+        delta = value - self.mean
+        increment = self.alpha * delta
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + delta * increment)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+class WindowStats:
+    """
+    Mean and variance of the last ``size`` observations.
+
+    Welford's update is applied as values enter and reversed as they leave
+    the window, so the variance stays accurate for large, nearly constant
+    values where sums of squares cancel.
+    """
+
+    def __init__(self, size: int = 30):
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.size = size
+        self._values: deque = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self._values.append(value)
+        delta = value - self.mean
+        self.mean += delta / len(self._values)
+        self._m2 += delta * (value - self.mean)
+        if len(self._values) > self.size:
+            old = self._values.popleft()
+            delta = old - self.mean
+            self.mean -= delta / len(self._values)
+            self._m2 -= delta * (old - self.mean)
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    @property
+    def variance(self) -> float:
+        if not self._values:
+            return 0.0
+        # Removals can leave a rounding residue just below zero for constant windows
+        return max(self._m2 / len(self._values), 0.0)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+STATISTICS = {'welford': WelfordStats, 'ewma': EwmaStats, 'window': WindowStats}
+
+class StreamingMonitors:
+    """
+    Tripwires evaluated on every KPI observation.
+
+    Each (region, KPI) stream keeps its own running statistics, so a check
+    costs O(1) regardless of history length. An observation is compared
+    against the statistics of the observations before it, then folded in:
+
+    - ``atkinson_index``: fairness regression, percent rise over the running mean
+    - ``reserve_margin``: safety margin below target minus slack
+    - ``OOD_KPIS``: z-score against the KPI's own running mean and std
+    """
+
+    def __init__(self, monitors=None, stats: str = 'welford', **stats_options):
+        """
+        Args:
+            monitors: AssuranceMonitors supplying thresholds (defaults if None)
+            stats: 'welford' (all history), 'ewma' (``alpha``) or 'window' (``size``)
+        """
+        if stats not in STATISTICS:
+            raise ValueError(f"Unknown statistics: {stats}")
+        if monitors is None:
+            from .monitors import AssuranceMonitors
+            monitors = AssuranceMonitors()
+        self.monitors = monitors
+        self.stats = stats
+        self.stats_options = stats_options
+        self._streams: Dict[Tuple[Optional[str], str], Any] = {}
+
+    def statistics(self, kpi: str, region: Optional[str] = None):
+        key = (region, kpi)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = STATISTICS[self.stats](**self.stats_options)
+        return stream
+
+    def _check(self, kpi: str, value: float, stream) -> Dict[str, Dict]:
+        results = {}
+        if kpi == 'atkinson_index' and stream.count >= 2 and stream.mean != 0:
+            pct_change = (value - stream.mean) / stream.mean * 100
+            if pct_change > self.monitors.fairness_regression_pct:
+                results['fairness_regression'] = {
+                    "status": "triggered",
+                    "reason": f"Fairness regression detected: {pct_change:.2f}% increase in Atkinson index",
+                    "details": {"current_value": value, "historical_avg": stream.mean}
+                }
+        if kpi == 'reserve_margin':
+            floor = RESERVE_MARGIN_TARGET - self.monitors.safety_margin_slack_pct
+            if value < floor:
+                results['safety_margin'] = {
+                    "status": "triggered",
+                    "reason": f"Safety margin breach: {value} < {floor}",
+                    "details": {"current_value": value, "target": RESERVE_MARGIN_TARGET}
+                }
+        if kpi in OOD_KPIS and stream.count >= MIN_OOD_HISTORY and stream.std > 0:
+            z_score = (value - stream.mean) / stream.std
+            if abs(z_score) > self.monitors.ood_zscore:
+                results['ood_detection'] = {
+                    "status": "triggered",
+                    "reason": f"OOD detected in KPIs: {kpi}",
+                    "details": {"z_scores": {kpi: z_score}}
+                }
+        return results
+
+    def observe(self, kpi: str, value: float, region: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Check one new KPI value, then add it to the stream's statistics.
+
+        Returns:
+            Dict: Monitor name -> triggered result (empty when all pass)
+        """
+        value = float(value)
+        stream = self.statistics(kpi, region)
+        results = self._check(kpi, value, stream)
+        stream.update(value)
+        return results
+
+    def observe_tick(self, values: Dict[str, float], region: Optional[str] = None) -> Dict[str, Any]:
+        """Observe several KPIs at once; same result shape as ``run_all_monitors``"""
+        triggered: Dict[str, list] = {}
+        ood_kpis = []
+        for kpi, value in values.items():
+            if value is None:
+                continue
+            for name, result in self.observe(kpi, value, region).items():
+                if name == 'ood_detection':
+                    ood_kpis.append(kpi)
+                else:
+                    triggered.setdefault(name, []).append(result['reason'])
+        details = {name: "; ".join(reasons) for name, reasons in triggered.items()}
+        if ood_kpis:
+            # One reason listing every KPI, in OOD_KPIS order like run_all_monitors
+            details['ood_detection'] = "OOD detected in KPIs: " + ", ".join(
+                kpi for kpi in OOD_KPIS if kpi in ood_kpis)
+        return {
+            "tripwires_triggered": bool(details),
+            "details": details
+        }
+
+    def seed(self, historical_data: Iterable[Dict[str, float]], region: Optional[str] = None) -> None:
+        """Load past observations (e.g. ``metrics['historical_data']``) without checking them"""
+        for row in historical_data:
+            for kpi, value in row.items():
+                if isinstance(value, (int, float)):
+                    self.statistics(kpi, region).update(float(value))
@@ -0,0 +1,181 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .streaming import OOD_KPIS, StreamingMonitors
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class TripwireEvent(NamedTuple):
+    kind: str  # 'pause' or 'resume'
+    region: Optional[str]
+    monitor: str
+    kpi: str
+    value: float
+    reason: Optional[str]
+    ts: str
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def monitors_for(kpi: str) -> List[str]:
+    """Streaming monitors that a KPI observation feeds"""
+    names = []
+    if kpi == 'atkinson_index':
+        names.append('fairness_regression')
+    if kpi == 'reserve_margin':
+        names.append('safety_margin')
+    if kpi in OOD_KPIS:
+        names.append('ood_detection')
+    return names
+
+def pause_decision(region: Optional[str], monitor: str, reason: str, ts: str,
+                   inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """An auto-pause as a ledger decision (``LedgerWriter.write_decisions`` keys)"""
+    return {
+        'inputs_bundle': dict(inputs, region=region, ts=ts),
+        'objectives': {},
+        'options_considered': [],
+        'chosen_action': {
+            'action_type': 'auto_pause',
+            'region': region,
+            'monitor': monitor,
+            'severity': 'critical',
+            'reason': reason
+        },
+        'tests_passed': {monitor: False}
+    }
+
+class _Debounce:
+    __slots__ = ('tripped', 'hits', 'passes', 'since')
+
+    def __init__(self):
+        self.tripped = False
+        self.hits = 0
+        self.passes = 0
+        self.since = 0.0
+
+class TripwireService:
+    """
+    Event-driven tripwires over a queue of KPI updates.
+
+    Updates (``{"region", "kpi", "value"}``) are checked as they arrive by
+    ``StreamingMonitors``. Each (region, monitor, KPI) keeps debounce state:
+    it pauses after ``trip_after`` consecutive triggered observations and
+    resumes only after ``clear_after`` consecutive passes and at least
+    ``min_pause_s`` seconds paused, so a value hovering at a threshold
+    does not flap. Every pause is appended to the ledger through the
+    group-commit ``LedgerAppendService`` when one is given.
+    """
+
+    def __init__(self, streaming: Optional[StreamingMonitors] = None, append_service=None,
+                 trip_after: int = 2, clear_after: int = 5, min_pause_s: float = 300.0,
+                 on_event: Optional[Callable[[TripwireEvent], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if trip_after < 1 or clear_after < 1:
+            raise ValueError("trip_after and clear_after must be positive")
+        self.streaming = streaming or StreamingMonitors()
+        self.append_service = append_service
+        self.trip_after = trip_after
+        self.clear_after = clear_after
+        self.min_pause_s = min_pause_s
+        self.on_event = on_event
+        self.clock = clock
+        self._state: Dict[Tuple[Optional[str], str, str], _Debounce] = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.ledger_writes = {'appended': 0, 'failed': 0}
+
+    def start(self) -> 'TripwireService':
+        """Start consuming queued updates on a worker thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='tripwires', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Process everything queued so far and stop the worker thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, update: Dict[str, Any]) -> None:
+        """Queue a KPI update for the worker thread"""
+        self._queue.put(update)
+
+    def _run(self) -> None:
+        while True:
+            update = self._queue.get()
+            if update is _STOP:
+                break
+            try:
+                self.process(update)
+            except Exception:
+                logger.exception("Tripwire update failed: %r", update)
+
+    def process(self, update: Dict[str, Any]) -> List[TripwireEvent]:
+        """
+        Check one KPI update and advance the debounce state.
+
+        Returns:
+            List[TripwireEvent]: Pause and resume transitions this update caused
+        """
+        region, kpi, value = update.get('region'), update['kpi'], float(update['value'])
+        with self._lock:
+            triggered = self.streaming.observe(kpi, value, region)
+            now = self.clock()
+            events = []
+            for monitor in monitors_for(kpi):
+                state = self._state.setdefault((region, monitor, kpi), _Debounce())
+                result = triggered.get(monitor)
+                if result is not None:
+                    state.hits += 1
+                    state.passes = 0
+                    if not state.tripped and state.hits >= self.trip_after:
+                        state.tripped, state.since = True, now
+                        events.append(TripwireEvent('pause', region, monitor, kpi, value, result['reason'], utc_now()))
+                else:
+                    state.hits = 0
+                    state.passes += 1
+                    if (state.tripped and state.passes >= self.clear_after
+                            and now - state.since >= self.min_pause_s):
+                        state.tripped = False
+                        events.append(TripwireEvent('resume', region, monitor, kpi, value, None, utc_now()))
+
+        for event in events:
+            if event.kind == 'pause' and self.append_service is not None:
+                decision = pause_decision(event.region, event.monitor, event.reason, event.ts,
+                                          {'kpi': event.kpi, 'value': event.value})
+                self.append_service.append(decision).add_done_callback(self._ledger_written)
+            if self.on_event is not None:
+                self.on_event(event)
+        return events
+
+    def _ledger_written(self, future) -> None:
+        if future.exception() is not None:
+            self.ledger_writes['failed'] += 1
+            logger.error("Writing auto-pause to the ledger failed: %s", future.exception())
+        else:
+            self.ledger_writes['appended'] += 1
+
+    def paused(self, region: Optional[str] = None) -> Dict[str, List[str]]:
+        """Tripped monitors per region (only ``region`` if given)"""
+        with self._lock:
+            result: Dict[str, List[str]] = {}
+            for (r, monitor, kpi), state in self._state.items():
+                if state.tripped and (region is None or r == region):
+                    result.setdefault(r, []).append(f"{monitor}:{kpi}")
+            return result
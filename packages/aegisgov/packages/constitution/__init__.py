@@ -11,9 +11,10 @@
 
 # Constitution package initialization
 
+from .artifacts import ArtifactCache, Snapshot, artifact_cache
 from .engine import ConstitutionEngine
 
-__all__ = ['ConstitutionEngine']
+__all__ = ['ConstitutionEngine', 'ArtifactCache', 'Snapshot', 'artifact_cache']
 
 
 
@@ -0,0 +1,123 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stat() checks of a watched file
+CHECK_INTERVAL = 1.0
+
+class Snapshot(NamedTuple):
+    """One immutable, parsed version of an artifact file"""
+    name: str
+    path: str
+    version_id: str
+    data: Any
+    compiled: Any
+    stat: Tuple[int, int, int]
+
+def _stat_key(path: str) -> Tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+class ArtifactCache:
+    """
+    Process-wide cache of versioned configuration artifacts.
+
+    Each artifact is parsed (and optionally compiled) once into an immutable
+    ``Snapshot`` whose ``version_id`` combines the declared ``version`` with
+    a content hash. ``get`` re-stats the file at most every
+    ``check_interval`` seconds and swaps in a new snapshot when it changed;
+    a file that fails to parse keeps the previous snapshot serving. Callers
+    that hold a snapshot keep a consistent view across a reload.
+
+    Worker processes can skip parsing altogether: pass ``export()`` to the
+    pool initializer and ``install`` it there.
+    """
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._loaders: Dict[str, Tuple[str, Callable]] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str, loader: Callable[[bytes], Tuple[Any, Any]]) -> None:
+        """
+        Watch ``path`` as artifact ``name``.
+
+        Args:
+            loader: Parses the raw file into ``(data, compiled)``
+        """
+        with self._lock:
+            if self._loaders.get(name, (None,))[0] != path:
+                self._snapshots.pop(name, None)
+            self._loaders[name] = (path, loader)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._loaders
+
+    def _load(self, name: str) -> Snapshot:
+        path, loader = self._loaders[name]
+        stat = _stat_key(path)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data, compiled = loader(raw)
+        digest = hashlib.sha256(raw).hexdigest()[:12]
+        declared = data.get('version') if isinstance(data, dict) else None
+        version_id = f"{declared}+{digest}" if declared is not None else digest
+        return Snapshot(name, path, version_id, data, compiled, stat)
+
+    def get(self, name: str) -> Snapshot:
+        """Current snapshot of an artifact, reloading it if the file changed"""
+        if name not in self._loaders:
+            raise KeyError(f"Unknown artifact: {name}")
+        snapshot = self._snapshots.get(name)
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked.get(name, 0.0) < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+            self._checked[name] = now
+            try:
+                if snapshot is not None and _stat_key(snapshot.path) == snapshot.stat:
+                    return snapshot
+                fresh = self._load(name)
+            except Exception:
+                if snapshot is None:
+                    raise
+                logger.exception("Reloading %s failed; keeping version %s", name, snapshot.version_id)
+                return snapshot
+            if snapshot is not None and fresh.version_id != snapshot.version_id:
+                logger.info("Reloaded %s: %s -> %s", name, snapshot.version_id, fresh.version_id)
+            self._snapshots[name] = fresh
+            return fresh
+
+    def reload(self, name: Optional[str] = None) -> None:
+        """Force the next ``get`` to re-check the file(s)"""
+        with self._lock:
+            for key in [name] if name else list(self._checked):
+                self._checked.pop(key, None)
+
+    def export(self) -> Dict[str, Snapshot]:
+        """Picklable snapshots of every registered artifact"""
+        return {name: self.get(name) for name in list(self._loaders)}
+
+    def install(self, snapshots: Dict[str, Snapshot]) -> None:
+        """Seed this process's cache with snapshots exported by another process"""
+        with self._lock:
+            now = time.monotonic()
+            for name, snapshot in snapshots.items():
+                if name in self._loaders and self._loaders[name][0] == snapshot.path:
+                    self._snapshots[name] = snapshot
+                    self._checked[name] = now
+
+    def versions(self) -> Dict[str, str]:
+        return {name: snapshot.version_id for name, snapshot in self._snapshots.items()}
+
+# Shared by every ConstitutionEngine and AgentOrchestrator in the process
+artifact_cache = ArtifactCache()
@@ -12,80 +12,125 @@
 
 
 import json
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional, Sequence
+
+from . import rules
+from .artifacts import ArtifactCache, Snapshot, artifact_cache
+
+# Population-impact gate: above these a plan needs council approval / a referendum
+POPULATION_COUNCIL_PCT = 5
+POPULATION_REFERENDUM_PCT = 10
+
+CONSTITUTION_PATH = os.path.join(os.path.dirname(__file__), 'constitution_v02.json')
+
+def load_constitution(raw: bytes):
+    """Parse and compile the constitution file (an ArtifactCache loader)"""
+    constitution = json.loads(raw)
+    return constitution, rules.CompiledConstitution(constitution, POPULATION_COUNCIL_PCT, POPULATION_REFERENDUM_PCT)
+
+artifact_cache.register('constitution', CONSTITUTION_PATH, load_constitution)
 
 class ConstitutionEngine:
-    def __init__(self):
-        # Load constitution from file
-        import os
-        constitution_path = os.path.join(os.path.dirname(__file__), 'constitution_v02.json')
-        with open(constitution_path, 'r') as f:
-            self.constitution = json.load(f)
+    def __init__(self, cache: Optional[ArtifactCache] = None):
+        # The constitution is parsed and compiled once per process, and
+        # reloaded when the file changes
+        self.cache = cache or artifact_cache
+        if 'constitution' not in self.cache:
+            self.cache.register('constitution', CONSTITUTION_PATH, load_constitution)
+
+    def snapshot(self) -> Snapshot:
+        """Current constitution version (data, compiled rules and version ID)"""
+        return self.cache.get('constitution')
+
+    @property
+    def constitution(self) -> Dict[str, Any]:
+        return self.snapshot().data
+
+    @property
+    def rules(self) -> rules.CompiledConstitution:
+        return self.snapshot().compiled
 
     def validate_weight_vector(self, weights: list) -> Dict[str, Any]:
         """Validate weight vector against constitutional constraints"""
         errors = []
+        rule_ids = []
 
         # Check sum to 1.0
         if not abs(sum(weights) - 1.0) < 1e-6:
             errors.append("Weight vector must sum to 1.0")
+            rule_ids.append(rules.WEIGHTS_SUM)
 
         # Check min/max constraints
         for i, weight in enumerate(weights):
             if weight < 0 or weight > 1:
                 errors.append(f"Weight {i} must be between 0 and 1")
+                if rules.WEIGHTS_RANGE not in rule_ids:
+                    rule_ids.append(rules.WEIGHTS_RANGE)
 
-        return {"valid": len(errors) == 0, "errors": errors}
+        return {"valid": len(errors) == 0, "errors": errors, "rule_ids": rule_ids}
 
-    def validate_objectives(self, objectives: list) -> Dict[str, Any]:
-        """Validate that objectives are allowed by constitution"""
-        allowed_objectives = self.constitution['objectives']
+    def validate_objectives(self, objectives: list,
+                            constitution: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Validate that objectives are allowed by constitution (the current one if not given)"""
+        allowed_objectives = (constitution or self.constitution)['objectives']
         errors = []
 
         for obj in objectives:
             if obj not in allowed_objectives:
                 errors.append(f"Objective '{obj}' is not allowed by constitution")
 
-        return {"valid": len(errors) == 0, "errors": errors}
+        return {"valid": len(errors) == 0, "errors": errors,
+                "rule_ids": [rules.OBJECTIVES_ALLOWED] if errors else []}
 
-    def validate_domain_scope(self, action: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate that action is within allowed domains"""
-        allowed_domains = self.constitution['scope']['domains']
+    def validate_domain_scope(self, action: Dict[str, Any],
+                              constitution: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Validate that action is within allowed domains (of the current constitution if not given)"""
+        allowed_domains = (constitution or self.constitution)['scope']['domains']
         action_domain = action.get('domain', '')
 
         if action_domain not in allowed_domains:
             return {
                 "valid": False,
-                "errors": [f"Domain '{action_domain}' is not allowed by constitution"]
+                "errors": [f"Domain '{action_domain}' is not allowed by constitution"],
+                "rule_ids": [rules.SCOPE_DOMAIN]
             }
 
-        return {"valid": True, "errors": []}
+        return {"valid": True, "errors": [], "rule_ids": []}
 
     def validate_population_impact(self, impact_pct: float) -> Dict[str, Any]:
         """Validate population impact against constitutional limits"""
         errors = []
+        rule_ids = []
 
-        if impact_pct > 5:
-            errors.append("Population impact >5% requires human council approval")
-        if impact_pct > 10:
-            errors.append("Population impact >10% requires referendum or emergency basis")
+        if impact_pct > POPULATION_COUNCIL_PCT:
+            errors.append(f"Population impact >{POPULATION_COUNCIL_PCT}% requires human council approval")
+            rule_ids.append(rules.POPULATION_COUNCIL)
+        if impact_pct > POPULATION_REFERENDUM_PCT:
+            errors.append(f"Population impact >{POPULATION_REFERENDUM_PCT}% requires referendum or emergency basis")
+            rule_ids.append(rules.POPULATION_REFERENDUM)
 
-        return {"valid": len(errors) == 0, "errors": errors}
+        return {"valid": len(errors) == 0, "errors": errors, "rule_ids": rule_ids}
 
-    def validate_budget_impact(self, budget_delta_pct: float) -> Dict[str, Any]:
-        """Validate budget impact against constitutional limits"""
-        max_delta = self.constitution['rate_limits']['max_budget_delta_pct']
+    def validate_budget_impact(self, budget_delta_pct: float,
+                               constitution: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Validate budget impact against constitutional limits (the current ones if not given)"""
+        max_delta = (constitution or self.constitution)['rate_limits']['max_budget_delta_pct']
 
         if abs(budget_delta_pct) > max_delta:
             return {
                 "valid": False,
-                "errors": [f"Budget delta {budget_delta_pct}% exceeds limit of ±{max_delta}%"]
+                "errors": [f"Budget delta {budget_delta_pct}% exceeds limit of ±{max_delta}%"],
+                "rule_ids": [rules.BUDGET_DELTA]
             }
 
-        return {"valid": True, "errors": []}
+        return {"valid": True, "errors": [], "rule_ids": []}
 
     def validate_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
         """Validate entire plan against constitutional constraints"""
+        # Every check reads this one version, even if the file is reloaded meanwhile
+        snapshot = self.snapshot()
+        constitution = snapshot.data
         results = {}
 
         # Validate weight vector
@@ -94,14 +139,14 @@ class ConstitutionEngine:
 
         # Validate objectives
         if 'objectives' in plan:
-            results['objective_validation'] = self.validate_objectives(plan['objectives'])
+            results['objective_validation'] = self.validate_objectives(plan['objectives'], constitution)
 
         # Validate action domain
         if 'action' in plan:
-            results['domain_validation'] = self.validate_domain_scope(plan['action'])
+            results['domain_validation'] = self.validate_domain_scope(plan['action'], constitution)
         elif 'actions' in plan:
             for i, action in enumerate(plan['actions']):
-                results[f'action_{i}_validation'] = self.validate_domain_scope(action)
+                results[f'action_{i}_validation'] = self.validate_domain_scope(action, constitution)
 
         # Validate population impact
         if 'population_impact_pct' in plan:
@@ -109,7 +154,7 @@ class ConstitutionEngine:
 
         # Validate budget impact
         if 'budget_delta_pct' in plan:
-            results['budget_validation'] = self.validate_budget_impact(plan['budget_delta_pct'])
+            results['budget_validation'] = self.validate_budget_impact(plan['budget_delta_pct'], constitution)
 
         # Overall validation result
         all_valid = all(
@@ -120,7 +165,41 @@ class ConstitutionEngine:
         return {
             "valid": all_valid,
             "results": results,
-            "constitution_version": self.constitution['version']
+            "failed_rules": [rule for result in results.values() for rule in result.get('rule_ids', [])],
+            "constitution_version": constitution['version'],
+            "constitution_version_id": snapshot.version_id
+        }
+
+    def validate_plans(self, plans: Sequence[Dict[str, Any]], as_actions: bool = False) -> Dict[str, Any]:
+        """
+        Validate a batch of plans with the compiled rule set.
+
+        Same rules as ``validate_plan``, evaluated as numpy masks over the
+        whole batch; use it to filter thousands of candidates before scoring.
+
+        Args:
+            plans: Plans as accepted by ``validate_plan``
+            as_actions: Treat each plan as a single action, e.g. planner options
+
+        Returns:
+            Dict: ``valid`` (boolean array), ``failed_rules`` (rule IDs per
+            plan), per-rule ``masks``, ``constitution_version`` and
+            ``constitution_version_id``
+        """
+        snapshot = self.snapshot()
+        result = snapshot.compiled.validate_plans(plans, as_actions)
+        result['constitution_version_id'] = snapshot.version_id
+        return result
+
+    def planning_constraints(self) -> Dict[str, Any]:
+        """Limits the planner must satisfy, as hard constraints for portfolio selection"""
+        constitution = self.constitution
+        return {
+            "max_budget_delta_pct": constitution['rate_limits']['max_budget_delta_pct'],
+            "max_population_impact_pct": POPULATION_COUNCIL_PCT,
+            "max_actions": constitution['rate_limits']['auto_exec_per_day'],
+            "domains": constitution['scope']['domains'],
+            "exclusive_key": "action_type"
         }
 
     def get_weight_profiles(self) -> Dict[str, Any]:
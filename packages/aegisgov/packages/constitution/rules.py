@@ -0,0 +1,122 @@
+from itertools import chain
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Rule IDs, named after the constitution section each rule enforces
+WEIGHTS_SUM = 'weights_schema.sum'
+WEIGHTS_RANGE = 'weights_schema.range'
+OBJECTIVES_ALLOWED = 'objectives.allowed'
+SCOPE_DOMAIN = 'scope.domains'
+POPULATION_COUNCIL = 'population_gate.council'
+POPULATION_REFERENDUM = 'population_gate.referendum'
+BUDGET_DELTA = 'rate_limits.max_budget_delta_pct'
+
+RULE_IDS = (WEIGHTS_SUM, WEIGHTS_RANGE, OBJECTIVES_ALLOWED, SCOPE_DOMAIN,
+            POPULATION_COUNCIL, POPULATION_REFERENDUM, BUDGET_DELTA)
+
+def _ragged(values: Sequence[Sequence], dtype=float):
+    """Flatten per-plan lists into one array plus the owning plan of each element"""
+    lengths = np.fromiter((len(v) for v in values), dtype=np.intp, count=len(values))
+    flat = np.array(list(chain.from_iterable(values)), dtype=dtype)
+    return flat, np.repeat(np.arange(len(values)), lengths), lengths
+
+def _any_per_plan(failed: np.ndarray, owner: np.ndarray, n_plans: int) -> np.ndarray:
+    return np.bincount(owner[failed], minlength=n_plans) > 0
+
+def _scalar_column(plans: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    # NaN marks plans without the field; comparisons with NaN are False, so they pass
+    return np.array([plan.get(key, np.nan) for plan in plans], dtype=float)
+
+class CompiledConstitution:
+    """
+    A constitution compiled into array checks over batches of plans.
+
+    Limits and allowed sets are resolved once at construction; each rule
+    then evaluates a whole batch as a numpy mask of failing plans. Plans
+    use the same fields as ``ConstitutionEngine.validate_plan`` and a rule
+    whose field is absent from a plan does not apply to it.
+    """
+
+    def __init__(self, constitution: Dict[str, Any], population_council_pct: float,
+                 population_referendum_pct: float):
+        schema = constitution.get('weights_schema', {})
+        self.version = constitution['version']
+        self.weight_sum = float(schema.get('sum', 1.0))
+        self.weight_min = float(schema.get('min', 0.0))
+        self.weight_max = float(schema.get('max', 1.0))
+        self.objectives = np.array(sorted(constitution['objectives']))
+        self.domains = np.array(sorted(constitution['scope']['domains']))
+        self.max_budget_delta_pct = float(constitution['rate_limits']['max_budget_delta_pct'])
+        self.population_council_pct = float(population_council_pct)
+        self.population_referendum_pct = float(population_referendum_pct)
+
+    def _weight_masks(self, plans, n: int) -> Dict[str, np.ndarray]:
+        has = np.array(['weights' in plan for plan in plans], dtype=bool)
+        flat, owner, _ = _ragged([plan.get('weights', ()) for plan in plans])
+        sums = np.bincount(owner, weights=flat, minlength=n)
+        out_of_range = (flat < self.weight_min) | (flat > self.weight_max)
+        return {
+            WEIGHTS_SUM: has & ~(np.abs(sums - self.weight_sum) < 1e-6),
+            WEIGHTS_RANGE: _any_per_plan(out_of_range, owner, n)
+        }
+
+    def _objective_mask(self, plans, n: int) -> np.ndarray:
+        flat, owner, _ = _ragged([plan.get('objectives', ()) for plan in plans], dtype=object)
+        return _any_per_plan(~np.isin(flat.astype(str), self.objectives), owner, n)
+
+    def _domain_mask(self, plans, n: int, as_actions: bool) -> np.ndarray:
+        if as_actions:
+            # An option without a domain (e.g. a scenario runner policy mix) is not scoped
+            actions = [[plan] if 'domain' in plan else [] for plan in plans]
+        else:
+            actions = [[plan['action']] if 'action' in plan else plan.get('actions', ()) for plan in plans]
+        flat, owner, _ = _ragged([[a.get('domain', '') for a in acts] for acts in actions], dtype=object)
+        return _any_per_plan(~np.isin(flat.astype(str), self.domains), owner, n)
+
+    def evaluate(self, plans: Sequence[Dict[str, Any]], as_actions: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Failure mask of every rule over a batch of plans.
+
+        Args:
+            plans: Plans as accepted by ``ConstitutionEngine.validate_plan``
+            as_actions: Treat each plan as a single action (its own ``domain``,
+                not checked when absent), e.g. planner candidate options
+
+        Returns:
+            Dict: Rule ID -> boolean array, True where the plan fails the rule
+        """
+        n = len(plans)
+        population = _scalar_column(plans, 'population_impact_pct')
+        budget = _scalar_column(plans, 'budget_delta_pct')
+
+        masks = self._weight_masks(plans, n)
+        masks[OBJECTIVES_ALLOWED] = self._objective_mask(plans, n)
+        masks[SCOPE_DOMAIN] = self._domain_mask(plans, n, as_actions)
+        masks[POPULATION_COUNCIL] = population > self.population_council_pct
+        masks[POPULATION_REFERENDUM] = population > self.population_referendum_pct
+        masks[BUDGET_DELTA] = np.abs(budget) > self.max_budget_delta_pct
+        return masks
+
+    def validate_plans(self, plans: Sequence[Dict[str, Any]], as_actions: bool = False) -> Dict[str, Any]:
+        """
+        Validate a batch of plans in one pass.
+
+        Returns:
+            Dict: ``valid`` (boolean array), ``failed_rules`` (rule IDs per
+            plan), ``masks`` (per-rule failure masks) and ``constitution_version``
+        """
+        masks = self.evaluate(plans, as_actions)
+        stacked = np.vstack([masks[rule] for rule in RULE_IDS]) if plans else np.zeros((len(RULE_IDS), 0), dtype=bool)
+        valid = ~stacked.any(axis=0)
+
+        failed_rules: List[List[str]] = [[] for _ in range(len(plans))]
+        for rule_index, plan_index in zip(*np.nonzero(stacked)):
+            failed_rules[plan_index].append(RULE_IDS[rule_index])
+
+        return {
+            'valid': valid,
+            'failed_rules': failed_rules,
+            'masks': masks,
+            'constitution_version': self.version
+        }
@@ -24,10 +24,11 @@
 AegisGov Ledger Package
 """
 
-from .models import DecisionLedger
+from .models import Decision
+from .canonical import decision_payload_hash
 from .writer import LedgerWriter
 
-__all__ = ["DecisionLedger", "LedgerWriter"]
+__all__ = ["Decision", "LedgerWriter", "decision_payload_hash"]
 
 
 
@@ -13,7 +13,7 @@
 
 
 
-from sqlalchemy import Column, BigInteger, TIMESTAMP, JSON, LargeBinary, Index
+from sqlalchemy import Column, BigInteger, Integer, TIMESTAMP, JSON, LargeBinary, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -22,7 +22,8 @@ Base = declarative_base()
 class Decision(Base):
     __tablename__ = 'decisions'
 
-    decision_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    decision_id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
     ts = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
     prev_decision_id = Column(BigInteger, index=True)
     inputs_bundle = Column(JSON, nullable=False)
@@ -37,6 +38,8 @@ class Decision(Base):
     # Hash chain fields
     prev_hash = Column(LargeBinary)
     curr_hash = Column(LargeBinary, unique=True)
+    # Hash of the payload alone (no prev_hash): the idempotency key
+    payload_hash = Column(LargeBinary, unique=True)
 
     __table_args__ = (
         Index('idx_decisions_ts', 'ts'),
@@ -14,47 +14,49 @@
 
 
 
-import hashlib
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
+from .canonical import decision_payload_hash
 from .models import Decision
 
 class LedgerWriter:
     def __init__(self):
         pass
 
-    def compute_hash(self, prev_hash: bytes, inputs_bundle: Dict, objectives: Dict,
+    def compute_hash(self, prev_hash: Optional[bytes], inputs_bundle: Dict, objectives: Dict,
                     options_considered: Dict, chosen_action: Dict, tests_passed: Dict) -> bytes:
-        """Compute SHA-256 hash for a decision"""
-        # Convert all JSON to strings
-        payload = (
-            (prev_hash.hex() if prev_hash else '') + '|' +
-            str(inputs_bundle).encode('utf-8') + b'|' +
-            str(objectives).encode('utf-8') + b'|' +
-            str(options_considered).encode('utf-8') + b'|' +
-            str(chosen_action).encode('utf-8') + b'|' +
-            str(tests_passed).encode('utf-8')
-        )
-
-        return hashlib.sha256(payload).digest()
+        """Compute SHA-256 hash for a decision over its canonical CBOR encoding"""
+        return decision_payload_hash(inputs_bundle, objectives, options_considered,
+                                     chosen_action, tests_passed, prev_hash=prev_hash)
 
     def add_decision(self, db: Session, decision_data: Dict) -> Decision:
         """
         Add a decision to the ledger with proper hash chaining
-        Returns the created decision record
+        Returns the created decision record, or the existing one if the same
+        payload was already written
         """
-        # Prepare decision data
-        prev_hash = None
-        if 'prev_decision_id' in decision_data and decision_data['prev_decision_id']:
-            # In a real system, we'd query for the previous decision's curr_hash
-            pass
-
         inputs_bundle = decision_data.get('inputs_bundle', {})
         objectives = decision_data.get('objectives', {})
         options_considered = decision_data.get('options_considered', [])
         chosen_action = decision_data.get('chosen_action', {})
         tests_passed = decision_data.get('tests_passed', {})
 
+        # Idempotency: same payload, same decision
+        payload_hash = self.compute_hash(None, inputs_bundle, objectives,
+                                         options_considered, chosen_action, tests_passed)
+        existing = db.query(Decision).filter(Decision.payload_hash == payload_hash).first()
+        if existing is not None:
+            return existing
+
+        prev_hash = None
+        if 'prev_decision_id' in decision_data and decision_data['prev_decision_id']:
+            prev_decision = db.query(Decision).filter(
+                Decision.decision_id == decision_data['prev_decision_id']
+            ).first()
+            if prev_decision is None:
+                raise ValueError(f"Previous decision {decision_data['prev_decision_id']} not found")
+            prev_hash = prev_decision.curr_hash
+
         # Compute current hash
         curr_hash = self.compute_hash(prev_hash, inputs_bundle, objectives,
                                      options_considered, chosen_action, tests_passed)
@@ -71,7 +73,8 @@ class LedgerWriter:
             appeals=decision_data.get('appeals'),
             post_hoc_metrics=decision_data.get('post_hoc_metrics'),
             prev_hash=prev_hash,
-            curr_hash=curr_hash
+            curr_hash=curr_hash,
+            payload_hash=payload_hash
         )
 
         # Add to database (in a real system)
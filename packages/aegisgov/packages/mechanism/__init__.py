@@ -16,8 +16,12 @@
 from .carbon_fee_dividend import CarbonFeeDividend
 from .housing_credits import HousingCredits
 from .congestion_pricing import CongestionPricing
+from .simulation import BatchMechanism, MonteCarloSimulator, parameter_grid, sample_parameters, summarize
+from .scenarios import ScenarioRunner, load_region, run_scenario
 
-__all__ = ['CarbonFeeDividend', 'HousingCredits', 'CongestionPricing']
+__all__ = ['CarbonFeeDividend', 'HousingCredits', 'CongestionPricing',
+           'BatchMechanism', 'MonteCarloSimulator', 'parameter_grid', 'sample_parameters', 'summarize',
+           'ScenarioRunner', 'load_region', 'run_scenario']
 
 
 
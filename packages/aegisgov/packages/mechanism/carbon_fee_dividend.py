@@ -9,9 +9,15 @@
 
 
 
+import numpy as np
 from typing import Dict
 
-class CarbonFeeDividend:
+from .simulation import BatchMechanism, broadcast_parameters
+
+class CarbonFeeDividend(BatchMechanism):
+    # Limits enforced by the update_* setters, applied to array sweeps too
+    PARAMETER_BOUNDS = {"fee_rate": (0, None), "dividend_per_capita": (0, None)}
+
     def __init__(self, region_population: int = 1000000):
         self.region_population = region_population
         self.current_fee_rate = 25.0  # $ per ton CO2
@@ -82,6 +88,47 @@ class CarbonFeeDividend:
         else:
             return 0.9
 
+    def simulate_batch(self, params: Dict) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_impact over arrays of parameters
+
+        Required: target_reduction_pct. Optional (default to the current
+        policy and the scalar model's constants): fee_rate,
+        dividend_per_capita, population, base_emissions, admin_cost_rate,
+        base_effectiveness. Returns one array per flat metric name; at the
+        defaults the values match calculate_impact, plus
+        social.dividend_per_resident (net revenue over population).
+        """
+        p = broadcast_parameters(params, {
+            "fee_rate": self.current_fee_rate,
+            "dividend_per_capita": self.dividend_per_capita,
+            "population": self.region_population,
+            "base_emissions": 10000000,
+            "admin_cost_rate": 0.05,
+            "base_effectiveness": 0.8
+        }, required=["target_reduction_pct"])
+        target = p["target_reduction_pct"]
+
+        revenue = p["base_emissions"] * (1 - target / 100) * p["fee_rate"]
+        net_revenue = revenue * (1 - p["admin_cost_rate"])
+        total_dividend = net_revenue / p["dividend_per_capita"]
+        effectiveness = p["base_effectiveness"] + (target / 100) * (1 - p["base_effectiveness"])
+        emission_reduction = target * effectiveness
+
+        return {
+            "economic.revenue": revenue,
+            "economic.total_dividend": total_dividend,
+            "economic.net_fiscal_impact": revenue - total_dividend,
+            "environmental.emission_reduction_tons": emission_reduction,
+            "environmental.carbon_intensity_change_pct": -0.5 * (emission_reduction / 1000000),
+            "social.dividend_per_capita": p["dividend_per_capita"],
+            "social.dividend_per_resident": net_revenue / p["population"],
+            "social.household_benefit_score": np.select(
+                [total_dividend < 5e7, total_dividend < 2e8], [0.3, 0.6], 0.9
+            ),
+            "social.equity_index_change": 0.05 * (total_dividend / (1e9))
+        }
+
     def get_policy_parameters(self) -> Dict:
         """Return current policy parameters"""
         return {
@@ -1,8 +1,14 @@
 
 
+import numpy as np
 from typing import Dict, List
 
-class CongestionPricing:
+from .simulation import BatchMechanism, broadcast_parameters
+
+class CongestionPricing(BatchMechanism):
+    # Limits enforced by the update_* setters, applied to array sweeps too
+    PARAMETER_BOUNDS = {"base_fee": (0, None), "time_window_hours": (1, 8)}
+
     def __init__(self):
         self.base_fee = 5.0  # Base fee per vehicle entry
         self.time_window_hours = 4  # Peak hours with pricing
@@ -84,6 +90,45 @@ class CongestionPricing:
         improvement = 20.0 * (volume_reduction_pct / 30)  # Up to 20 point improvement
         return max(40, base_index - improvement)
 
+    def simulate_batch(self, params: Dict) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_impact over arrays of parameters
+
+        Required: current_traffic_volume, peak_hour_demand. Optional
+        (default to the current policy and the scalar model's constants):
+        base_fee, time_window_hours, fee_avoidance_rate (share of vehicles
+        avoiding the fee), days_per_year, emission_tons_per_pct. Returns one
+        array per flat metric name; at the defaults the values match
+        calculate_impact.
+        """
+        p = broadcast_parameters(params, {
+            "base_fee": self.base_fee,
+            "time_window_hours": self.time_window_hours,
+            "fee_avoidance_rate": 0.15,
+            "days_per_year": 250,
+            "emission_tons_per_pct": 5.0
+        }, required=["current_traffic_volume", "peak_hour_demand"])
+
+        paying_share = 1 - p["fee_avoidance_rate"]
+        fee_days = p["base_fee"] * p["time_window_hours"] * p["days_per_year"]
+        revenue = p["current_traffic_volume"] * paying_share * fee_days
+        compliance_costs = 1e6 + (paying_share * fee_days * 0.3)
+
+        demand = p["peak_hour_demand"]
+        volume_reduction = np.select([demand < 1.5, demand < 2.0], [20.0, 18.0], 15.0)
+        emission_reduction = p["emission_tons_per_pct"] * volume_reduction
+
+        return {
+            "economic.revenue": revenue,
+            "economic.compliance_costs": compliance_costs,
+            "economic.net_fiscal_impact": revenue - compliance_costs,
+            "traffic.volume_reduction_pct": volume_reduction,
+            "traffic.travel_time_change_pct": -0.3 * (volume_reduction / 10),
+            "traffic.congestion_index": np.maximum(40, 80.0 - 20.0 * (volume_reduction / 30)),
+            "environmental.emission_reduction_tons": emission_reduction,
+            "environmental.air_quality_index_change": 0.1 * (emission_reduction / 1000)
+        }
+
     def get_policy_parameters(self) -> Dict:
         """Return current policy parameters"""
         return {
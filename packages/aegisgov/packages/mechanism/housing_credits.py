@@ -9,9 +9,15 @@
 
 
 
+import numpy as np
 from typing import Dict
 
-class HousingCredits:
+from .simulation import BatchMechanism, broadcast_parameters
+
+class HousingCredits(BatchMechanism):
+    # Limits enforced by the update_* setters, applied to array sweeps too
+    PARAMETER_BOUNDS = {"credit_amount": (0, None), "target_units": (1, None)}
+
     def __init__(self):
         self.credit_amount = 5000  # Base credit amount per unit
         self.max_credits_per_developer = 10  # Max credits per developer
@@ -100,6 +106,44 @@ class HousingCredits:
         else:
             return 0.8
 
+    def simulate_batch(self, params: Dict) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_impact over arrays of parameters
+
+        Required: market_rent, construction_costs. Optional (default to the
+        current program and the scalar model's constants): credit_amount,
+        max_credits_per_developer, developers, target_units, current_supply,
+        rent_supply_elasticity, admin_cost_rate. Returns one array per flat
+        metric name; at the defaults the values match calculate_impact.
+        """
+        p = broadcast_parameters(params, {
+            "credit_amount": self.credit_amount,
+            "max_credits_per_developer": self.max_credits_per_developer,
+            "developers": 50,
+            "target_units": self.target_units,
+            "current_supply": 50000,
+            "rent_supply_elasticity": 0.3,
+            "admin_cost_rate": 0.1
+        }, required=["market_rent", "construction_costs"])
+
+        total_credits = p["credit_amount"] * p["max_credits_per_developer"] * p["developers"]
+        rent_to_cost_ratio = p["market_rent"] / p["construction_costs"]
+        units = np.select([rent_to_cost_ratio < 0.2, rent_to_cost_ratio < 0.3], [500, 1000], p["target_units"])
+        rent_change_pct = -1.0 * (units / p["current_supply"]) * p["rent_supply_elasticity"]
+
+        return {
+            "economic.total_credits": total_credits,
+            "economic.revenue_impact": -total_credits * (1 + p["admin_cost_rate"]),
+            "economic.net_fiscal_cost": -total_credits,
+            "housing_market.units_incentivized": units,
+            "housing_market.rent_change_pct": rent_change_pct,
+            "housing_market.affordability_index": np.where(
+                rent_change_pct > 0, 1.0 - (rent_change_pct / 5), 1.0 + (-rent_change_pct / 3)
+            ),
+            "social.low_income_benefit_score": np.select([units < 500, units < 1500], [0.2, 0.5], 0.8),
+            "social.equity_index_change": 0.1 * (units / 500)
+        }
+
     def get_policy_parameters(self) -> Dict:
         """Return current policy parameters"""
         return {
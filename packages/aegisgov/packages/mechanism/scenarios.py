@@ -0,0 +1,222 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+from .carbon_fee_dividend import CarbonFeeDividend
+from .congestion_pricing import CongestionPricing
+from .housing_credits import HousingCredits
+from .simulation import sample_parameters, summarize
+
+MECHANISMS = {
+    'carbon_fee_dividend': CarbonFeeDividend,
+    'housing_credits': HousingCredits,
+    'congestion_pricing': CongestionPricing
+}
+
+def load_region(path: str) -> Dict[str, Any]:
+    """Load a region config (``config/region.*.yaml``)"""
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+def project_kpis(seed_kpis: Dict[str, float], metrics: Dict[str, np.ndarray], size: int) -> Dict[str, np.ndarray]:
+    """
+    Apply a policy mix's simulated effects to a region's baseline KPIs.
+
+    Rent burden follows the housing rent change, carbon intensity the
+    carbon fee's intensity change, and inequality (Atkinson) falls with the
+    combined equity index change. Other KPIs keep their baseline.
+    """
+    def effect(name):
+        return metrics.get(name, np.zeros(size))
+
+    projected = {name: np.full(size, float(value)) for name, value in seed_kpis.items()}
+    if 'rent_burden' in projected:
+        projected['rent_burden'] *= 1 + effect('housing_credits.housing_market.rent_change_pct') / 100
+    if 'carbon_intensity' in projected:
+        projected['carbon_intensity'] *= 1 + effect('carbon_fee_dividend.environmental.carbon_intensity_change_pct') / 100
+    if 'atkinson_index' in projected:
+        equity = effect('carbon_fee_dividend.social.equity_index_change') + effect('housing_credits.social.equity_index_change')
+        projected['atkinson_index'] = np.clip(projected['atkinson_index'] * (1 - equity), 0.0, None)
+    return projected
+
+def _scenario_seed(seed: int, region_index: int, mix_index: int, mechanism_index: int) -> int:
+    # Independent of scheduling: the same scenario always draws the same values
+    return int(np.random.SeedSequence([seed, region_index, mix_index, mechanism_index]).generate_state(1)[0])
+
+def run_scenario(region: Dict[str, Any], mix: Dict[str, Any], n_draws: int, seed: int,
+                 region_index: int = 0, mix_index: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Simulate one policy mix in one region.
+
+    Each mechanism in the mix is sampled from the region's conditions
+    (``mechanism_parameters``) overridden by the mix's policy settings.
+
+    Returns:
+        Dict: Columns with one value per draw: mechanism metrics prefixed by
+        mechanism name, projected KPIs and ``net_fiscal_impact``
+    """
+    region_params = region.get('mechanism_parameters', {})
+    metrics: Dict[str, np.ndarray] = {}
+    net_fiscal = np.zeros(n_draws)
+
+    for mechanism_index, name in enumerate(sorted(mix['mechanisms'])):
+        if name not in MECHANISMS:
+            raise ValueError(f"Unknown mechanism: {name}")
+        mechanism = MECHANISMS[name]()
+        specs = {**region_params.get(name, {}), **(mix['mechanisms'][name] or {})}
+        if name == 'carbon_fee_dividend' and 'population' in region:
+            specs.setdefault('population', region['population'])
+
+        params = sample_parameters(specs, n_draws, _scenario_seed(seed, region_index, mix_index, mechanism_index))
+        mechanism.validate_parameters(params)
+        for metric, values in mechanism.simulate_batch(params).items():
+            metrics[f"{name}.{metric}"] = np.broadcast_to(values, (n_draws,))
+
+        # Housing reports its (negative) fiscal effect as net_fiscal_cost
+        fiscal = metrics.get(f"{name}.economic.net_fiscal_impact", metrics.get(f"{name}.economic.net_fiscal_cost"))
+        if fiscal is not None:
+            net_fiscal = net_fiscal + fiscal
+
+    columns = dict(metrics)
+    columns.update(project_kpis(region.get('seed_kpis', {}), metrics, n_draws))
+    columns['net_fiscal_impact'] = net_fiscal
+    return columns
+
+def _run_task(task: Tuple) -> Tuple[int, int, Dict[str, np.ndarray]]:
+    region_index, mix_index, region, mix, n_draws, seed = task
+    return region_index, mix_index, run_scenario(region, mix, n_draws, seed, region_index, mix_index)
+
+class ScenarioRunner:
+    """
+    Evaluate regions x policy mixes x parameter draws on a process pool.
+
+    Every (region, mix) pair is one task of ``n_draws`` vectorized draws.
+    Results are consumed in task order as they complete, optionally
+    streamed to Parquet one row group per task, and summarized into
+    candidate options for MultiObjectiveOptimizer.
+    """
+
+    def __init__(self, regions: Sequence[Dict[str, Any]], policy_mixes: Sequence[Dict[str, Any]],
+                 n_draws: int = 1000, seed: int = 0, workers: Optional[int] = None):
+        """
+        Args:
+            regions: Region configs (``region``, ``population``, ``seed_kpis``,
+                optional ``mechanism_parameters`` per mechanism)
+            policy_mixes: ``{"name": ..., "mechanisms": {mechanism: parameter specs}}``
+            n_draws: Parameter draws per region and mix
+            seed: Base seed; each scenario derives its own
+            workers: Processes (None for all cores, 1 to run in-process)
+        """
+        self.regions = list(regions)
+        self.policy_mixes = list(policy_mixes)
+        self.n_draws = n_draws
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+
+    def tasks(self) -> List[Tuple]:
+        return [
+            (r, m, region, mix, self.n_draws, self.seed)
+            for r, region in enumerate(self.regions)
+            for m, mix in enumerate(self.policy_mixes)
+        ]
+
+    def output_schema(self):
+        """
+        Parquet schema covering the columns of every policy mix.
+
+        Mixes can differ in mechanisms and regions in KPIs, so each mix is
+        probed with a single draw and the regions' KPIs are added.
+        """
+        fields = {'region': pa.string(), 'policy_mix': pa.string(), 'draw': pa.int64()}
+        probe_region = self.regions[0] if self.regions else {}
+        for mix_index, mix in enumerate(self.policy_mixes):
+            for name, values in run_scenario(probe_region, mix, 1, self.seed, 0, mix_index).items():
+                fields.setdefault(name, pa.array(np.asarray(values)).type)
+        for region in self.regions:
+            for kpi in region.get('seed_kpis', {}):
+                fields.setdefault(kpi, pa.float64())
+        return pa.schema(list(fields.items()))
+
+    def iter_results(self) -> Iterator[Tuple[int, int, Dict[str, np.ndarray]]]:
+        """Yield (region index, mix index, columns) for every scenario, in task order"""
+        tasks = self.tasks()
+        if self.workers == 1 or len(tasks) <= 1:
+            yield from map(_run_task, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+            yield from executor.map(_run_task, tasks)
+
+    def run(self, output_path: Optional[str] = None,
+            quantiles: Sequence[float] = (0.05, 0.5, 0.95)) -> List[Dict[str, Any]]:
+        """
+        Run every scenario and return one candidate option per region and mix.
+
+        Args:
+            output_path: Parquet file receiving every draw (requires pyarrow)
+            quantiles: Quantiles reported for each projected KPI
+
+        Returns:
+            List[Dict]: Options with ``action_type`` (the mix name), ``region``,
+            the mean of each projected KPI and ``net_fiscal_impact``, and
+            ``kpi_bands`` with the requested quantiles. Non-KPI keys are
+            ignored by the optimizer.
+        """
+        if output_path is not None and pq is None:
+            raise RuntimeError("Parquet output requires pyarrow")
+
+        writer = None
+        tmp_path = output_path + '.tmp' if output_path else None
+        if output_path is not None:
+            writer = pq.ParquetWriter(tmp_path, self.output_schema(), compression='zstd')
+        options = []
+        try:
+            for region_index, mix_index, columns in self.iter_results():
+                region = self.regions[region_index]
+                mix = self.policy_mixes[mix_index]
+                region_name = region.get('region', f"region_{region_index}")
+                mix_name = mix.get('name', f"mix_{mix_index}")
+
+                if output_path is not None:
+                    table = pa.table({
+                        'region': [region_name] * self.n_draws,
+                        'policy_mix': [mix_name] * self.n_draws,
+                        'draw': np.arange(self.n_draws),
+                        **{name: np.ascontiguousarray(values) for name, values in columns.items()}
+                    })
+                    # Columns of mechanisms not in this mix are written as nulls
+                    writer.write_table(_align(table, writer.schema))
+
+                kpis = list(region.get('seed_kpis', {}))
+                summary = summarize({name: columns[name] for name in kpis + ['net_fiscal_impact']}, quantiles)
+                option = {'action_type': mix_name, 'region': region_name, 'policy_mix': mix_name}
+                option.update({name: stats['mean'] for name, stats in summary.items()})
+                option['kpi_bands'] = {name: summary[name]['quantiles'] for name in kpis}
+                options.append(option)
+        except BaseException:
+            if writer is not None:
+                writer.close()
+                os.remove(tmp_path)
+            raise
+
+        if writer is not None:
+            writer.close()
+            os.replace(tmp_path, output_path)
+        return options
+
+def _align(table, schema):
+    # Missing columns become nulls, in the schema's column order
+    arrays = [
+        table.column(field.name) if field.name in table.column_names else pa.nulls(len(table), field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
@@ -0,0 +1,209 @@
+import numpy as np
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+try:
+    import pyarrow as pa
+except ImportError:  # Table output is optional; columns are plain numpy arrays otherwise
+    pa = None
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def broadcast_parameters(params: Dict[str, Any], defaults: Dict[str, float],
+                         required: Iterable[str] = ()) -> Dict[str, np.ndarray]:
+    """
+    Fill in defaults and broadcast every parameter to one common shape.
+
+    Scalars and arrays can be mixed: a fixed fee rate with 10,000 drawn
+    elasticities gives 10,000-element arrays for both.
+
+    Raises:
+        ValueError: If a required parameter is missing or an unknown one is given
+    """
+    missing = [name for name in required if name not in params]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+    unknown = set(params) - set(defaults) - set(required)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    merged = {**defaults, **params}
+    names = list(merged)
+    arrays = np.broadcast_arrays(*(np.asarray(merged[name], dtype=float) for name in names))
+    return dict(zip(names, arrays))
+
+def sample_parameters(specs: Dict[str, Any], n_draws: int, seed: Optional[int] = 0) -> Dict[str, np.ndarray]:
+    """
+    Draw parameter arrays from distribution specs.
+
+    A spec is a constant, an array of ``n_draws`` values, or a dict with
+    ``dist`` and its arguments:
+
+    - ``{"dist": "normal", "mean": m, "sd": s}``
+    - ``{"dist": "lognormal", "mean": m, "sigma": s}`` (of the underlying normal)
+    - ``{"dist": "uniform", "low": a, "high": b}``
+    - ``{"dist": "triangular", "low": a, "mode": c, "high": b}``
+
+    Specs are sampled in sorted name order from one seeded generator, so a
+    given seed always yields the same draws.
+    """
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name in sorted(specs):
+        spec = specs[name]
+        if not isinstance(spec, dict):
+            value = np.asarray(spec, dtype=float)
+            if value.ndim and value.shape != (n_draws,):
+                raise ValueError(f"Parameter '{name}' has {value.shape[0]} values, expected {n_draws}")
+            samples[name] = np.broadcast_to(value, (n_draws,))
+            continue
+
+        dist = spec.get('dist')
+        if dist == 'normal':
+            draws = rng.normal(spec['mean'], spec['sd'], n_draws)
+        elif dist == 'lognormal':
+            draws = rng.lognormal(spec['mean'], spec['sigma'], n_draws)
+        elif dist == 'uniform':
+            draws = rng.uniform(spec['low'], spec['high'], n_draws)
+        elif dist == 'triangular':
+            draws = rng.triangular(spec['low'], spec['mode'], spec['high'], n_draws)
+        else:
+            raise ValueError(f"Unknown distribution for '{name}': {dist}")
+
+        if 'min' in spec or 'max' in spec:
+            draws = np.clip(draws, spec.get('min'), spec.get('max'))
+        samples[name] = draws
+    return samples
+
+def summarize(samples: Dict[str, np.ndarray], quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Dict]:
+    """
+    Mean, standard deviation and quantiles of every metric.
+
+    Metrics are stacked into one (metrics x draws) matrix so each statistic
+    is a single numpy reduction.
+    """
+    names = list(samples)
+    if not names:
+        return {}
+    stacked = np.vstack([np.ravel(samples[name]) for name in names])
+    means = stacked.mean(axis=1)
+    stds = stacked.std(axis=1)
+    qs = np.quantile(stacked, quantiles, axis=1)
+
+    return {
+        name: {
+            'mean': float(means[i]),
+            'std': float(stds[i]),
+            'quantiles': {f"p{round(q * 100):02d}": float(qs[j, i]) for j, q in enumerate(quantiles)}
+        }
+        for i, name in enumerate(names)
+    }
+
+def parameter_grid(grid: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Cartesian product of parameter values as flat, equal-length columns.
+
+    The first parameter varies slowest, like nested loops in the given order.
+    """
+    names = list(grid)
+    axes = [np.atleast_1d(np.asarray(grid[name], dtype=float)) for name in names]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+class BatchMechanism:
+    """
+    Array-native sweeps for mechanisms that implement ``simulate_batch``.
+
+    ``PARAMETER_BOUNDS`` holds the same limits the ``update_*`` setters
+    enforce, as ``(min, max)`` with None for an open end.
+    """
+
+    PARAMETER_BOUNDS: Dict[str, tuple] = {}
+
+    def simulate_batch(self, params: Dict) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def validate_parameters(self, params: Dict[str, Any]) -> None:
+        """
+        Raises:
+            ValueError: If any value is outside its parameter's bounds
+        """
+        for name, (low, high) in self.PARAMETER_BOUNDS.items():
+            if name not in params:
+                continue
+            values = np.asarray(params[name], dtype=float)
+            if low is not None and np.any(values < low):
+                raise ValueError(f"{name} must be at least {low}")
+            if high is not None and np.any(values > high):
+                raise ValueError(f"{name} must be at most {high}")
+
+    def sweep(self, grid: Dict[str, Any], fixed: Optional[Dict[str, Any]] = None,
+              as_table: bool = False):
+        """
+        Evaluate the impact model over the full grid of parameter values in one call.
+
+        Args:
+            grid: Parameter name -> values; every combination is evaluated
+            fixed: Parameters held constant (scalars) or given per grid point
+            as_table: Return a pyarrow Table instead of a dict of arrays
+
+        Returns:
+            Columnar results: one column per grid parameter followed by one
+            per metric, a row per grid point
+        """
+        columns = parameter_grid(grid)
+        params = {**(fixed or {}), **columns}
+        self.validate_parameters(params)
+        metrics = self.simulate_batch(params)
+
+        size = len(next(iter(columns.values()))) if columns else 1
+        results = dict(columns)
+        for name, values in metrics.items():
+            results[name] = np.broadcast_to(values, (size,))
+
+        if as_table:
+            if pa is None:
+                raise RuntimeError("Table output requires pyarrow")
+            return pa.table({name: np.ascontiguousarray(values) for name, values in results.items()})
+        return results
+
+class MonteCarloSimulator:
+    """
+    Run a mechanism's vectorized model over many parameter draws.
+
+    A mechanism provides ``simulate_batch(params) -> Dict[str, np.ndarray]``
+    mapping flat metric names (``"economic.revenue"``) to one value per draw.
+    """
+
+    def __init__(self, mechanism, quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        self.mechanism = mechanism
+        self.quantiles = tuple(quantiles)
+
+    def run(self, specs: Dict[str, Any], n_draws: int = 10000, seed: Optional[int] = 0,
+            return_samples: bool = False) -> Dict[str, Any]:
+        """
+        Simulate ``n_draws`` scenarios and summarize each impact metric.
+
+        Args:
+            specs: Parameter specs (see ``sample_parameters``); parameters not
+                given use the mechanism's current settings
+            n_draws: Number of scenarios
+            seed: Random seed (None for a fresh one)
+            return_samples: Also return the raw parameter and metric arrays
+
+        Returns:
+            Dict: ``draws``, ``seed`` and per-metric ``metrics`` summaries
+        """
+        if n_draws < 1:
+            raise ValueError("n_draws must be positive")
+        params = sample_parameters(specs, n_draws, seed)
+        metrics = self.mechanism.simulate_batch(params)
+
+        result = {
+            'draws': n_draws,
+            'seed': seed,
+            'metrics': summarize(metrics, self.quantiles)
+        }
+        if return_samples:
+            result['parameters'] = params
+            result['samples'] = metrics
+        return result
@@ -13,9 +13,13 @@
 # Planner package initialization
 
 from .optimizer import MultiObjectiveOptimizer
+from .pareto import pareto_front, non_dominated_sort
+from .sweep import sample_simplex, simplex_lattice
+from .cache import PlanningCache, planning_cache
 from .kpi_meta import KPI_META
 
-__all__ = ['MultiObjectiveOptimizer', 'KPI_META']
+__all__ = ['MultiObjectiveOptimizer', 'pareto_front', 'non_dominated_sort', 'sample_simplex', 'simplex_lattice',
+           'PlanningCache', 'planning_cache', 'KPI_META']
 
 
 
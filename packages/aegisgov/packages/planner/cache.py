@@ -0,0 +1,89 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .pareto import pareto_front
+
+def fingerprint(value: Any) -> str:
+    """Content hash of JSON-like data; equal content gives equal keys regardless of key order"""
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    # Cached arrays are shared between callers
+    array.setflags(write=False)
+    return array
+
+class PlanningCache:
+    """
+    LRU cache of normalized option matrices, scores and Pareto sets.
+
+    Entries are keyed on content fingerprints of the KPI meta and the option
+    set (plus the weight vector for scores), so a change to either misses
+    the cache instead of returning stale results. ``invalidate`` drops
+    everything, e.g. after KPI_META is reloaded.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: tuple, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _base_key(self, optimizer, options: Sequence[Dict[str, Any]], options_key: Optional[str]) -> tuple:
+        return fingerprint(optimizer.kpi_meta), options_key or fingerprint(list(options))
+
+    def normalized(self, optimizer, options: Sequence[Dict[str, Any]], options_key: Optional[str] = None) -> np.ndarray:
+        """Normalized (options x KPIs) matrix, computed once per meta and option set"""
+        base = self._base_key(optimizer, options, options_key)
+        return self._get(('normalized',) + base, lambda: _frozen(optimizer.normalize_options(options)))
+
+    def scores(self, optimizer, options: Sequence[Dict[str, Any]], weights: Sequence[float],
+               options_key: Optional[str] = None) -> np.ndarray:
+        """Per-option weighted scores for one weight vector"""
+        base = self._base_key(optimizer, options, options_key)
+        weights_key = tuple(float(w) for w in weights)
+        return self._get(('scores',) + base + (weights_key,), lambda: _frozen(
+            optimizer.score_matrix(self.normalized(optimizer, options, base[1]), list(weights_key))[:, 0].copy()
+        ))
+
+    def pareto(self, optimizer, options: Sequence[Dict[str, Any]], epsilon: Optional[float] = None,
+               options_key: Optional[str] = None) -> np.ndarray:
+        """Indices of the Pareto-optimal options"""
+        base = self._base_key(optimizer, options, options_key)
+        return self._get(('pareto',) + base + (epsilon,), lambda: _frozen(
+            pareto_front(self.normalized(optimizer, options, base[1]), epsilon=epsilon)
+        ))
+
+    def invalidate(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+# Shared by the orchestrator and the planning API
+planning_cache = PlanningCache()
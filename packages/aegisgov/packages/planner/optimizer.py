@@ -5,11 +5,31 @@
 
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Optional, Sequence, Tuple
+
+from .kpi_meta import KPI_META
+from .pareto import pareto_front
+from .portfolio import select_portfolio
+from .sweep import sample_simplex, sweep_winners, winning_regions
+
+# Sense codes in the normalization vectors
+SENSE_MAX = 1.0
+SENSE_MIN = -1.0
 
 class MultiObjectiveOptimizer:
-    def __init__(self, kpi_meta: Dict):
-        self.kpi_meta = kpi_meta
+    def __init__(self, kpi_meta: Optional[Dict] = None):
+        self.kpi_meta = KPI_META if kpi_meta is None else kpi_meta
+        self.kpi_names = list(self.kpi_meta.keys())
+        self.kpi_index = {name: i for i, name in enumerate(self.kpi_names)}
+
+        # KPI_META as column vectors so whole option matrices normalize in one pass
+        self.kpi_min = np.array([self.kpi_meta[k]['min'] for k in self.kpi_names], dtype=float)
+        self.kpi_span = np.array([self.kpi_meta[k]['max'] - self.kpi_meta[k]['min'] for k in self.kpi_names],
+                                 dtype=float)
+        self.kpi_sense = np.array([
+            SENSE_MAX if self.kpi_meta[k]['sense'] == 'max' else SENSE_MIN if self.kpi_meta[k]['sense'] == 'min' else 0.0
+            for k in self.kpi_names
+        ])
 
     def normalize_kpi(self, value: float, kpi_name: str) -> float:
         """Normalize KPI value to [0,1] range based on meta data"""
@@ -20,29 +40,108 @@ class MultiObjectiveOptimizer:
             return 1.0 - ((value - meta['min']) / (meta['max'] - meta['min']))
         return 0.5  # Default to neutral
 
-    def weighted_sum_score(self, kpi_values: Dict[str, float], weights: List[float]) -> float:
-        """Calculate weighted sum score for a set of KPI values"""
-        total_weight = sum(weights)
-        if total_weight == 0:
-            return 0.5  # Neutral score
+    def option_matrix(self, options: Sequence[Dict[str, float]]) -> np.ndarray:
+        """
+        Arrange options as an (options x KPIs) matrix in ``kpi_names`` order.
+
+        KPIs an option does not report are NaN; keys that are not KPIs
+        (e.g. ``action_type``) are ignored.
+        """
+        matrix = np.full((len(options), len(self.kpi_names)), np.nan)
+        for row, option in enumerate(options):
+            for kpi_name, value in option.items():
+                col = self.kpi_index.get(kpi_name)
+                if col is not None:
+                    matrix[row, col] = value
+        return matrix
+
+    def normalize_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Normalize an option matrix against KPI_META in one vectorized pass.
+
+        Matches ``normalize_kpi`` element-wise. Missing KPIs become 0 so they
+        contribute nothing to a weighted sum.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scaled = (matrix - self.kpi_min) / self.kpi_span
+        normalized = np.where(self.kpi_sense == SENSE_MAX, scaled,
+                              np.where(self.kpi_sense == SENSE_MIN, 1.0 - scaled, 0.5))
+        return np.where(np.isnan(matrix), 0.0, normalized)
+
+    def normalize_options(self, options: Sequence[Dict[str, float]]) -> np.ndarray:
+        """Build and normalize the option matrix; reuse it across weight vectors"""
+        return self.normalize_matrix(self.option_matrix(options))
 
-        score = 0.0
-        kpi_names = list(self.kpi_meta.keys())
+    def weight_matrix(self, weights) -> np.ndarray:
+        """
+        Coerce one weight vector or a stack of them to a (profiles x weights) matrix.
+
+        Vectors shorter than the KPI list are padded with zeros.
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        if weights.shape[1] < len(self.kpi_names):
+            weights = np.pad(weights, ((0, 0), (0, len(self.kpi_names) - weights.shape[1])))
+        return weights
 
-        for i, kpi_name in enumerate(kpi_names):
-            if kpi_name in kpi_values and weights[i] > 0:
-                normalized_value = self.normalize_kpi(kpi_values[kpi_name], kpi_name)
-                score += weights[i] * normalized_value
+    def _profile_scores(self, normalized: np.ndarray, weights) -> np.ndarray:
+        # (profiles x options), so per-profile reductions run over contiguous rows
+        weights = self.weight_matrix(weights)
+        totals = weights.sum(axis=1)
+        positive = np.clip(weights[:, :len(self.kpi_names)], 0.0, None)
+        scores = positive @ normalized.T
 
-        return min(max(score / total_weight, 0.0), 1.0)
+        neutral = totals == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores /= totals[:, None]
+        np.clip(scores, 0.0, 1.0, out=scores)
+        if neutral.any():
+            scores[neutral] = 0.5
+        return scores
 
-    def epsilon_constraint_optimization(self, base_weights: List[float], options: List[Dict[str, float]], epsilon: float = 0.05) -> List[Tuple[List[float], float]]:
+    def score_matrix(self, normalized: np.ndarray, weights) -> np.ndarray:
         """
-        Generate Pareto frontier using epsilon-constraint method
-        Returns list of (weight_vector, score) tuples
+        Score normalized options under many weight vectors with one matrix multiply.
+
+        Same rule as ``weighted_sum_score``: only positive weights add to the
+        score, which is divided by the total weight and clipped to [0, 1]; a
+        zero total scores a neutral 0.5.
+
+        Args:
+            normalized: (options x KPIs) matrix from ``normalize_options``
+            weights: One weight vector or a (profiles x KPIs) stack
+
+        Returns:
+            np.ndarray: (options x profiles) scores
         """
+        return self._profile_scores(normalized, weights).T
+
+    def score_options(self, options: Sequence[Dict[str, float]], weights) -> np.ndarray:
+        """Score options under one weight vector (1-D result) or a stack of them (2-D)"""
+        scores = self.score_matrix(self.normalize_options(options), weights)
+        return scores[:, 0] if np.ndim(weights) == 1 else scores
+
+    def best_option_indices(self, normalized: np.ndarray, weights) -> np.ndarray:
+        """
+        Index of the best option for each weight vector.
+
+        Ties go to the later option, as in ``optimize_with_weights``.
+        """
+        # Scoring the options in reverse makes argmax's first hit the last tied option
+        reversed_scores = self._profile_scores(np.ascontiguousarray(normalized[::-1]), weights)
+        return normalized.shape[0] - 1 - np.argmax(reversed_scores, axis=1)
+
+    def weighted_sum_score(self, kpi_values: Dict[str, float], weights: List[float]) -> float:
+        """Calculate weighted sum score for a set of KPI values"""
+        return float(self.score_options([kpi_values], weights)[0])
+
+    def epsilon_constraint_optimization(self, base_weights: List[float], options: List[Dict[str, float]], epsilon: float = 0.05, seed: int = 0) -> List[Tuple[List[float], float]]:
+        """
+        Explore weight vectors around base_weights with epsilon steps
+        Returns list of (weight_vector, score) tuples; use pareto_indices for the exact frontier
+        """
+        rng = np.random.default_rng(seed)
         pareto_set = []
-        kpi_names = list(self.kpi_meta.keys())
+        normalized = self.normalize_options(options)
 
         # Start with base weights
         current_weights = base_weights.copy()
@@ -50,9 +149,9 @@ class MultiObjectiveOptimizer:
 
         for _ in range(10):  # Generate multiple alternatives
             # Calculate score for current weight vector
-            scores = [self.weighted_sum_score(option, current_weights) for option in options]
+            scores = self.score_matrix(normalized, current_weights)[:, 0]
             current_best_idx = np.argmax(scores)
-            current_best_score = scores[current_best_idx]
+            current_best_score = float(scores[current_best_idx])
 
             if best_score < 0 or current_best_score > best_score + epsilon:
                 best_score = current_best_score
@@ -61,7 +160,7 @@ class MultiObjectiveOptimizer:
             # Perturb weights to explore Pareto frontier
             for i in range(len(current_weights)):
                 new_weights = current_weights.copy()
-                if np.random.random() < 0.5:  # Randomly adjust up or down
+                if rng.random() < 0.5:  # Randomly adjust up or down
                     new_weights[i] += epsilon * (1 - len(pareto_set) % 2)
                 else:
                     new_weights[i] -= epsilon * (1 - len(pareto_set) % 2)
@@ -73,6 +172,84 @@ class MultiObjectiveOptimizer:
 
         return pareto_set
 
+    def pareto_indices(self, options: Sequence[Dict[str, float]], epsilon: Optional[float] = None) -> np.ndarray:
+        """
+        Indices of the options on the Pareto frontier of the normalized KPI matrix.
+
+        With ``epsilon``, an epsilon-dominance approximation for large option sets.
+        """
+        return pareto_front(self.normalize_options(options), epsilon=epsilon)
+
+    def generate_pareto_frontier(self, problem: Dict) -> List[Dict]:
+        """
+        Compute the exact Pareto frontier of a problem's options.
+
+        ``problem`` holds ``options`` and may name its own ``objectives`` with
+        matching ``directions`` ('max'/'min') and ``bounds`` ({'min', 'max'});
+        otherwise this optimizer's KPI meta is used. An ``epsilon`` entry
+        switches to the epsilon-dominance approximation.
+
+        Returns:
+            List[Dict]: Per frontier option, its normalized objective values
+            plus ``option_index`` and the original ``option``
+        """
+        optimizer = self
+        if 'objectives' in problem:
+            optimizer = MultiObjectiveOptimizer({
+                name: {'sense': direction, 'min': bound['min'], 'max': bound['max']}
+                for name, direction, bound in zip(problem['objectives'], problem['directions'], problem['bounds'])
+            })
+
+        options = problem.get('options', [])
+        normalized = optimizer.normalize_options(options)
+        frontier = []
+        for i in pareto_front(normalized, epsilon=problem.get('epsilon')):
+            solution = dict(zip(optimizer.kpi_names, normalized[i].tolist()))
+            solution['option_index'] = int(i)
+            solution['option'] = options[i]
+            frontier.append(solution)
+        return frontier
+
+    def weight_regions(self, options: Sequence[Dict[str, float]], n_points: int = 4096,
+                       method: str = 'kronecker', seed: int = 0, workers: Optional[int] = None) -> Dict:
+        """
+        Sweep the weight simplex and report where each option wins.
+
+        Weight vectors come from a deterministic low-discrepancy sequence, so
+        the same options always give the same regions, whatever the number
+        of workers.
+
+        Args:
+            options: Candidate options
+            n_points: Weight vectors to sample
+            method: 'kronecker', 'sobol' or 'lattice' (see ``sample_simplex``)
+            seed: Sequence offset
+            workers: Processes to use (None for all cores on large sweeps, 1 to
+                stay in-process)
+
+        Returns:
+            Dict: Sampling ``method``, number of ``points`` and per-option ``regions``
+        """
+        if not options or not self.kpi_names:
+            return {'method': method, 'points': 0, 'regions': []}
+
+        weights = sample_simplex(len(self.kpi_names), n_points, method, seed)
+        winners = sweep_winners(self, self.normalize_options(options), weights, workers)
+        return {
+            'method': method,
+            'points': len(weights),
+            'regions': winning_regions(weights, winners, len(options))
+        }
+
+    def select_portfolio(self, options: Sequence[Dict[str, Any]], weights: List[float],
+                         constraints: Dict[str, Any], solver: str = 'auto') -> Dict[str, Any]:
+        """
+        Choose the best-scoring set of options under hard constraints in one solve.
+
+        See ``portfolio.select_portfolio`` for the constraint keys and result.
+        """
+        return select_portfolio(options, self.score_options(options, weights), constraints, solver)
+
     def optimize_with_weights(self, options: List[Dict[str, float]], weights: List[float]) -> Dict[str, float]:
         """
         Optimize using weighted sum approach
@@ -81,8 +258,7 @@ class MultiObjectiveOptimizer:
         if not options or not weights:
             return {}
 
-        scores = [(self.weighted_sum_score(option, weights), i) for i, option in enumerate(options)]
-        best_idx = max(scores)[1]
+        best_idx = int(self.best_option_indices(self.normalize_options(options), weights)[0])
 
         return options[best_idx]
 
@@ -0,0 +1,166 @@
+import bisect
+import numpy as np
+from typing import Optional
+
+# Candidates compared against the current front per vectorized step (k > 3)
+BLOCK_SIZE = 256
+# Front points per comparison; small chunks let early eliminations pay off
+FRONT_CHUNK = 32
+
+def _unique_rows(objectives: np.ndarray):
+    """
+    Distinct rows in descending lexicographic order (first column most
+    significant) and the index of each input row's distinct row.
+
+    Identical plans never dominate each other, so fronts are computed over
+    distinct points and mapped back to every option sharing a point.
+    """
+    order = np.lexsort(objectives.T[::-1])[::-1]
+    ordered = objectives[order]
+    starts = np.ones(len(ordered), dtype=bool)
+    starts[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+
+    inverse = np.empty(len(objectives), dtype=np.intp)
+    inverse[order] = np.cumsum(starts) - 1
+    return ordered[starts], inverse
+
+def _front_2d(points: np.ndarray) -> np.ndarray:
+    second = points[:, 1]
+    # A point survives if no earlier (better on the first objective) point
+    # is at least as good on the second
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], second[:-1])))
+    return np.flatnonzero(second > best_before)
+
+def _front_3d(points: np.ndarray) -> np.ndarray:
+    # Sweep in descending order of the first objective, keeping the 2-D
+    # staircase of (second, third) seen so far: second ascending, third descending
+    stairs_second, stairs_third = [], []
+    keep = []
+    for idx, (second, third) in enumerate(points[:, 1:].tolist()):
+        pos = bisect.bisect_left(stairs_second, second)
+        # The first step with second >= this point's has the largest third among them
+        if pos < len(stairs_second) and stairs_third[pos] >= third:
+            continue
+        keep.append(idx)
+        # Drop steps this point now covers (second <= and third <=)
+        start = pos
+        while start > 0 and stairs_third[start - 1] <= third:
+            start -= 1
+        stairs_second[start:pos] = [second]
+        stairs_third[start:pos] = [third]
+    return np.array(keep, dtype=np.intp)
+
+def _front_blocked(points: np.ndarray, block_size: int) -> np.ndarray:
+    # Sort-filter skyline: a dominating point has a strictly larger sum, so in
+    # descending-sum order nothing later can dominate an accepted point
+    order = np.argsort(-points.sum(axis=1), kind='stable')
+    front = np.empty((0, points.shape[1]))
+    keep = []
+    for start in range(0, len(order), block_size):
+        block_idx = order[start:start + block_size]
+        block = points[block_idx]
+
+        # Compare against the front a chunk at a time; the strongest (earliest)
+        # front points eliminate most of the block before the rest are touched
+        for chunk_start in range(0, len(front), FRONT_CHUNK):
+            if not len(block):
+                break
+            chunk = front[chunk_start:chunk_start + FRONT_CHUNK]
+            dominated = np.all(chunk[None, :, :] >= block[:, None, :], axis=2).any(axis=1)
+            block_idx, block = block_idx[~dominated], block[~dominated]
+
+        # Dominance within the block (points are distinct, so >= on all is domination)
+        ge = np.all(block[None, :, :] >= block[:, None, :], axis=2)
+        np.fill_diagonal(ge, False)
+        survivors = ~ge.any(axis=1)
+
+        keep.extend(block_idx[survivors].tolist())
+        front = np.vstack([front, block[survivors]])
+    return np.array(keep, dtype=np.intp)
+
+def pareto_front(objectives: np.ndarray, epsilon: Optional[float] = None,
+                 block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """
+    Indices of the non-dominated rows of an (options x objectives) matrix.
+
+    Every objective is maximized, as in the normalized matrices of
+    MultiObjectiveOptimizer. Two or three objectives use a sort-based
+    skyline sweep (O(n log n)); more objectives use a blocked
+    sort-filter skyline. Options with identical objective vectors are
+    all kept.
+
+    With ``epsilon``, returns an epsilon-dominance approximation instead:
+    objectives are bucketed into boxes of that width, one representative
+    per non-dominated box is kept, and every option is within ``epsilon``
+    (per objective) of some returned option.
+
+    Args:
+        objectives: (options x objectives) matrix, larger is better
+        epsilon: Box width for the approximate mode (None for the exact front)
+        block_size: Candidates per vectorized step when there are more than 3 objectives
+
+    Returns:
+        np.ndarray: Sorted row indices of the front
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if objectives.ndim != 2:
+        raise ValueError("objectives must be an (options x objectives) matrix")
+    if len(objectives) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if epsilon is not None:
+        if epsilon <= 0:
+            raise ValueError("epsilon must be positive")
+        return _epsilon_front(objectives, epsilon, block_size)
+
+    if objectives.shape[1] == 0:
+        return np.arange(len(objectives))
+    if objectives.shape[1] == 1:
+        return np.flatnonzero(objectives[:, 0] == objectives[:, 0].max())
+
+    points, inverse = _unique_rows(objectives)
+    if points.shape[1] == 2:
+        front = _front_2d(points)
+    elif points.shape[1] == 3:
+        front = _front_3d(points)
+    else:
+        front = _front_blocked(points, block_size)
+
+    on_front = np.zeros(len(points), dtype=bool)
+    on_front[front] = True
+    return np.flatnonzero(on_front[inverse])
+
+def _epsilon_front(objectives: np.ndarray, epsilon: float, block_size: int) -> np.ndarray:
+    box_points, inverse = _unique_rows(np.floor(objectives / epsilon))
+
+    # Representative per box: the option with the largest objective sum
+    # (lowest index on ties)
+    order = np.lexsort((np.arange(len(objectives)), -objectives.sum(axis=1)))
+    _, first = np.unique(inverse[order], return_index=True)
+    representative = order[first]
+
+    front_boxes = pareto_front(box_points, block_size=block_size)
+    return np.sort(representative[front_boxes])
+
+def non_dominated_sort(objectives: np.ndarray, max_rank: Optional[int] = None,
+                       block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """
+    NSGA-style front ranks: 0 for the Pareto front, 1 for the front of what
+    remains, and so on.
+
+    Each front is peeled with ``pareto_front``. Ranking stops after
+    ``max_rank`` fronts when given, leaving -1 for unranked options.
+
+    Returns:
+        np.ndarray: Rank per option
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    ranks = np.full(len(objectives), -1, dtype=np.intp)
+    remaining = np.arange(len(objectives))
+    rank = 0
+    while len(remaining) and (max_rank is None or rank < max_rank):
+        front = remaining[pareto_front(objectives[remaining], block_size=block_size)]
+        ranks[front] = rank
+        remaining = np.setdiff1d(remaining, front, assume_unique=True)
+        rank += 1
+    return ranks
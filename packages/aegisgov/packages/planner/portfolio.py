@@ -0,0 +1,238 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import Bounds, LinearConstraint, milp
+except ImportError:  # Branch-and-bound below is used without scipy
+    milp = None
+
+# Branch-and-bound stops (status 'node_limit') after this many nodes
+MAX_NODES = 200000
+
+def build_constraints(options: Sequence[Dict[str, Any]], constraints: Dict[str, Any]):
+    """
+    Express constitutional limits as linear constraints over binary selections.
+
+    Rows bound the portfolio's total budget delta (both signs) and
+    population impact, the number of actions, and allow at most one
+    option per ``exclusive_key`` value. Options outside the allowed
+    domains get an upper bound of 0.
+
+    Returns:
+        Tuple: (A, lower, upper, variable upper bounds, row names)
+    """
+    rows, lower, upper, names = [], [], [], []
+
+    max_budget = constraints.get('max_budget_delta_pct')
+    if max_budget is not None:
+        rows.append([float(o.get('budget_delta_pct', 0.0)) for o in options])
+        lower.append(-max_budget)
+        upper.append(max_budget)
+        names.append('budget_delta_pct')
+
+    max_population = constraints.get('max_population_impact_pct')
+    if max_population is not None:
+        rows.append([float(o.get('population_impact_pct', 0.0)) for o in options])
+        lower.append(-np.inf)
+        upper.append(max_population)
+        names.append('population_impact_pct')
+
+    max_actions = constraints.get('max_actions')
+    if max_actions is not None:
+        rows.append([1.0] * len(options))
+        lower.append(0.0)
+        upper.append(max_actions)
+        names.append('max_actions')
+
+    exclusive_key = constraints.get('exclusive_key')
+    if exclusive_key:
+        groups: Dict[Any, List[int]] = {}
+        for i, option in enumerate(options):
+            if option.get(exclusive_key) is not None:
+                groups.setdefault(option[exclusive_key], []).append(i)
+        for value, members in groups.items():
+            if len(members) > 1:
+                row = [0.0] * len(options)
+                for i in members:
+                    row[i] = 1.0
+                rows.append(row)
+                lower.append(0.0)
+                upper.append(1.0)
+                names.append(f"one_{exclusive_key}:{value}")
+
+    domains = constraints.get('domains')
+    allowed = np.array([
+        1.0 if domains is None or o.get('domain') in domains else 0.0 for o in options
+    ])
+
+    A = np.array(rows, dtype=float).reshape(len(rows), len(options))
+    return A, np.array(lower, dtype=float), np.array(upper, dtype=float), allowed, names
+
+def _solve_milp(scores: np.ndarray, A, lower, upper, allowed) -> Optional[np.ndarray]:
+    result = milp(
+        c=-scores,
+        constraints=[LinearConstraint(A, lower, upper)] if len(A) else [],
+        integrality=np.ones(len(scores)),
+        bounds=Bounds(np.zeros(len(scores)), allowed)
+    )
+    if result.status != 0 or result.x is None:
+        return None
+    return np.round(result.x).astype(bool)
+
+def _fractional_knapsack(weights: np.ndarray, values: np.ndarray, capacity: float) -> float:
+    """Best value of items taken in the given (value per weight) order, the last one in part"""
+    filled = np.cumsum(weights)
+    full = np.searchsorted(filled, capacity, side='right')
+    value = values[:full].sum()
+    if full < len(weights):
+        spare = capacity - (filled[full - 1] if full else 0.0)
+        value += values[full] * max(spare, 0.0) / weights[full]
+    return float(value)
+
+def _branch_and_bound(scores: np.ndarray, A, lower, upper, allowed,
+                      max_nodes: Optional[int] = None) -> Tuple[Optional[np.ndarray], bool]:
+    """
+    Exact 0-1 search with an explicit stack (no recursion limit on the
+    number of options).
+
+    Rows with nonnegative coefficients and an upper bound (population,
+    number of actions, exclusive groups) are knapsacks; the fractional
+    knapsack over the remaining candidates bounds what each can still add,
+    and a node is pruned when the smallest such bound cannot beat the
+    incumbent or when some row can no longer reach its bounds. Candidates
+    are branched on in value-per-weight order of the tightest knapsack, or
+    by score when there is none.
+
+    Returns:
+        Tuple: (best selection found or None, whether the search finished
+        within ``max_nodes``)
+    """
+    eligible = np.flatnonzero(allowed > 0)
+    gains = np.clip(scores[eligible], 0.0, None)
+    rows = [row for row in range(len(A))
+            if np.isfinite(upper[row]) and np.all(A[row, eligible] >= 0)]
+
+    def ratio_order(weights):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(weights > 0, gains / weights, np.inf)
+        return np.lexsort((-gains, -ratio))
+
+    order = np.argsort(-gains, kind='stable')
+    tightest = np.inf
+    for row in rows:
+        row_order = ratio_order(A[row, eligible])
+        root = _fractional_knapsack(A[row, eligible][row_order], gains[row_order], upper[row])
+        if root < tightest:
+            tightest, order = root, row_order
+
+    candidates = eligible[order]
+    n = len(candidates)
+    coef = A[:, candidates] if len(A) else np.zeros((0, n))
+    cand_scores = scores[candidates]
+    gains = gains[order]
+
+    # Suffix sums give each row's reachable range from position k onwards
+    pos = np.clip(coef, 0.0, None)
+    neg = np.clip(coef, None, 0.0)
+    suffix_max = np.hstack([np.cumsum(pos[:, ::-1], axis=1)[:, ::-1], np.zeros((len(coef), 1))])
+    suffix_min = np.hstack([np.cumsum(neg[:, ::-1], axis=1)[:, ::-1], np.zeros((len(coef), 1))])
+    suffix_score = np.append(np.cumsum(gains[::-1])[::-1], 0.0)
+    knapsacks = []
+    for row in rows:
+        row_order = ratio_order(coef[row])
+        knapsacks.append((row, row_order, coef[row][row_order], gains[row_order]))
+
+    def bound(k: int, totals: np.ndarray) -> float:
+        best = suffix_score[k]
+        for row, row_order, weights, values in knapsacks:
+            remaining = row_order >= k
+            best = min(best, _fractional_knapsack(weights[remaining], values[remaining], upper[row] - totals[row]))
+        return best
+
+    if max_nodes is None:
+        max_nodes = MAX_NODES
+    tol = 1e-9
+    best_value, best_chosen = -np.inf, None
+    nodes, complete = 0, True
+    # (position, row totals, value, chosen as a linked list of (index, rest))
+    stack = [(0, np.zeros(len(coef)), 0.0, None)]
+    while stack:
+        k, totals, value, chosen = stack.pop()
+        nodes += 1
+        if nodes > max_nodes:
+            complete = False
+            break
+        if np.any(totals + suffix_max[:, k] < lower - tol) or np.any(totals + suffix_min[:, k] > upper + tol):
+            continue
+        if value + bound(k, totals) <= best_value + tol:
+            continue
+        if k == n:
+            if np.all(totals >= lower - tol) and np.all(totals <= upper + tol):
+                best_value, best_chosen = value, chosen
+            continue
+        # Pushed last, so taking candidate k is explored first
+        stack.append((k + 1, totals, value, chosen))
+        stack.append((k + 1, totals + coef[:, k], value + cand_scores[k], (candidates[k], chosen)))
+
+    if best_value == -np.inf:
+        return None, complete
+    selection = np.zeros(len(scores), dtype=bool)
+    while best_chosen is not None:
+        index, best_chosen = best_chosen
+        selection[index] = True
+    return selection, complete
+
+def select_portfolio(options: Sequence[Dict[str, Any]], scores: Sequence[float],
+                     constraints: Dict[str, Any], solver: str = 'auto') -> Dict[str, Any]:
+    """
+    Choose the set of actions with the largest total score that satisfies
+    every constitutional limit.
+
+    The limits are hard constraints of a 0-1 program, so the result is
+    feasible by construction. scipy's ``milp`` (HiGHS) solves it when
+    installed; otherwise an exact branch-and-bound is used.
+
+    Args:
+        options: Candidate actions (``budget_delta_pct``,
+            ``population_impact_pct``, ``domain`` and the exclusive key are read)
+        scores: Score per option (e.g. from ``MultiObjectiveOptimizer.score_options``)
+        constraints: Limits, see ``ConstitutionEngine.planning_constraints``
+        solver: 'auto', 'milp' or 'branch_and_bound'
+
+    Returns:
+        Dict: ``status`` ('optimal', 'infeasible' or 'node_limit' when
+        branch-and-bound gave up after ``MAX_NODES``), ``selected`` indices,
+        ``objective``, ``solver`` and per-constraint ``totals``
+    """
+    if solver not in ('auto', 'milp', 'branch_and_bound'):
+        raise ValueError(f"Unknown solver: {solver}")
+    if solver == 'milp' and milp is None:
+        raise RuntimeError("The milp solver requires scipy")
+    use_milp = milp is not None and solver != 'branch_and_bound'
+
+    scores = np.asarray(scores, dtype=float)
+    A, lower, upper, allowed, names = build_constraints(options, constraints)
+
+    complete = True
+    if len(options) == 0:
+        selection = np.zeros(0, dtype=bool)
+    elif use_milp:
+        selection = _solve_milp(scores, A, lower, upper, allowed)
+    else:
+        selection, complete = _branch_and_bound(scores, A, lower, upper, allowed)
+
+    solver_name = 'milp' if use_milp else 'branch_and_bound'
+    if selection is None:
+        status = 'infeasible' if complete else 'node_limit'
+        return {'status': status, 'selected': [], 'objective': None, 'solver': solver_name, 'totals': {}}
+
+    totals = A @ selection.astype(float) if len(A) else np.zeros(0)
+    return {
+        # node_limit: feasible, but the search stopped before proving it best
+        'status': 'optimal' if complete else 'node_limit',
+        'selected': np.flatnonzero(selection).tolist(),
+        'objective': float(scores[selection].sum()),
+        'solver': solver_name,
+        'totals': dict(zip(names, totals.tolist()))
+    }
@@ -0,0 +1,155 @@
+import itertools
+import os
+from math import comb
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from scipy.stats import qmc
+except ImportError:  # Sobol sampling is optional; lattice and Kronecker need only numpy
+    qmc = None
+
+SAMPLING_METHODS = ('lattice', 'kronecker', 'sobol')
+
+# Weight vectors x options below which a sweep is cheaper in-process than
+# starting a process pool (about 0.1 s of scoring)
+PARALLEL_MIN_WORK = 1 << 24
+
+def simplex_lattice(n_weights: int, divisions: int) -> np.ndarray:
+    """
+    Every weight vector on the simplex with coordinates in steps of 1/divisions.
+
+    Rows come in a fixed (lexicographic) order; there are
+    C(divisions + n_weights - 1, n_weights - 1) of them.
+    """
+    if n_weights < 1 or divisions < 1:
+        raise ValueError("n_weights and divisions must be positive")
+    # Stars and bars: choose where the n_weights - 1 bars go among divisions stars
+    rows = [
+        np.diff((-1,) + bars + (divisions + n_weights - 1,)) - 1
+        for bars in itertools.combinations(range(divisions + n_weights - 1), n_weights - 1)
+    ]
+    return np.array(rows, dtype=float) / divisions
+
+def simplex_lattice_size(n_weights: int, divisions: int) -> int:
+    """Number of points in ``simplex_lattice(n_weights, divisions)``"""
+    return comb(divisions + n_weights - 1, n_weights - 1)
+
+def _kronecker_cube(dims: int, n_points: int, seed: int) -> np.ndarray:
+    # Additive recurrence with the generalized golden ratio (the R_d sequence)
+    phi = 2.0
+    for _ in range(50):
+        phi = (1 + phi) ** (1.0 / (dims + 1))
+    alpha = (1.0 / phi) ** np.arange(1, dims + 1)
+    k = np.arange(seed + 1, seed + n_points + 1)[:, None]
+    return np.mod(0.5 + k * alpha, 1.0)
+
+def _cube_to_simplex(cube: np.ndarray) -> np.ndarray:
+    # Spacings of sorted uniform coordinates are uniform on the simplex
+    edges = np.sort(cube, axis=1)
+    zeros = np.zeros((len(cube), 1))
+    ones = np.ones((len(cube), 1))
+    return np.diff(np.hstack([zeros, edges, ones]), axis=1)
+
+def sample_simplex(n_weights: int, n_points: int, method: str = 'kronecker', seed: int = 0) -> np.ndarray:
+    """
+    Deterministic low-discrepancy weight vectors on the simplex.
+
+    Args:
+        n_weights: Weights per vector (one per KPI)
+        n_points: Vectors to draw (for 'lattice', the smallest full lattice
+            with at least this many points is returned)
+        method: 'kronecker' (R_d lattice sequence), 'sobol' (requires scipy)
+            or 'lattice' (regular grid)
+        seed: Offset into the sequence (Sobol scrambling seed)
+
+    Returns:
+        np.ndarray: (points x n_weights) matrix whose rows sum to 1
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method: {method}")
+    if n_weights == 1:
+        return np.ones((n_points, 1))
+
+    if method == 'lattice':
+        divisions = 1
+        while simplex_lattice_size(n_weights, divisions) < n_points:
+            divisions += 1
+        return simplex_lattice(n_weights, divisions)
+
+    if method == 'sobol':
+        if qmc is None:
+            raise RuntimeError("Sobol sampling requires scipy")
+        cube = qmc.Sobol(d=n_weights - 1, scramble=True, seed=seed).random(n_points)
+    else:
+        cube = _kronecker_cube(n_weights - 1, n_points, seed)
+    return _cube_to_simplex(cube)
+
+# Per-process state for parallel sweeps
+_worker_optimizer = None
+_worker_normalized = None
+
+def _init_worker(kpi_meta: Dict, normalized: np.ndarray) -> None:
+    global _worker_optimizer, _worker_normalized
+    from .optimizer import MultiObjectiveOptimizer  # optimizer imports this module
+    _worker_optimizer = MultiObjectiveOptimizer(kpi_meta)
+    _worker_normalized = normalized
+
+def _best_for_chunk(weights: np.ndarray) -> np.ndarray:
+    return _worker_optimizer.best_option_indices(_worker_normalized, weights)
+
+def sweep_winners(optimizer, normalized: np.ndarray, weights: np.ndarray,
+                  workers: Optional[int] = None, chunk_size: int = 4096) -> np.ndarray:
+    """
+    Best option for every weight vector, split across a process pool.
+
+    Chunks are mapped in order, so the result does not depend on the
+    number of workers.
+
+    Args:
+        optimizer: MultiObjectiveOptimizer the options were normalized with
+        normalized: (options x KPIs) matrix from ``normalize_options``
+        weights: (points x KPIs) weight vectors
+        workers: Processes to use (None for all cores once the sweep reaches
+            ``PARALLEL_MIN_WORK``, 1 to stay in-process)
+        chunk_size: Weight vectors per task
+
+    Returns:
+        np.ndarray: Winning option index per weight vector
+    """
+    if not workers:
+        workers = (os.cpu_count() or 1) if len(weights) * len(normalized) >= PARALLEL_MIN_WORK else 1
+    chunks = [weights[i:i + chunk_size] for i in range(0, len(weights), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        return optimizer.best_option_indices(normalized, weights)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                             initargs=(optimizer.kpi_meta, normalized)) as executor:
+        return np.concatenate(list(executor.map(_best_for_chunk, chunks)))
+
+def winning_regions(weights: np.ndarray, winners: np.ndarray, n_options: int) -> List[Dict]:
+    """
+    Summarize, per option, the part of the weight simplex where it wins.
+
+    Returns:
+        List[Dict]: Per option: ``wins``, ``share`` of the sampled simplex,
+        the ``centroid`` weight vector of its region and per-weight
+        ``weight_min``/``weight_max`` bounds (None when it never wins)
+    """
+    counts = np.bincount(winners, minlength=n_options)
+    order = np.argsort(winners, kind='stable')
+    groups = np.split(weights[order], np.cumsum(counts)[:-1])
+
+    regions = []
+    for option_index, (wins, region) in enumerate(zip(counts.tolist(), groups)):
+        regions.append({
+            'option_index': option_index,
+            'wins': wins,
+            'share': wins / len(weights) if len(weights) else 0.0,
+            'centroid': region.mean(axis=0).tolist() if wins else None,
+            'weight_min': region.min(axis=0).tolist() if wins else None,
+            'weight_max': region.max(axis=0).tolist() if wins else None
+        })
+    return regions
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark ledger payload hashing.
+
+Compares the canonical CBOR hash used by both ledger writers with the
+previous concatenated ``json.dumps(sort_keys=True)`` payload, reporting time
+per hash and peak memory for an ``inputs_bundle`` of the given size.
+
+Usage:
+    python scripts/bench_ledger_hash.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from packages.ledger.canonical import decision_payload_hash
+
+def make_decision(rows: int) -> dict:
+    return {
+        'inputs_bundle': {
+            'kpi_data': [
+                {
+                    'region': f"region-{i % 50}",
+                    'period': i,
+                    'kpis': {
+                        'real_wage': 1.0 + i * 0.001,
+                        'unemployment': 5.0 - (i % 100) * 0.01,
+                        'atkinson_index': 0.3,
+                        'carbon_intensity': 120.5 + i % 7,
+                        'reserve_margin': 15.0,
+                        'rent_burden': 0.31
+                    },
+                    'source': 'bls'
+                }
+                for i in range(rows)
+            ]
+        },
+        'objectives': {'rights_protection': 1.0, 'prosperity': 0.8},
+        'options_considered': [{'action_type': 'carbon_fee', 'score': 0.71}],
+        'chosen_action': {'action_type': 'carbon_fee'},
+        'tests_passed': {'constitution_check': True}
+    }
+
+def json_concat_hash(decision: dict) -> bytes:
+    payload = '|'.join(json.dumps(decision[k], sort_keys=True) for k in (
+        'inputs_bundle', 'objectives', 'options_considered', 'chosen_action', 'tests_passed'
+    ))
+    return hashlib.sha256(payload.encode('utf-8')).digest()
+
+def canonical_hash(decision: dict) -> bytes:
+    return decision_payload_hash(**decision)
+
+def measure(fn, decision: dict, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(decision)
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+
+    tracemalloc.start()
+    fn(decision)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000, help='KPI rows in inputs_bundle')
+    parser.add_argument('--repeat', type=int, default=5, help='Hashes timed per method')
+    args = parser.parse_args()
+
+    decision = make_decision(args.rows)
+    print(f"inputs_bundle rows: {args.rows}")
+    print(f"{'method':<16}{'ms/hash':>10}{'peak MiB':>10}")
+    for name, fn in (('json concat', json_concat_hash), ('canonical cbor', canonical_hash)):
+        elapsed_ms, peak_mib = measure(fn, decision, args.repeat)
+        print(f"{name:<16}{elapsed_ms:>10.1f}{peak_mib:>10.1f}")
+
+    # Reproducibility: insertion order must not change the digest
+    shuffled = {k: decision[k] for k in reversed(list(decision))}
+    shuffled['inputs_bundle'] = {'kpi_data': [dict(reversed(list(row.items()))) for row in decision['inputs_bundle']['kpi_data']]}
+    assert canonical_hash(shuffled) == canonical_hash(decision)
+    print("canonical digest is independent of key order")
+
+if __name__ == '__main__':
+    main()
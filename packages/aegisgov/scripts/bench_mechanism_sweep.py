@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark mechanism parameter sweeps.
+
+Compares the scalar path (an ``update_*`` setter plus ``calculate_impact``
+per grid point, in a Python loop) with one array-native ``sweep`` call
+over the same grid, and checks that both give the same results.
+
+Usage:
+    python scripts/bench_mechanism_sweep.py [--points 200] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from packages.mechanism import CarbonFeeDividend, CongestionPricing, HousingCredits
+
+def scalar_carbon(rates, targets):
+    mechanism = CarbonFeeDividend()
+    rows = []
+    for rate in rates:
+        mechanism.update_fee_rate(rate)
+        for target in targets:
+            rows.append(mechanism.calculate_impact(target)['economic']['revenue'])
+    return np.array(rows)
+
+def scalar_congestion(fees, demands):
+    mechanism = CongestionPricing()
+    rows = []
+    for fee in fees:
+        mechanism.update_base_fee(fee)
+        for demand in demands:
+            rows.append(mechanism.calculate_impact(20000, demand)['economic']['revenue'])
+    return np.array(rows)
+
+def scalar_housing(amounts, rents):
+    mechanism = HousingCredits()
+    rows = []
+    for amount in amounts:
+        mechanism.update_credit_amount(amount)
+        for rent in rents:
+            rows.append(mechanism.calculate_impact(rent, 6000.0)['economic']['revenue_impact'])
+    return np.array(rows)
+
+def cases(points: int):
+    first = np.linspace(1, 100, points)
+    return [
+        ('carbon fee_rate x target', lambda: scalar_carbon(first, np.linspace(0, 50, points)),
+         lambda: CarbonFeeDividend().sweep({'fee_rate': first, 'target_reduction_pct': np.linspace(0, 50, points)}),
+         'economic.revenue'),
+        ('congestion base_fee x demand', lambda: scalar_congestion(first, np.linspace(1, 3, points)),
+         lambda: CongestionPricing().sweep({'base_fee': first, 'peak_hour_demand': np.linspace(1, 3, points)},
+                                           fixed={'current_traffic_volume': 20000}),
+         'economic.revenue'),
+        ('housing credit x rent', lambda: scalar_housing(first * 100, np.linspace(600, 3000, points)),
+         lambda: HousingCredits().sweep({'credit_amount': first * 100, 'market_rent': np.linspace(600, 3000, points)},
+                                        fixed={'construction_costs': 6000.0}),
+         'economic.revenue_impact'),
+    ]
+
+def best_of(fn, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=200, help='Values per swept parameter')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per method (best is reported)')
+    args = parser.parse_args()
+
+    print(f"grid: {args.points} x {args.points} = {args.points ** 2} points")
+    print(f"{'sweep':<30}{'scalar ms':>12}{'array ms':>12}{'speedup':>10}")
+    for name, scalar, vectorized, metric in cases(args.points):
+        scalar_ms, expected = best_of(scalar, args.repeat)
+        array_ms, columns = best_of(vectorized, args.repeat)
+        assert np.allclose(columns[metric], expected)
+        print(f"{name:<30}{scalar_ms:>12.1f}{array_ms:>12.1f}{scalar_ms / array_ms:>9.0f}x")
+
+if __name__ == '__main__':
+    main()
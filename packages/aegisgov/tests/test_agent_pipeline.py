@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from packages.agents import AgentOrchestrator
+from packages.agents.pipeline import Pipeline, StopPipeline
+
+def meeting(value):
+    def step(ctx):
+        # Returns only once all three steps are running at the same time
+        if ctx['barrier'] is not None:
+            ctx['barrier'].wait()
+        return value
+    return step
+
+def test_independent_steps_run_in_parallel():
+    pipeline = Pipeline()
+    pipeline.add('a', meeting(1))
+    pipeline.add('b', meeting(2))
+    pipeline.add('c', meeting(3))
+    pipeline.add('sum', lambda ctx: ctx['a'] + ctx['b'] + ctx['c'] + ctx['offset'], deps=['a', 'b', 'c'])
+
+    barrier = threading.Barrier(3, timeout=5)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        run = pipeline.run({'offset': 10, 'barrier': barrier}, executor=executor)
+
+    assert run.outputs['sum'] == 16 and run.stopped is None
+    assert not barrier.broken
+    assert set(run.timings_ms) == {'a', 'b', 'c', 'sum'}
+    assert pipeline.run({'offset': 0, 'barrier': None}).outputs['sum'] == 6
+
+def test_stop_and_cached_steps():
+    calls = []
+    pipeline = Pipeline()
+    pipeline.add('check', lambda ctx: (_ for _ in ()).throw(StopPipeline({'status': 'invalid'})) if ctx['bad'] else True)
+    pipeline.add('expensive', lambda ctx: calls.append(ctx['key']) or ctx['key'] * 2, deps=['check'],
+                 cache_key=lambda ctx: ctx['key'])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert pipeline.run({'bad': True, 'key': 1}, executor).stopped == {'status': 'invalid'}
+        assert pipeline.run({'bad': False, 'key': 1}, executor).outputs['expensive'] == 2
+        assert pipeline.run({'bad': False, 'key': 1}, executor).outputs['expensive'] == 2
+        assert pipeline.run({'bad': False, 'key': 2}, executor).outputs['expensive'] == 4
+    assert calls == [1, 2]
+
+    with pytest.raises(ValueError):
+        pipeline.add('late', lambda ctx: None, deps=['missing'])
+
+    # Every run gets its own copy of a cached output
+    pipeline.add('listed', lambda ctx: [ctx['key']], deps=['check'], cache_key=lambda ctx: ctx['key'])
+    pipeline.run({'bad': False, 'key': 3}).outputs['listed'].append('changed')
+    assert pipeline.run({'bad': False, 'key': 3}).outputs['listed'] == [3]
+
+def test_planning_cycle_records_step_timings():
+    """Monitors run once per cycle and every step's wall time reaches the explainer"""
+    with AgentOrchestrator() as orchestrator:
+        calls = []
+        run_all_monitors = orchestrator.assurance_monitors.run_all_monitors
+        orchestrator.assurance_monitors.run_all_monitors = lambda metrics: calls.append(1) or run_all_monitors(metrics)
+
+        plans = [{'weights': [0.2, 0.2, 0.2, 0.15, 0.15, 0.1], 'region': region} for region in ('a', 'b', 'c')]
+        results = orchestrator.execute_planning_cycles(plans)
+
+        assert [r['status'] for r in results] == ['success'] * 3
+        assert len(calls) == 3
+        timings = results[0]['explainer']['step_timings_ms']
+        assert set(orchestrator.planning_pipeline.step_names()) | {'total'} == set(timings)
+        assert results[0]['chosen_plan'] == orchestrator.execute_planning_cycle(plans[0])['chosen_plan']
+        assert orchestrator.execute_planning_cycle({'weights': [0.5, 0.6]})['status'] == 'invalid'
+
+def test_default_cycle_scores_options_on_kpi_meta():
+    """Without plan KPIs the optimizer uses KPI_META, so weights decide between the default options"""
+    with AgentOrchestrator() as orchestrator:
+        carbon = orchestrator.execute_planning_cycle({'weights': [0.0, 0.0, 0.0, 1.0, 0.0, 0.0]})
+        housing = orchestrator.execute_planning_cycle({'weights': [0.0, 0.0, 0.0, 0.0, 0.0, 1.0]})
+
+        assert carbon['chosen_plan']['action_type'] == 'carbon_fee_dividend'
+        assert housing['chosen_plan']['action_type'] == 'housing_build_credits'
+        assert all(t['score'] > 0 for t in carbon['explainer']['tradeoffs'])
+        regions = carbon['explainer']['tradeoff_regions']
+        assert {r['option'] for r in regions} == {'carbon_fee_dividend', 'housing_build_credits'}
+
+        # Options without any KPI tie under every weight vector, so no regions are reported
+        no_kpis = orchestrator.execute_planning_cycle({
+            'weights': [0.2, 0.2, 0.2, 0.15, 0.15, 0.1],
+            'options': [{'action_type': 'a', 'domain': 'energy'}, {'action_type': 'b', 'domain': 'housing'}]
+        })
+        assert no_kpis['explainer']['tradeoff_regions'] == []
+
+def test_cached_tradeoff_regions_are_not_shared_and_close_stops_the_steps():
+    """Changing one cycle's regions leaves the next cycle's intact; a closed orchestrator runs nothing"""
+    plan = {'weights': [0.0, 0.0, 0.0, 1.0, 0.0, 0.0]}
+    with AgentOrchestrator() as orchestrator:
+        first = orchestrator.execute_planning_cycle(plan)['explainer']['tradeoff_regions']
+        expected = [dict(region) for region in first]
+        first[0]['share'] = -1.0
+        first.clear()
+        assert orchestrator.execute_planning_cycle(plan)['explainer']['tradeoff_regions'] == expected
+
+    with pytest.raises(RuntimeError):
+        orchestrator.execute_planning_cycle(plan)
+
+def test_portfolio_mode_handles_many_options_and_node_limits(monkeypatch):
+    """More options than max_actions are selected; an exhausted search ends the cycle cleanly"""
+    import packages.planner.portfolio as portfolio
+
+    options = [{'action_type': f"option_{i}", 'domain': 'energy', 'real_wage': 25 + (i * 7919 % 100) / 10,
+                'unemployment': 3 + (i * 104729 % 40) / 10} for i in range(200)]
+    plan = {'planner_mode': 'portfolio', 'options': options, 'weights': [0.5, 0.5, 0.0, 0.0, 0.0, 0.0]}
+    with AgentOrchestrator() as orchestrator:
+        result = orchestrator.execute_planning_cycle(plan)
+        assert result['status'] == 'success'
+        assert len(result['chosen_plan']['actions']) == 50
+
+        monkeypatch.setattr(portfolio, 'MAX_NODES', 5)
+        stopped = orchestrator.execute_planning_cycle(plan)
+        assert stopped['status'] == 'error' and 'node limit' in stopped['message']
+
+def test_cycle_fingerprints_its_options_once(monkeypatch):
+    """The options key from the options step serves every cache lookup of the cycle"""
+    import packages.agents.orchestrator as orchestrator_module
+    import packages.planner.cache as cache
+
+    hashed = []
+    fingerprint = cache.fingerprint
+    counting = lambda value: hashed.append(value) or fingerprint(value)
+    monkeypatch.setattr(cache, 'fingerprint', counting)
+    monkeypatch.setattr(orchestrator_module, 'fingerprint', counting)
+
+    with AgentOrchestrator() as orchestrator:
+        result = orchestrator.execute_planning_cycle({'weights': [0.0, 0.0, 0.0, 1.0, 0.0, 0.0]})
+    assert result['status'] == 'success'
+    assert sum(isinstance(value, list) for value in hashed) == 1
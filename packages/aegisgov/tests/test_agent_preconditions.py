@@ -0,0 +1,56 @@
+import time
+
+import pytest
+from packages.agents import AgentOrchestrator
+from packages.agents.preconditions import PreconditionContext, compile_precondition
+
+def evaluate(source, plan, providers=None):
+    return compile_precondition(source)(PreconditionContext(plan, providers))
+
+def test_expressions_follow_precedence_and_compare_plan_fields():
+    plan = {'budget_delta_pct': 1.5, 'population_impact_pct': 3, 'region': 'denver'}
+    assert evaluate("budget_delta_pct >= 1 or population_impact_pct > 5", plan)
+    assert not evaluate("budget_delta_pct < 1 and population_impact_pct < 5", plan)
+    assert evaluate("not (budget_delta_pct < 1) and region == 'denver'", plan)
+    assert evaluate("population_impact_pct > 1 or missing_field and false", plan)
+    assert evaluate("missing_field == 0", plan)
+
+@pytest.mark.parametrize("source", ["a <", "(a > 1", "a > 1)", "__import__('os')", "a ; b", "a.b()"])
+def test_invalid_expressions_are_rejected(source):
+    with pytest.raises(ValueError):
+        compile_precondition(source)
+
+def test_workflow_preconditions_share_monitor_results():
+    """assurance.pass runs the monitors once however many preconditions use it"""
+    orchestrator = AgentOrchestrator()
+    calls = []
+    run_all_monitors = orchestrator.assurance_monitors.run_all_monitors
+    orchestrator.assurance_monitors.run_all_monitors = lambda metrics: calls.append(1) or run_all_monitors(metrics)
+
+    plan = {'budget_delta_pct': 0.5}
+    assert orchestrator.validate_workflow('execute_low_risk', plan)
+    assert not orchestrator.validate_workflow('execute_low_risk', {**plan, 'has_active_appeals': True})
+    assert not orchestrator.validate_workflow('propose_high_risk', plan)
+    assert orchestrator.validate_workflow('propose_high_risk', {'population_impact_pct': 7})
+    assert len(calls) == 2
+
+    providers = orchestrator.precondition_providers
+    compiled = [compile_precondition("assurance.pass and impact_budget_pct < 1")] * 24
+    context = PreconditionContext(plan, providers)
+    assert all(condition(context) for condition in compiled)
+    assert len(calls) == 3
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        context = PreconditionContext(plan, {'assurance.pass': lambda plan: True, **{
+            k: v for k, v in providers.items() if k != 'assurance.pass'}})
+        all(condition(context) for condition in compiled)
+    assert (time.perf_counter() - started) / 1000 < 1e-3
+
+def test_compiled_graph_snapshot_pickles():
+    import pickle
+    from packages.constitution import artifact_cache
+
+    snapshot = pickle.loads(pickle.dumps(artifact_cache.get('agent_graph')))
+    context = PreconditionContext({'population_impact_pct': 7}, {'impact_budget_pct': lambda plan: 0})
+    assert all(condition(context) for condition in snapshot.compiled['propose_high_risk'])
@@ -0,0 +1,75 @@
+import numpy as np
+from packages.assurance import AssuranceMonitors
+
+KPIS = ['atkinson_index', 'reserve_margin', 'unemployment', 'carbon_intensity', 'rent_burden']
+
+def random_table(n_regions, n_times, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.array([0.25, 16.0, 5.0, 350.0, 28.0])
+    scale = np.array([0.01, 2.0, 0.3, 15.0, 1.0])
+    values = base[None, :, None] + scale[None, :, None] * rng.normal(size=(n_regions, len(KPIS), n_times))
+    # Push some current values out of range
+    values[:, :, -1] += scale[None, :] * rng.choice([0, 0, 0, 5], size=(n_regions, len(KPIS)))
+    regions = np.repeat([f"r{i:03d}" for i in range(n_regions)], n_times)
+    times = np.tile(np.arange(n_times), n_regions)
+    columns = {'region': regions, 'ts': times}
+    for k, kpi in enumerate(KPIS):
+        columns[kpi] = values[:, k, :].ravel()
+    appeals = {
+        'region': [f"r{i:03d}" for i in range(n_regions)],
+        'total_appeals': rng.integers(0, 80, n_regions),
+        'upheld_appeals': rng.integers(0, 3, n_regions),
+        'population_size': np.full(n_regions, 1000)
+    }
+    return values, columns, appeals
+
+def test_region_batch_matches_per_region_monitors():
+    monitors = AssuranceMonitors()
+    values, columns, appeals = random_table(40, 12)
+    batch = monitors.run_region_monitors(columns, appeals)
+
+    assert batch['triggered'].shape == (40, 4)
+    assert 0 < batch['tripwires_triggered'].sum() < 40
+    for r, region in enumerate(batch['regions']):
+        metrics = {
+            'historical_data': [dict(zip(KPIS, values[r, :, t])) for t in range(values.shape[2] - 1)],
+            'current_metrics': dict(zip(KPIS, values[r, :, -1])),
+            'appeal_data': {name: appeals[name][r] for name in ('total_appeals', 'upheld_appeals', 'population_size')}
+        }
+        single = monitors.run_all_monitors(metrics)
+        expected = {name: reason for name, reason in single['details'].items() if reason is not None}
+        assert bool(batch['tripwires_triggered'][r]) == single['tripwires_triggered'], region
+        assert batch['reasons'][r].keys() == expected.keys(), region
+        assert batch['reasons'][r].get('ood_detection') == expected.get('ood_detection')
+
+def test_missing_rows_and_regions_without_appeals():
+    monitors = AssuranceMonitors()
+    columns = {
+        'region': ['a', 'a', 'a', 'a', 'b'],
+        'ts': [1, 2, 3, 4, 4],
+        'reserve_margin': [18, 18, 17, 10, 16],
+        'unemployment': [5.0, 5.1, 4.9, 9.0, 5.0]
+    }
+    batch = monitors.run_region_monitors(columns, {'region': ['a'], 'total_appeals': [1],
+                                                   'upheld_appeals': [0], 'population_size': [100]})
+
+    assert batch['regions'] == ['a', 'b']
+    assert batch['triggered'].tolist() == [[False, True, True, False], [False, False, False, False]]
+    assert np.isnan(batch['z_scores'][1]).all()
+
+def test_region_lagging_behind_uses_its_own_latest_row():
+    """A region whose last row is older than the newest timestamp is checked on that row"""
+    monitors = AssuranceMonitors()
+    columns = {
+        'region': ['a', 'a', 'a', 'a', 'b'],
+        'ts': [1, 2, 3, 4, 5],
+        'reserve_margin': [5, 5, 5, 5, 16]
+    }
+    batch = monitors.run_region_monitors(columns)
+
+    single = monitors.run_all_monitors({
+        'historical_data': [{'reserve_margin': 5}] * 3,
+        'current_metrics': {'reserve_margin': 5}
+    })
+    assert single['tripwires_triggered']
+    assert batch['triggered'].tolist() == [[False, True, False, False], [False, False, False, False]]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from packages.assurance import AssuranceMonitors, EwmaStats, StreamingMonitors, WelfordStats, WindowStats
+
+def test_running_statistics_match_numpy():
+    values = np.random.default_rng(1).normal(10, 3, 500)
+    welford, window, ewma = WelfordStats(), WindowStats(size=50), EwmaStats(alpha=0.1)
+    for value in values:
+        welford.update(value)
+        window.update(value)
+        ewma.update(value)
+
+    assert welford.mean == pytest.approx(values.mean())
+    assert welford.std == pytest.approx(values.std())
+    assert window.count == 50
+    assert window.mean == pytest.approx(values[-50:].mean())
+    assert window.std == pytest.approx(values[-50:].std())
+    assert ewma.mean == pytest.approx(10, abs=1.5)
+
+def test_streaming_checks_agree_with_batch_monitors():
+    """Seeded from the same history, a tick triggers the same tripwires as run_all_monitors"""
+    history = [{'atkinson_index': 0.25 + 0.002 * i, 'unemployment': 4.8 + 0.05 * (i % 3),
+                'carbon_intensity': 350 + 10 * (i % 4)} for i in range(20)]
+    current = {'atkinson_index': 0.30, 'unemployment': 6.5, 'carbon_intensity': 355, 'reserve_margin': 11.0}
+
+    batch = AssuranceMonitors().run_all_monitors({'historical_data': history, 'current_metrics': current})
+    streaming = StreamingMonitors()
+    streaming.seed(history)
+    tick = streaming.observe_tick(current)
+
+    assert tick['tripwires_triggered']
+    assert tick['details'] == {k: v for k, v in batch['details'].items() if v is not None}
+    assert tick['details']['ood_detection'] == "OOD detected in KPIs: unemployment"
+
+def test_window_variance_survives_large_offsets():
+    """A narrow spread around a large value keeps its std, and OOD stays enabled"""
+    values = 1e6 + np.random.default_rng(2).normal(0, 0.05, 5000)
+    window = WindowStats(size=30)
+    for value in values:
+        window.update(value)
+
+    assert window.mean == pytest.approx(values[-30:].mean(), rel=1e-12)
+    assert window.std == pytest.approx(values[-30:].std(), rel=1e-6)
+
+    streaming = StreamingMonitors(stats='window', size=30)
+    streaming.seed({'carbon_intensity': value} for value in values)
+    assert 'ood_detection' in streaming.observe('carbon_intensity', 1e6 + 1.0)
+
+def test_tick_reports_every_ood_kpi_in_one_reason():
+    """Several OOD KPIs in a tick give the run_all_monitors message, not one per KPI"""
+    history = [{'unemployment': 5.0 + 0.1 * (i % 3), 'carbon_intensity': 350 + 5 * (i % 4),
+                'rent_burden': 30 + 0.2 * (i % 2), 'atkinson_index': 0.25} for i in range(20)]
+    current = {'rent_burden': 40.0, 'unemployment': 9.0, 'carbon_intensity': 352, 'atkinson_index': 0.25}
+
+    batch = AssuranceMonitors().run_all_monitors({'historical_data': history, 'current_metrics': current})
+    streaming = StreamingMonitors()
+    streaming.seed(history)
+    tick = streaming.observe_tick(current)
+
+    assert tick['details']['ood_detection'] == "OOD detected in KPIs: unemployment, rent_burden"
+    assert tick['details']['ood_detection'] == batch['details']['ood_detection']
+
+def test_streams_are_independent_per_kpi_and_region():
+    streaming = StreamingMonitors()
+    for i in range(10):
+        assert streaming.observe('unemployment', 5.0 + 0.01 * (i % 2), region='a') == {}
+        streaming.observe('carbon_intensity', 100 * i, region='a')
+
+    # 6.0 is far outside region a's unemployment history, even though the
+    # carbon intensity stream is spread widely
+    assert 'ood_detection' in streaming.observe('unemployment', 6.0, region='a')
+    assert streaming.observe('unemployment', 6.0, region='b') == {}
+    assert streaming.statistics('unemployment', region='a').count == 11
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+# The top-level ledger package (group-commit append service)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ledger.append_service import LedgerAppendService
+from packages.assurance import StreamingMonitors, TripwireService
+
+class FakeWriter:
+    def __init__(self):
+        self.decisions = []
+
+    def write_decisions(self, decisions, chain=True, link_to_tail=False):
+        self.decisions.extend(decisions)
+        return [{'status': 'success', 'decision_id': len(self.decisions)}] * len(decisions)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_debounce_pauses_once_and_resumes_after_hold():
+    clock = FakeClock()
+    events = []
+    service = TripwireService(trip_after=2, clear_after=3, min_pause_s=60, on_event=events.append, clock=clock)
+
+    # Hovering around the reserve floor (12) trips only on consecutive breaches
+    for value in [13, 11, 13, 11, 13]:
+        service.process({'region': 'a', 'kpi': 'reserve_margin', 'value': value})
+    assert events == []
+
+    service.process({'region': 'a', 'kpi': 'reserve_margin', 'value': 11})
+    service.process({'region': 'a', 'kpi': 'reserve_margin', 'value': 10})
+    service.process({'region': 'a', 'kpi': 'reserve_margin', 'value': 9})
+    assert [e.kind for e in events] == ['pause']
+    assert events[0].reason == "Safety margin breach: 10.0 < 12.0"
+    assert service.paused() == {'a': ['safety_margin:reserve_margin']}
+
+    # Recovery must persist for clear_after ticks and the minimum hold time
+    for _ in range(3):
+        service.process({'region': 'a', 'kpi': 'reserve_margin', 'value': 16})
+    assert [e.kind for e in events] == ['pause']
+    clock.now = 61
+    service.process({'region': 'a', 'kpi': 'reserve_margin', 'value': 16})
+    assert [e.kind for e in events] == ['pause', 'resume']
+    assert service.paused('a') == {}
+
+def test_pauses_are_written_through_the_append_service():
+    """Queued KPI updates pause within the worker's turnaround and land in the ledger"""
+    writer = FakeWriter()
+    streaming = StreamingMonitors()
+    streaming.seed([{'unemployment': 5.0 + 0.1 * (i % 3)} for i in range(30)], region='denver')
+    events = []
+
+    with LedgerAppendService(writer, max_delay_ms=1) as ledger:
+        with TripwireService(streaming, append_service=ledger, trip_after=2, on_event=events.append) as service:
+            started = time.perf_counter()
+            for value in [5.1, 9.0, 9.5]:
+                service.submit({'region': 'denver', 'kpi': 'unemployment', 'value': value})
+            while not events and time.perf_counter() - started < 2:
+                time.sleep(0.001)
+            assert time.perf_counter() - started < 1
+
+    assert [(e.kind, e.region, e.monitor) for e in events] == [('pause', 'denver', 'ood_detection')]
+    assert len(writer.decisions) == 1
+    action = writer.decisions[0]['chosen_action']
+    assert action['action_type'] == 'auto_pause' and action['region'] == 'denver'
+    assert writer.decisions[0]['tests_passed'] == {'ood_detection': False}
+    assert service.ledger_writes == {'appended': 1, 'failed': 0}
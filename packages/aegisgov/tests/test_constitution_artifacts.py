@@ -0,0 +1,80 @@
+import json
+import os
+import pickle
+import shutil
+
+from packages.constitution import ArtifactCache, ConstitutionEngine
+from packages.constitution.engine import CONSTITUTION_PATH, load_constitution
+
+def write(path, payload):
+    # Write-then-rename, as a deploy would, so readers never see a partial file
+    with open(path + '.tmp', 'w') as f:
+        f.write(payload)
+    os.replace(path + '.tmp', path)
+
+def test_reload_swaps_versions_and_survives_bad_files(tmp_path):
+    """A changed file gets a new version ID; an unparsable one keeps the old version"""
+    path = str(tmp_path / 'artifact.json')
+    write(path, json.dumps({'version': '1', 'limit': 1}))
+    cache = ArtifactCache(check_interval=0)
+    cache.register('artifact', path, lambda raw: (json.loads(raw), None))
+
+    first = cache.get('artifact')
+    assert cache.get('artifact') is first
+    assert first.version_id.startswith('1+')
+
+    write(path, json.dumps({'version': '1', 'limit': 2}))
+    second = cache.get('artifact')
+    assert second.data['limit'] == 2
+    assert second.version_id != first.version_id
+    assert first.data['limit'] == 1  # Holders of the old snapshot are unaffected
+
+    write(path, '{not json')
+    assert cache.get('artifact') is second
+
+def test_engine_records_version_and_shares_snapshots(tmp_path):
+    """Validation results carry the version ID; exported snapshots install without parsing"""
+    path = str(tmp_path / 'constitution.json')
+    shutil.copy(CONSTITUTION_PATH, path)
+    cache = ArtifactCache(check_interval=0)
+    cache.register('constitution', path, load_constitution)
+    engine = ConstitutionEngine(cache)
+
+    version_id = engine.snapshot().version_id
+    assert engine.validate_plan({'budget_delta_pct': 0.5})['constitution_version_id'] == version_id
+    assert engine.validate_plans([{'budget_delta_pct': 0.5}])['constitution_version_id'] == version_id
+
+    with open(path) as f:
+        constitution = json.load(f)
+    constitution['rate_limits']['max_budget_delta_pct'] = 0.25
+    write(path, json.dumps(constitution))
+    result = engine.validate_plan({'budget_delta_pct': 0.5})
+    assert not result['valid']
+    assert result['constitution_version_id'] != version_id
+
+    worker = ArtifactCache(check_interval=0)
+    worker.register('constitution', path, lambda raw: (_ for _ in ()).throw(AssertionError("parsed")))
+    worker.install(pickle.loads(pickle.dumps(cache.export())))
+    assert worker.get('constitution').version_id == result['constitution_version_id']
+
+def test_plan_is_validated_against_one_version(tmp_path):
+    """A reload between the sub-checks of validate_plan does not mix versions"""
+    path = str(tmp_path / 'constitution.json')
+    shutil.copy(CONSTITUTION_PATH, path)
+    cache = ArtifactCache(check_interval=0)
+    cache.register('constitution', path, load_constitution)
+    engine = ConstitutionEngine(cache)
+    old = engine.snapshot()
+
+    with open(path) as f:
+        constitution = json.load(f)
+    constitution['rate_limits']['max_budget_delta_pct'] = 0.25
+    write(path, json.dumps(constitution))
+    new = cache.get('constitution')
+    # The first lookup sees the old version, any later one the reloaded file
+    snapshots = iter([old])
+    engine.snapshot = lambda: next(snapshots, new)
+
+    result = engine.validate_plan({'budget_delta_pct': 0.5})
+    assert result['valid']
+    assert result['constitution_version_id'] == old.version_id
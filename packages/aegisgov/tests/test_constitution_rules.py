@@ -0,0 +1,64 @@
+import numpy as np
+from packages.constitution import ConstitutionEngine
+from packages.constitution import rules
+
+def random_plans(n, seed=0):
+    rng = np.random.default_rng(seed)
+    objectives = ["fairness", "prosperity", "environment", "surveillance"]
+    domains = ["energy", "housing", "finance", ""]
+    plans = []
+    for i in range(n):
+        plan = {}
+        if rng.random() < 0.7:
+            weights = rng.dirichlet(np.ones(6))
+            if rng.random() < 0.3:
+                weights = weights * rng.uniform(0.5, 1.5)
+            if rng.random() < 0.1:
+                weights[0] = -0.1
+            plan['weights'] = weights.tolist()
+        if rng.random() < 0.5:
+            plan['objectives'] = list(rng.choice(objectives, size=rng.integers(0, 3)))
+        if rng.random() < 0.4:
+            plan['action'] = {'domain': str(rng.choice(domains))}
+        elif rng.random() < 0.5:
+            plan['actions'] = [{'domain': str(d)} for d in rng.choice(domains, size=rng.integers(0, 3))]
+        if rng.random() < 0.6:
+            plan['population_impact_pct'] = float(rng.uniform(0, 15))
+        if rng.random() < 0.6:
+            plan['budget_delta_pct'] = float(rng.uniform(-2, 2))
+        plans.append(plan)
+    return plans
+
+def test_batch_validation_matches_validate_plan():
+    """Compiled masks agree with the per-plan validator, including failed rule IDs"""
+    engine = ConstitutionEngine()
+    plans = random_plans(2000)
+    batch = engine.validate_plans(plans)
+
+    assert batch['constitution_version'] == "0.2"
+    assert len(batch['valid']) == len(plans)
+    assert 0 < batch['valid'].sum() < len(plans)
+    for i, plan in enumerate(plans):
+        single = engine.validate_plan(plan)
+        assert bool(batch['valid'][i]) == single['valid'], plan
+        assert sorted(batch['failed_rules'][i]) == sorted(set(single['failed_rules'])), plan
+
+def test_options_are_validated_as_actions():
+    """Planner candidates carry their own domain and impact fields"""
+    engine = ConstitutionEngine()
+    options = [
+        {"action_type": "a", "domain": "energy", "budget_delta_pct": 0.5},
+        {"action_type": "b", "domain": "finance"},
+        {"action_type": "c", "domain": "housing", "population_impact_pct": 12},
+        {"action_type": "d", "domain": "housing", "budget_delta_pct": -1.5},
+        {"action_type": "e"}
+    ]
+    result = engine.validate_plans(options, as_actions=True)
+
+    assert result['valid'].tolist() == [True, False, False, False, True]
+    assert result['failed_rules'] == [
+        [], [rules.SCOPE_DOMAIN],
+        [rules.POPULATION_COUNCIL, rules.POPULATION_REFERENDUM],
+        [rules.BUDGET_DELTA], []
+    ]
+    assert engine.validate_plans([])['valid'].shape == (0,)
@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+import time
+import pytest
+
+# The top-level ledger package (psycopg2 writer), not packages/ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ledger.append_service import LedgerAppendService
+
+class FakeWriter:
+    """Records group commits and assigns sequential IDs like the real writer"""
+
+    def __init__(self, commit_latency=0.002, fail=False):
+        self.commit_latency = commit_latency
+        self.fail = fail
+        self.batches = []
+        self.chain = []
+
+    def write_decisions(self, decisions, chain=True, link_to_tail=False):
+        assert link_to_tail, "Append service must continue from the ledger tail"
+        time.sleep(self.commit_latency)  # simulated fsync
+        if self.fail:
+            raise RuntimeError("Failed to write decisions: disk full")
+        if any(decision.get('poison') for decision in decisions):
+            raise RuntimeError("Failed to write decisions: invalid input syntax for type json")
+        self.batches.append(len(decisions))
+        results = []
+        for decision in decisions:
+            decision_id = len(self.chain) + 1
+            self.chain.append((decision_id, decision['seq']))
+            results.append({'status': 'success', 'decision_id': decision_id})
+        return results
+
+def test_group_commit_batches_concurrent_appends():
+    """Concurrent appends share commits and keep strict FIFO order"""
+    writer = FakeWriter()
+    futures = []
+    lock = threading.Lock()
+
+    def producer():
+        for i in range(50):
+            with lock:
+                seq = len(futures)
+                futures.append(service.append({'seq': seq}))
+
+    with LedgerAppendService(writer, max_batch=64, max_delay_ms=5) as service:
+        threads = [threading.Thread(target=producer) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert len(results) == 200
+    assert len(writer.batches) < 200, "Appends should be group-committed"
+    assert max(writer.batches) <= 64
+    # Decision IDs follow enqueue order, so the hash chain order is deterministic
+    assert [seq for _, seq in writer.chain] == list(range(200))
+    assert [r['decision_id'] for r in results] == list(range(1, 201))
+    assert service.stats()['decisions'] == 200
+
+def test_commit_failure_is_reported_to_every_caller():
+    """A failed group commit fails every future in the batch"""
+    with LedgerAppendService(FakeWriter(fail=True), max_delay_ms=20) as service:
+        futures = [service.append({'seq': i}) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="disk full"):
+                future.result(timeout=5)
+
+    with pytest.raises(RuntimeError, match="not running"):
+        service.append({'seq': 4})
+
+def test_bad_decision_only_fails_its_own_caller():
+    """A decision that cannot be written is isolated from the good ones batched with it"""
+    writer = FakeWriter()
+    with LedgerAppendService(writer, max_delay_ms=50) as service:
+        futures = [service.append({'seq': i, 'poison': i == 5}) for i in range(8)]
+        for i, future in enumerate(futures):
+            if i == 5:
+                with pytest.raises(RuntimeError, match="invalid input syntax"):
+                    future.result(timeout=5)
+            else:
+                assert future.result(timeout=5)['status'] == 'success'
+
+    # The good decisions are still written in append order
+    assert [seq for _, seq in writer.chain] == [0, 1, 2, 3, 4, 6, 7]
+    assert service.stats()['decisions'] == 7
+
+def test_cancelled_waiter_does_not_stop_the_worker():
+    """A caller giving up on its future must not kill the group-commit thread"""
+    import asyncio
+
+    writer = FakeWriter(commit_latency=0.05)
+    with LedgerAppendService(writer, max_delay_ms=1) as service:
+        blocker = service.append({'seq': 0})  # Occupies the worker while the next append is cancelled
+
+        async def cancelled_append():
+            task = asyncio.ensure_future(service.append_async({'seq': 1}))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancelled_append())
+        assert blocker.result(timeout=5)['decision_id'] == 1
+        assert service.append({'seq': 2}).result(timeout=5)['status'] == 'success'
+
+    assert [seq for _, seq in writer.chain] == [0, 2]
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+# The top-level ledger package (psycopg2 writer), not packages/ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ledger.archive import ArchiveStore
+from ledger.query import fetch_decisions, stream_decisions
+from test_ledger_query import FakeConnection, make_rows
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def archived_row(decision_id, action_type='carbon_fee'):
+    return {
+        'decision_id': decision_id,
+        'ts': (START + timedelta(minutes=decision_id // 2)).isoformat(),
+        'chosen_action': {'action_type': action_type},
+        'curr_hash': bytes([decision_id]).hex()
+    }
+
+def make_store(tmp_path, rows):
+    """Store with one segment holding rows; the segment index is served from memory"""
+    store = ArchiveStore(str(tmp_path))
+    location, _, _ = store.write_segment('decisions_2024_01', rows)
+    store.segments = lambda conn, since=None, until=None, after=None, descending=False: [
+        {'partition_name': 'decisions_2024_01', 'format': 'jsonl', 'location': location}
+    ]
+    return store
+
+def test_segment_round_trip(tmp_path):
+    """Segments are written atomically, checksummed and read back in order"""
+    store = ArchiveStore(str(tmp_path))
+    rows = [archived_row(i) for i in range(1, 6)]
+    location, count, digest = store.write_segment('decisions_2024_01', rows)
+
+    assert count == 5
+    assert location.endswith('decisions_2024_01.jsonl.gz')
+    assert not os.path.exists(location + '.tmp')
+    with open(location, 'rb') as f:
+        assert hashlib.sha256(f.read()).digest() == digest
+    assert list(store.read_segment(location, 'jsonl')) == rows
+
+def test_archive_filters_and_keyset(tmp_path):
+    """Archived reads apply the same filters and keyset bounds as the hot query"""
+    rows = [archived_row(i, 'carbon_fee' if i % 2 else 'housing_credit') for i in range(1, 11)]
+    store = make_store(tmp_path, rows)
+    fields = ['decision_id', 'ts', 'chosen_action']
+
+    newest = list(store.iter_decisions(None, fields, action_type='carbon_fee', descending=True, limit=2))
+    assert [d['decision_id'] for d in newest] == [9, 7]
+
+    after = (datetime.fromisoformat(rows[6]['ts']), 7)
+    older = list(store.iter_decisions(None, fields, after=after, descending=True))
+    assert [d['decision_id'] for d in older] == [6, 5, 4, 3, 2, 1]
+    newer = list(store.iter_decisions(None, fields, after=after))
+    assert [d['decision_id'] for d in newer] == [8, 9, 10]
+
+def test_naive_bounds_are_read_as_utc(tmp_path):
+    """since/until without a timezone filter archived rows instead of raising TypeError"""
+    store = make_store(tmp_path, [archived_row(i) for i in range(1, 11)])
+
+    rows = list(store.iter_decisions(None, ['decision_id'], since=datetime(2024, 1, 1, 0, 2),
+                                     until=datetime(2024, 1, 1, 0, 4)))
+    assert [d['decision_id'] for d in rows] == [4, 5, 6, 7]
+
+def test_pages_continue_from_hot_into_archive(tmp_path):
+    """Keyset pages run through the hot table and then the archived months"""
+    hot_rows = [r for r in make_rows(25) if r['decision_id'] > 10]
+    conn = FakeConnection(hot_rows)
+    store = make_store(tmp_path, [archived_row(i) for i in range(1, 11)])
+
+    seen, cursor = [], None
+    while True:
+        page = fetch_decisions(conn, limit=7, cursor=cursor, fields=['chosen_action'], archive=store)
+        seen.extend(d['decision_id'] for d in page['decisions'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == list(range(25, 0, -1))
+
+    # Ascending exports read the archive before the hot table
+    exported = stream_decisions(None, fields=['curr_hash'], archive=store)
+    assert [d['decision_id'] for d in islice(exported, 10)] == list(range(1, 11))
+
+def test_pages_only_open_segments_past_the_cursor(tmp_path):
+    """Segments on the far side of the keyset cursor are skipped, like the SQL prunes them"""
+    store = ArchiveStore(str(tmp_path))
+    segments = []
+    for month, ids in ((1, range(1, 6)), (2, range(6, 11))):
+        start = datetime(2024, month, 1, tzinfo=timezone.utc)
+        rows = [{'decision_id': i, 'ts': (start + timedelta(days=i)).isoformat()} for i in ids]
+        location, _, _ = store.write_segment(f'decisions_2024_0{month}', rows)
+        segments.append({'partition_name': f'decisions_2024_0{month}', 'format': 'jsonl', 'location': location,
+                         'period_start': start, 'period_end': datetime(2024, month + 1, 1, tzinfo=timezone.utc)})
+
+    def indexed(conn, since=None, until=None, after=None, descending=False):
+        if after is None:
+            return segments
+        return [s for s in segments if (s['period_start'] <= after if descending else s['period_end'] > after)]
+
+    opened = []
+    read_segment = store.read_segment
+    store.segments = indexed
+    store.read_segment = lambda location, fmt: opened.append(location) or read_segment(location, fmt)
+    fields = ['decision_id']
+
+    feb = (datetime(2024, 2, 8, tzinfo=timezone.utc), 7)
+    assert [d['decision_id'] for d in store.iter_decisions(None, fields, after=feb)] == [8, 9, 10]
+    assert opened == [segments[1]['location']]
+
+    opened.clear()
+    jan = (datetime(2024, 1, 4, tzinfo=timezone.utc), 3)
+    assert [d['decision_id'] for d in store.iter_decisions(None, fields, after=jan, descending=True)] == [2, 1]
+    assert opened == [segments[0]['location']]
+
+    # A cursor in the hot tier, newer than every archived month, opens nothing
+    opened.clear()
+    assert list(store.iter_decisions(None, fields, after=(datetime(2024, 5, 1, tzinfo=timezone.utc), 99))) == []
+    assert opened == []
@@ -0,0 +1,155 @@
+import os
+import sys
+import pytest
+
+# The top-level ledger package (psycopg2 writer), not packages/ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ledger.writer as writer_module
+from ledger.writer import LedgerWriter, DECISION_COLUMNS
+from packages.ledger.canonical import decision_payload_hash
+
+class FakeCursor:
+    """In-memory stand-in for the queries LedgerWriter.write_decisions issues"""
+
+    def __init__(self, table):
+        self.table = table
+        self.queries = []
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        if 'nextval' in sql:
+            start = len(self.table) + 1
+            self._rows = [(i,) for i in range(start, start + params[0])]
+        elif 'WHERE payload_hash = ANY' in sql:
+            self._rows = [(r['decision_id'], r['payload_hash'], r['curr_hash'])
+                          for r in self.table if r['payload_hash'] in params[0]]
+        elif 'WHERE decision_id = ANY' in sql:
+            self._rows = [(r['decision_id'], r['curr_hash']) for r in self.table if r['decision_id'] in params[0]]
+        elif 'ORDER BY decision_id DESC' in sql:
+            self._rows = [(r['decision_id'], r['curr_hash']) for r in self.table[-1:]]
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+class FakeConnection:
+    def __init__(self, table):
+        self.cursor_obj = FakeCursor(table)
+        self.commits = 0
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        pass
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    table = []
+    conn = FakeConnection(table)
+
+    def fake_execute_values(cursor, sql, rows, page_size=None):
+        cursor.queries.append(sql)
+        for row in rows:
+            record = dict(zip(DECISION_COLUMNS, row))
+            # Like the check_hash_link trigger: prev_hash must be the stored parent's hash
+            parents = [r for r in table if r['decision_id'] == record['prev_decision_id']]
+            if record['prev_hash'] != (parents[0]['curr_hash'] if parents else None):
+                raise ValueError(f"prev_hash of decision {record['decision_id']} does not match")
+            table.append(record)
+
+    monkeypatch.setattr(writer_module, 'execute_values', fake_execute_values)
+    writer = LedgerWriter('postgresql://unused')
+    writer._pool = FakePool(conn)
+    return writer, table, conn
+
+def make_decision(unemployment):
+    return {
+        'inputs_bundle': {'kpi_data': {'unemployment': unemployment}},
+        'objectives': {'rights_protection': 1.0},
+        'options_considered': [],
+        'chosen_action': {'action_type': 'carbon_fee'},
+        'tests_passed': {'constitution_check': True}
+    }
+
+def test_batch_is_one_transaction_and_chained(fake_db):
+    """A batch is written with a fixed number of queries and forms a hash chain"""
+    writer, table, conn = fake_db
+
+    results = writer.write_decisions([make_decision(5.0 - i * 0.1) for i in range(50)])
+
+    assert [r['status'] for r in results] == ['success'] * 50
+    assert conn.commits == 1
+    # existing-hash lookup, id reservation and one INSERT, regardless of batch size
+    assert len(conn.cursor_obj.queries) == 3
+    assert table[0]['prev_hash'] is None
+    for prev, curr in zip(table, table[1:]):
+        assert curr['prev_decision_id'] == prev['decision_id']
+        assert curr['prev_hash'] == prev['curr_hash']
+    # curr_hash is the canonical hash chained to the parent; payload_hash is not chained
+    decision = make_decision(4.9)
+    assert table[1]['curr_hash'] == decision_payload_hash(*decision.values(), prev_hash=table[0]['curr_hash'])
+    assert table[1]['payload_hash'] == decision_payload_hash(*decision.values())
+
+def test_batch_idempotency(fake_db):
+    """Decisions already in the ledger or repeated in the batch are not re-inserted"""
+    writer, table, conn = fake_db
+
+    first = writer.write_decisions([make_decision(5.0), make_decision(4.8)])
+    results = writer.write_decisions([make_decision(5.0), make_decision(4.9), make_decision(4.9)],
+                                     link_to_tail=True)
+
+    assert [r['status'] for r in results] == ['idempotent', 'success', 'idempotent']
+    assert results[0]['decision_id'] == first[0]['decision_id']
+    assert results[1]['decision_id'] == results[2]['decision_id']
+    assert len(table) == 3
+    # The new decision continues from the ledger tail, not from the replayed decision before it
+    assert table[2]['prev_decision_id'] == first[1]['decision_id']
+    assert table[2]['prev_hash'] == table[1]['curr_hash']
+
+def test_same_batch_in_separate_transactions_is_written_once(fake_db):
+    """Replaying a batch finds the stored payload hashes although curr_hash is chained"""
+    writer, table, conn = fake_db
+    batch = [make_decision(5.0), make_decision(4.9)]
+
+    first = writer.write_decisions(batch)
+    second = writer.write_decisions(batch)
+
+    assert conn.commits == 2
+    assert [r['status'] for r in second] == ['idempotent', 'idempotent']
+    assert [r['decision_id'] for r in second] == [r['decision_id'] for r in first]
+    assert len(table) == 2
+
+def test_link_to_tail_continues_existing_chain(fake_db):
+    """Appends with link_to_tail lock the ledger and chain onto its last decision"""
+    writer, table, conn = fake_db
+
+    writer.write_decisions([make_decision(5.0), make_decision(4.9)])
+    writer.write_decisions([make_decision(4.8)], link_to_tail=True)
+
+    assert any('pg_advisory_xact_lock' in q for q in conn.cursor_obj.queries)
+    assert table[2]['prev_decision_id'] == table[1]['decision_id']
+    assert table[2]['prev_hash'] == table[1]['curr_hash']
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import pytest
+from packages.ledger.canonical import canonical_dumps, update_hash, decision_payload_hash
+
+@pytest.mark.parametrize('value,expected', [
+    (0, '00'),
+    (24, '1818'),
+    (1000000, '1a000f4240'),
+    (18446744073709551616, 'c249010000000000000000'),
+    (-1000, '3903e7'),
+    (1.5, 'f93e00'),
+    (100000.0, 'fa47c35000'),
+    (1.1, 'fb3ff199999999999a'),
+    (True, 'f5'),
+    (None, 'f6'),
+    ('ü', '62c3bc'),
+    ([1, [2, 3], [4, 5]], '8301820203820405'),
+    ({'a': 1, 'b': [2, 3]}, 'a26161016162820203'),
+])
+def test_rfc8949_vectors(value, expected):
+    """Encodings match the RFC 8949 Appendix A examples"""
+    assert canonical_dumps(value).hex() == expected
+
+def test_map_order_is_canonical():
+    """Key insertion order does not change the encoding"""
+    assert canonical_dumps({'b': 1, 'aa': 2, 'a': 3}) == canonical_dumps({'a': 3, 'aa': 2, 'b': 1})
+    # Shorter encoded keys sort first
+    assert canonical_dumps({'aa': 1, 'b': 2}).hex() == 'a261620262616101'
+
+def test_non_finite_floats_are_rejected():
+    """NaN and infinity have no JSONB representation and are refused"""
+    with pytest.raises(ValueError):
+        canonical_dumps({'x': float('nan')})
+
+def test_streamed_hash_matches_full_encoding():
+    """Incremental hashing of a payload larger than the flush size matches one-shot hashing"""
+    payload = {'rows': [{'region': f"r{i}", 'unemployment': 5.0 + i * 0.01} for i in range(20000)]}
+    hasher = hashlib.sha256()
+    update_hash(hasher, payload)
+    assert hasher.digest() == hashlib.sha256(canonical_dumps(payload)).digest()
+
+def test_decision_hash_depends_on_prev_hash():
+    """The same decision content chains to a different digest under a different parent"""
+    decision = ({'kpi_data': {'unemployment': 4.8}}, {'prosperity': 0.85}, [],
+                {'action_type': 'housing_credits'}, {'constitution_check': True})
+    first = decision_payload_hash(*decision)
+    assert first == decision_payload_hash(*decision)
+    assert first != decision_payload_hash(*decision, prev_hash=first)
+
+def test_repeated_floats_keep_their_own_encoding():
+    """Reused float encodings do not conflate zero signs or differing precisions"""
+    assert canonical_dumps([1.1, 1.5, 1.1, 0.0, -0.0, 1.5]).hex() == (
+        '86fb3ff199999999999af93e00fb3ff199999999999af90000f98000f93e00'
+    )
+
+def test_decision_hash_matches_its_jsonb_round_trip():
+    """Non-string keys and tuples hash as they read back from the stored JSONB"""
+    inputs = {'kpi_data': {1: 4.8, 2.5: (1, 2), True: None, None: 'x'}}
+    stored = json.loads(json.dumps(inputs))
+    assert decision_payload_hash(inputs, {}, [], {}, {}) == decision_payload_hash(stored, {}, [], {}, {})
+
+@pytest.mark.parametrize('inputs', [
+    {'kpi_data': {1: 'a', '1': 'b'}},
+    {'kpi_data': {(1, 2): 3}},
+    {'blob': b'raw'},
+])
+def test_decision_hash_rejects_payloads_jsonb_cannot_store(inputs):
+    """Keys that collide as JSON strings, tuple keys and bytes are refused before writing"""
+    with pytest.raises((TypeError, ValueError)):
+        decision_payload_hash(inputs, {}, [], {}, {})
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+# The top-level ledger package (psycopg2 writer), not packages/ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ledger.archive import ArchiveStore
+from ledger.merkle import (MerkleTreeBuilder, leaf_hash, node_hash, merkle_root,
+                           inclusion_proof, verify_inclusion, proof_nodes, tree_nodes,
+                           get_inclusion_proof)
+
+def make_hashes(count):
+    return [hashlib.sha256(str(i).encode('utf-8')).digest() for i in range(count)]
+
+def test_streaming_root_matches_rfc6962_tree():
+    """The incremental builder produces the RFC 6962 root with unbalanced right subtrees"""
+    a, b, c = make_hashes(3)
+    expected = node_hash(node_hash(leaf_hash(a), leaf_hash(b)), leaf_hash(c))
+    assert merkle_root([a, b, c]) == expected
+
+    builder = MerkleTreeBuilder()
+    for h in make_hashes(1000):
+        builder.append(h)
+    assert builder.size == 1000
+    assert builder.root() == merkle_root(make_hashes(1000))
+
+def test_every_leaf_has_a_logarithmic_proof():
+    """Proofs verify for every leaf of trees of assorted sizes and have at most ceil(log2 n) hashes"""
+    for size in (1, 2, 3, 5, 8, 13, 33):
+        hashes = make_hashes(size)
+        root = merkle_root(hashes)
+        for index in range(size):
+            proof = inclusion_proof(hashes, index)
+            assert len(proof) <= (size - 1).bit_length()
+            assert verify_inclusion(hashes[index], index, size, proof, root)
+
+def test_tampered_proofs_are_rejected():
+    """A different leaf, position, tree size or sibling hash fails verification"""
+    hashes = make_hashes(11)
+    root = merkle_root(hashes)
+    proof = inclusion_proof(hashes, 6)
+
+    assert not verify_inclusion(hashes[5], 6, 11, proof, root)
+    assert not verify_inclusion(hashes[6], 5, 11, proof, root)
+    assert not verify_inclusion(hashes[6], 6, 7, proof, root)
+    assert not verify_inclusion(hashes[6], 6, 11, [b'\x00' * 32] + proof[1:], root)
+    # Changing any committed decision changes the root
+    assert merkle_root(hashes[:6] + [b'\x01' * 32] + hashes[7:]) != root
+
+def test_stored_tree_nodes_give_the_same_proofs():
+    """Sibling positions read from the stored levels reproduce the recursive proof and root"""
+    for size in (1, 2, 3, 5, 6, 8, 13, 33):
+        hashes = make_hashes(size)
+        nodes = {(level, index): node for level, index, node, _ in tree_nodes(enumerate(hashes))}
+        top = (size - 1).bit_length()
+        assert nodes[(top, 0)] == merkle_root(hashes)
+        for index in range(size):
+            assert nodes[(0, index)] == leaf_hash(hashes[index])
+            proof = [nodes[position] for position in proof_nodes(index, size)]
+            assert proof == inclusion_proof(hashes, index)
+
+class FakeCursor:
+    """Answers the queries get_inclusion_proof issues from in-memory tables"""
+
+    def __init__(self, batch, nodes, decisions, segments=()):
+        self.batch, self.nodes, self.decisions = batch, nodes, decisions
+        self.segments = list(segments)
+        self.node_rows_read = 0
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params):
+        if 'JOIN ledger_batches' in sql:
+            self._rows = [self.batch + (index, node) for (level, index), (node, decision_id) in self.nodes.items()
+                          if level == 0 and decision_id == params[0]]
+        elif 'FROM ledger_archive_segments' in sql:
+            self._rows = self.segments
+        elif 'FROM decisions' in sql:
+            self._rows = [(self.decisions[params[0]],)] if params[0] in self.decisions else []
+        else:
+            self._rows = [(level, index, self.nodes[(level, index)][0])
+                          for level, index in params[1] if (level, index) in self.nodes]
+        self.node_rows_read += len(self._rows)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self.cursor_obj = cursor
+
+    def cursor(self):
+        return self.cursor_obj
+
+def test_inclusion_proof_reads_only_the_audit_path():
+    """A proof is served from the stored leaf and its siblings, and tampering is reported"""
+    size = 1000
+    hashes = make_hashes(size)
+    decisions = {100 + i: h for i, h in enumerate(hashes)}
+    nodes = {(level, index): (node, decision_id)
+             for level, index, node, decision_id in tree_nodes(decisions.items())}
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    cursor = FakeCursor((7, day, day, size, merkle_root(hashes)), nodes, decisions)
+
+    proof = get_inclusion_proof(FakeConnection(cursor), 642)
+    assert proof['leaf_index'] == 542 and proof['batch_id'] == 7
+    assert proof['proof'] == [h.hex() for h in inclusion_proof(hashes, 542)]
+    # The leaf, its decision and at most ceil(log2 n) siblings
+    assert cursor.node_rows_read <= 2 + (size - 1).bit_length()
+    assert get_inclusion_proof(FakeConnection(cursor), 99) is None
+
+    decisions[642] = b'\x01' * 32
+    with pytest.raises(ValueError):
+        get_inclusion_proof(FakeConnection(cursor), 642)
+    level, index = proof_nodes(542, size)[3]
+    nodes[(level, index)] = (b'\x02' * 32, None)
+    with pytest.raises(ValueError):
+        get_inclusion_proof(FakeConnection(cursor), 643)
+
+def test_archived_decisions_are_proven_from_their_segment(tmp_path):
+    """A decision whose month was archived still gets a proof, with its hash read from the segment"""
+    hashes = make_hashes(5)
+    decisions = {10 + i: h for i, h in enumerate(hashes)}
+    nodes = {(level, index): (node, decision_id)
+             for level, index, node, decision_id in tree_nodes(decisions.items())}
+    day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    store = ArchiveStore(str(tmp_path))
+    location, _, _ = store.write_segment('decisions_2025_01', [
+        {'decision_id': decision_id, 'ts': day.replace(hour=decision_id).isoformat(), 'curr_hash': h.hex()}
+        for decision_id, h in decisions.items()
+    ])
+    segment = ('decisions_2025_01', day, datetime(2025, 2, 1, tzinfo=timezone.utc), 'jsonl', location)
+    # The month's rows are gone from decisions; only the batch tree and the segment remain
+    cursor = FakeCursor((3, day, day.replace(day=2), 5, merkle_root(hashes)), nodes, {}, [segment])
+
+    assert get_inclusion_proof(FakeConnection(cursor), 13) is None
+    proof = get_inclusion_proof(FakeConnection(cursor), 13, archive=store)
+    assert proof['curr_hash'] == hashes[3].hex() and proof['leaf_index'] == 3
+    assert verify_inclusion(hashes[3], 3, 5, [bytes.fromhex(h) for h in proof['proof']], merkle_root(hashes))
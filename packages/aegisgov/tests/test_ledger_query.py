@@ -0,0 +1,91 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+import pytest
+
+# The top-level ledger package (psycopg2 writer), not packages/ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ledger.query import (build_decisions_query, decode_cursor, encode_cursor,
+                          fetch_decisions, resolve_fields)
+
+class FakeCursor:
+    """Applies the keyset condition of a page query to an in-memory table"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+        rows = sorted(self.rows, key=lambda r: (r['ts'], r['decision_id']), reverse=True)
+        if 'decision_id <' in sql:
+            after = (params[-3], params[-2])
+            rows = [r for r in rows if (r['ts'], r['decision_id']) < after]
+        fields = sql[len('SELECT '):sql.index(' FROM')].split(', ')
+        self._result = [tuple(r[f] for f in fields) for r in rows[:params[-1]]]
+
+    def fetchall(self):
+        return self._result
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+
+    def cursor(self):
+        return self.cursor_obj
+
+def make_rows(count):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # Pairs of decisions share a timestamp, so ties are broken by decision_id
+    return [{
+        'decision_id': i,
+        'ts': start + timedelta(minutes=i // 2),
+        'chosen_action': {'action_type': 'carbon_fee'},
+        'curr_hash': bytes([i])
+    } for i in range(1, count + 1)]
+
+def test_keyset_pages_cover_every_row_once():
+    """Following next_cursor visits all decisions newest first without gaps or repeats"""
+    conn = FakeConnection(make_rows(25))
+    seen, cursor = [], None
+    while True:
+        page = fetch_decisions(conn, limit=10, cursor=cursor, fields=['chosen_action'])
+        seen.extend(d['decision_id'] for d in page['decisions'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == list(range(25, 0, -1))
+    # No OFFSET: every page is a bounded index range scan
+    assert all('OFFSET' not in sql for sql, _ in conn.cursor_obj.executed)
+    assert len(conn.cursor_obj.executed) == 3
+
+def test_query_uses_indexed_predicates():
+    """The ts bound leads the keyset condition and appeal status uses JSONB containment"""
+    after = (datetime(2024, 1, 1, tzinfo=timezone.utc), 7)
+    sql, params = build_decisions_query(['decision_id', 'ts'], action_type='carbon_fee',
+                                        appeal_status='open', after=after, limit=11)
+
+    assert "appeals @> %s::jsonb" in sql
+    assert "ts <= %s AND (ts < %s OR decision_id < %s)" in sql
+    assert sql.endswith("ORDER BY ts DESC, decision_id DESC LIMIT %s")
+    assert params == ['carbon_fee', '{"status": "open"}', after[0], after[0], 7, 11]
+
+def test_projection_and_cursor_validation():
+    """Projections keep the key fields; unknown fields and bad cursors are rejected"""
+    assert resolve_fields(['curr_hash']) == ['decision_id', 'ts', 'curr_hash']
+    with pytest.raises(ValueError):
+        resolve_fields(['password'])
+
+    ts = datetime(2024, 3, 1, 12, 30, 0, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import sys
+
+# The top-level ledger package (psycopg2 writer), not packages/ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ledger.verifier import verify_rows, sign_checkpoint, split_segments, _recompute
+from packages.ledger.canonical import decision_payload_hash
+
+def make_chain(length):
+    """Build rows in VERIFY_ROWS_SQL column order for an intact chain"""
+    rows = []
+    prev_hash = None
+    for decision_id in range(1, length + 1):
+        curr_hash = hashlib.sha256(f"{decision_id}|{prev_hash}".encode('utf-8')).digest()
+        rows.append([decision_id, decision_id - 1 if prev_hash else None, prev_hash,
+                     curr_hash, curr_hash, prev_hash is not None, prev_hash])
+        prev_hash = curr_hash
+    return rows
+
+def test_intact_chain_writes_checkpoints():
+    """An intact chain verifies and checkpoints every N rows with cumulative counts"""
+    checkpoints = []
+
+    report = verify_rows(make_chain(25), verified_count=100, checkpoint_every=10,
+                         on_checkpoint=lambda *args: checkpoints.append(args))
+
+    assert report['valid']
+    assert report['verified'] == 25
+    assert report['last_decision_id'] == 25
+    assert [(c[0], c[2]) for c in checkpoints] == [(10, 110), (20, 120)]
+
+def test_tampered_content_and_broken_link_are_reported():
+    """Rewritten content and a prev_hash that no longer matches its parent are both flagged"""
+    rows = make_chain(10)
+    rows[3][4] = b'\x00' * 32          # content no longer hashes to curr_hash
+    rows[6][6] = b'\x01' * 32          # parent was rewritten after this row linked to it
+    rows[8][5], rows[8][6] = False, None  # parent deleted
+
+    checkpoints = []
+    report = verify_rows(rows, checkpoint_every=2, on_checkpoint=lambda *args: checkpoints.append(args))
+
+    assert not report['valid']
+    assert [e['decision_id'] for e in report['errors']] == [4, 7, 9]
+    assert 'content' in report['errors'][0]['reason']
+    assert 'missing' in report['errors'][2]['reason']
+    # No checkpoint is written past the first failure
+    assert [c[0] for c in checkpoints] == [2]
+
+def test_checkpoint_signature_binds_all_fields():
+    """Changing any checkpoint field or the key changes the signature"""
+    curr_hash = hashlib.sha256(b'decision').digest()
+    signature = sign_checkpoint(b'key', 10, curr_hash, 10)
+
+    assert signature == sign_checkpoint(b'key', 10, curr_hash, 10)
+    assert signature != sign_checkpoint(b'key', 11, curr_hash, 10)
+    assert signature != sign_checkpoint(b'key', 10, curr_hash, 9)
+    assert signature != sign_checkpoint(b'other', 10, curr_hash, 10)
+
+def test_split_segments_covers_range():
+    """Segments are contiguous, non-overlapping and end at the upper bound"""
+    assert split_segments(100, 125, 10) == [(100, 110), (110, 120), (120, 125)]
+    assert split_segments(5, 5, 10) == []
+
+def test_canonical_rows_are_recomputed_from_their_payload():
+    """hash_version 2 rows are rehashed over canonical CBOR; version 1 rows keep the SQL digest"""
+    payload = [{'kpi_data': {'unemployment': 5.0}}, {'prosperity': 1.0}, [],
+               {'action_type': 'carbon_fee'}, {'constitution_check': True}]
+    prev_hash = hashlib.sha256(b'parent').digest()
+    curr_hash = decision_payload_hash(*payload, prev_hash=prev_hash)
+    row = (2, 1, prev_hash, curr_hash, None, True, prev_hash, 2, *payload)
+
+    assert verify_rows([_recompute(row)])['valid']
+
+    tampered = (2, 1, prev_hash, curr_hash, None, True, prev_hash, 2,
+                {'kpi_data': {'unemployment': 4.0}}, *payload[1:])
+    assert not verify_rows([_recompute(tampered)])['valid']
+
+    legacy = (3, None, None, curr_hash, curr_hash, False, None, 1, *payload)
+    assert _recompute(legacy) == legacy[:7]
@@ -0,0 +1,134 @@
+import pytest
+from packages.mechanism import CarbonFeeDividend, CongestionPricing, HousingCredits, MonteCarloSimulator
+
+def flatten(impact):
+    return {f"{group}.{name}": value for group, metrics in impact.items() if group != 'parameters_used'
+            for name, value in metrics.items()}
+
+@pytest.mark.parametrize("mechanism,scalar_args,batch_params", [
+    (CarbonFeeDividend(), [(10.0,), (40.0,)], {'target_reduction_pct': [10.0, 40.0]}),
+    (HousingCredits(), [(900.0, 6000.0), (1500.0, 6000.0), (2400.0, 6000.0)],
+     {'market_rent': [900.0, 1500.0, 2400.0], 'construction_costs': 6000.0}),
+    (CongestionPricing(), [(20000, 1.2), (20000, 1.8), (20000, 2.5)],
+     {'current_traffic_volume': 20000, 'peak_hour_demand': [1.2, 1.8, 2.5]}),
+])
+def test_batch_model_matches_scalar_model(mechanism, scalar_args, batch_params):
+    """At default parameters each draw reproduces calculate_impact"""
+    batch = mechanism.simulate_batch(batch_params)
+    for i, args in enumerate(scalar_args):
+        for name, value in flatten(mechanism.calculate_impact(*args)).items():
+            assert batch[name][i] == pytest.approx(value), name
+
+def test_monte_carlo_distributions_are_reproducible():
+    """Draws are seeded and each metric gets a mean and ordered quantiles"""
+    simulator = MonteCarloSimulator(CarbonFeeDividend())
+    specs = {
+        'target_reduction_pct': {'dist': 'uniform', 'low': 10, 'high': 40},
+        'fee_rate': {'dist': 'normal', 'mean': 25, 'sd': 5, 'min': 0},
+        'population': 1000000
+    }
+    result = simulator.run(specs, n_draws=20000, seed=42)
+    again = simulator.run(specs, n_draws=20000, seed=42)
+
+    assert result == again
+    revenue = result['metrics']['economic.revenue']
+    q = revenue['quantiles']
+    assert q['p05'] < q['p25'] < q['p50'] < q['p75'] < q['p95']
+    # Mean revenue: 1e7 tons * (1 - E[target]/100) * E[fee]
+    assert revenue['mean'] == pytest.approx(1e7 * 0.75 * 25, rel=0.02)
+    assert result['metrics']['social.dividend_per_capita']['std'] == 0.0
+
+    with pytest.raises(ValueError):
+        simulator.run({'fee_rate': 30}, n_draws=10)
+
+def test_sweep_returns_columns_for_the_whole_grid():
+    """A grid sweep matches setting each value and calling calculate_impact"""
+    fees = [2.0, 5.0, 8.0]
+    demands = [1.2, 2.5]
+    results = CongestionPricing().sweep({'base_fee': fees, 'peak_hour_demand': demands},
+                                        fixed={'current_traffic_volume': 20000})
+
+    assert list(results['base_fee']) == [2.0, 2.0, 5.0, 5.0, 8.0, 8.0]
+    assert list(results['peak_hour_demand']) == [1.2, 2.5] * 3
+    scalar = CongestionPricing()
+    for i, (fee, demand) in enumerate(zip(results['base_fee'], results['peak_hour_demand'])):
+        scalar.update_base_fee(fee)
+        expected = flatten(scalar.calculate_impact(20000, demand))
+        assert results['economic.revenue'][i] == pytest.approx(expected['economic.revenue'])
+        assert results['traffic.congestion_index'][i] == pytest.approx(expected['traffic.congestion_index'])
+
+    # The setters' limits apply to sweeps as well
+    with pytest.raises(ValueError):
+        CongestionPricing().sweep({'time_window_hours': [4, 12]},
+                                  fixed={'current_traffic_volume': 1, 'peak_hour_demand': 1})
+
+def test_scenario_runner_yields_optimizer_options():
+    """Scenarios are seeded per task, so a process pool reproduces the serial run"""
+    import os
+    from packages.agents import AgentOrchestrator
+    from packages.mechanism.scenarios import ScenarioRunner, load_region
+    from packages.planner import MultiObjectiveOptimizer
+
+    config = os.path.join(os.path.dirname(__file__), '..', 'config', 'region.denver_boulder.yaml')
+    region = load_region(config)
+    mixes = [
+        {'name': 'carbon_only', 'mechanisms': {'carbon_fee_dividend': {'fee_rate': 40}}},
+        {'name': 'housing_and_congestion', 'mechanisms': {
+            'housing_credits': {'credit_amount': {'dist': 'uniform', 'low': 300, 'high': 700}},
+            'congestion_pricing': {}
+        }}
+    ]
+
+    serial = ScenarioRunner([region], mixes, n_draws=500, seed=3, workers=1).run()
+    pooled = ScenarioRunner([region], mixes, n_draws=500, seed=3, workers=2).run()
+    assert serial == pooled
+    assert [o['action_type'] for o in serial] == ['carbon_only', 'housing_and_congestion']
+
+    carbon, housing = serial
+    assert carbon['carbon_intensity'] < region['seed_kpis']['carbon_intensity']
+    assert carbon['rent_burden'] == pytest.approx(region['seed_kpis']['rent_burden'])
+    assert housing['rent_burden'] != pytest.approx(region['seed_kpis']['rent_burden'])
+    bands = housing['kpi_bands']['rent_burden']
+    assert bands['p05'] <= bands['p50'] <= bands['p95']
+
+    scores = MultiObjectiveOptimizer().score_options(serial, [1.0] * 6)
+    assert len(scores) == 2
+
+    # Policy mixes carry no domain, so the constitution does not reject them as options
+    with AgentOrchestrator() as orchestrator:
+        cycle = orchestrator.execute_planning_cycle({'weights': [0.2, 0.2, 0.2, 0.15, 0.15, 0.1],
+                                                     'options': serial})
+    assert cycle['status'] == 'success'
+
+def test_scenario_runner_parquet_keeps_every_mix_columns(tmp_path):
+    """Mixes with different mechanisms all land in the file; a failed run leaves no file behind"""
+    import os
+    pq = pytest.importorskip('pyarrow.parquet')
+    from packages.mechanism.scenarios import ScenarioRunner, load_region
+
+    config = os.path.join(os.path.dirname(__file__), '..', 'config', 'region.denver_boulder.yaml')
+    region = load_region(config)
+    mixes = [
+        {'name': 'carbon_only', 'mechanisms': {'carbon_fee_dividend': {'fee_rate': 40}}},
+        {'name': 'housing_and_congestion', 'mechanisms': {'housing_credits': {}, 'congestion_pricing': {}}}
+    ]
+    path = str(tmp_path / 'scenarios.parquet')
+    ScenarioRunner([region], mixes, n_draws=50, seed=3, workers=1).run(output_path=path)
+
+    table = pq.read_table(path).to_pydict()
+    assert table['policy_mix'] == ['carbon_only'] * 50 + ['housing_and_congestion'] * 50
+    for prefix, present in (('carbon_fee_dividend.', slice(0, 50)), ('housing_credits.', slice(50, 100)),
+                            ('congestion_pricing.', slice(50, 100))):
+        names = [name for name in table if name.startswith(prefix)]
+        assert names, prefix
+        assert all(value is not None for name in names for value in table[name][present])
+    assert not os.path.exists(path + '.tmp')
+
+    # The second region's scenarios fail their bounds check after the first region's were written
+    parameters = region['mechanism_parameters']
+    broken = dict(region, region='broken', mechanism_parameters=dict(
+        parameters, congestion_pricing=dict(parameters['congestion_pricing'], base_fee=-1)))
+    failed_path = str(tmp_path / 'failed.parquet')
+    with pytest.raises(ValueError, match='base_fee'):
+        ScenarioRunner([region, broken], mixes, n_draws=50, seed=3, workers=1).run(output_path=failed_path)
+    assert not os.path.exists(failed_path) and not os.path.exists(failed_path + '.tmp')
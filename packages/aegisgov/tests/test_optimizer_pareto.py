@@ -16,8 +16,14 @@
 
 
 
+import numpy as np
 import pytest
+from packages.planner.cache import PlanningCache
+from packages.planner.kpi_meta import KPI_META
 from packages.planner.optimizer import MultiObjectiveOptimizer
+from packages.planner.pareto import non_dominated_sort, pareto_front
+from packages.planner.portfolio import select_portfolio
+from packages.planner.sweep import sample_simplex, simplex_lattice, sweep_winners
 
 @pytest.fixture
 def sample_problem():
@@ -78,3 +84,192 @@ def test_weighted_sum_optimization(sample_problem):
 
 
 
+
+def reference_score(kpi_meta, kpi_values, weights):
+    """Per-KPI loop the vectorized scorer must reproduce"""
+    total_weight = sum(weights)
+    if total_weight == 0:
+        return 0.5
+    score = 0.0
+    for i, (kpi_name, meta) in enumerate(kpi_meta.items()):
+        if kpi_name in kpi_values and weights[i] > 0:
+            scaled = (kpi_values[kpi_name] - meta['min']) / (meta['max'] - meta['min'])
+            score += weights[i] * (scaled if meta['sense'] == 'max' else 1.0 - scaled)
+    return min(max(score / total_weight, 0.0), 1.0)
+
+def test_vectorized_scores_match_per_option_loop():
+    """One matrix multiply scores every option under every weight profile"""
+    rng = np.random.default_rng(7)
+    optimizer = MultiObjectiveOptimizer(KPI_META)
+    options = [
+        {kpi: rng.uniform(meta['min'], meta['max']) for kpi, meta in KPI_META.items() if rng.random() > 0.2}
+        for _ in range(200)
+    ]
+    profiles = rng.dirichlet(np.ones(len(KPI_META)), size=50)
+
+    scores = optimizer.score_matrix(optimizer.normalize_options(options), profiles)
+
+    assert scores.shape == (200, 50)
+    for j in range(0, 50, 7):
+        for i in range(0, 200, 11):
+            assert scores[i, j] == pytest.approx(reference_score(KPI_META, options[i], list(profiles[j])))
+
+    best = optimizer.best_option_indices(optimizer.normalize_options(options), profiles)
+    assert list(best) == list(np.argmax(scores, axis=0))
+    assert optimizer.optimize_with_weights(options, list(profiles[3])) is options[best[3]]
+
+def brute_force_front(objectives):
+    ge = np.all(objectives[None, :, :] >= objectives[:, None, :], axis=2)
+    gt = np.any(objectives[None, :, :] > objectives[:, None, :], axis=2)
+    return list(np.flatnonzero(~(ge & gt).any(axis=1)))
+
+@pytest.mark.parametrize("n_objectives", [2, 3, 4, 6])
+def test_pareto_front_matches_brute_force(n_objectives):
+    """Skyline sweeps (2-3 objectives) and blocked filtering (more) find the exact front"""
+    rng = np.random.default_rng(n_objectives)
+    # Coarse integer grid so ties and duplicate plans are common
+    objectives = rng.integers(0, 5, size=(300, n_objectives)).astype(float)
+    assert list(pareto_front(objectives, block_size=32)) == brute_force_front(objectives)
+
+    ranks = non_dominated_sort(objectives)
+    assert list(np.flatnonzero(ranks == 0)) == brute_force_front(objectives)
+    rest = np.flatnonzero(ranks > 0)
+    assert list(rest[brute_force_front(objectives[rest])]) == list(np.flatnonzero(ranks == 1))
+
+def test_epsilon_front_covers_exact_front():
+    """Every exact frontier option is within epsilon of an option in the approximation"""
+    rng = np.random.default_rng(3)
+    objectives = rng.random((20000, 3))
+    exact = objectives[pareto_front(objectives)]
+    approx = objectives[pareto_front(objectives, epsilon=0.1)]
+
+    assert len(approx) < len(exact)
+    for point in exact:
+        assert np.any(np.all(approx + 0.1 >= point, axis=1))
+
+def test_weight_sweep_is_deterministic_and_parallel_safe():
+    """Winning regions are reproducible and do not depend on the worker count"""
+    meta = {'a': {'sense': 'max', 'min': 0, 'max': 1}, 'b': {'sense': 'max', 'min': 0, 'max': 1}}
+    optimizer = MultiObjectiveOptimizer(meta)
+    options = [{'a': 1.0, 'b': 0.0}, {'a': 0.0, 'b': 1.0}, {'a': 0.4, 'b': 0.4}]
+
+    weights = sample_simplex(2, 1000)
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert np.array_equal(weights, sample_simplex(2, 1000))
+
+    serial = sweep_winners(optimizer, optimizer.normalize_options(options), weights, workers=1, chunk_size=100)
+    parallel = sweep_winners(optimizer, optimizer.normalize_options(options), weights, workers=2, chunk_size=100)
+    assert np.array_equal(serial, parallel)
+
+    regions = optimizer.weight_regions(options, n_points=1000)['regions']
+    assert sum(r['wins'] for r in regions) == 1000
+    # 'a' wins wherever its weight exceeds b's; the balanced option never wins
+    assert regions[0]['weight_min'][0] > 0.5 and regions[1]['weight_max'][0] < 0.5
+    assert regions[0]['share'] == pytest.approx(0.5, abs=0.01)
+    assert regions[2]['wins'] == 0 and regions[2]['centroid'] is None
+
+def test_simplex_lattice_covers_grid():
+    lattice = simplex_lattice(3, 4)
+    assert lattice.shape == (15, 3)
+    assert np.allclose(lattice.sum(axis=1), 1.0)
+    assert len({tuple(row) for row in lattice}) == 15
+
+def test_portfolio_branch_and_bound_is_exact():
+    """The fallback solver finds the best feasible portfolio, matching exhaustive search"""
+    rng = np.random.default_rng(11)
+    constraints = {'max_budget_delta_pct': 1.0, 'max_population_impact_pct': 5.0, 'max_actions': 4,
+                   'domains': ['energy', 'housing'], 'exclusive_key': 'action_type'}
+    for _ in range(20):
+        options = [{
+            'action_type': f"action_{rng.integers(0, 6)}",
+            'domain': ['energy', 'housing', 'finance'][rng.integers(0, 3)],
+            'budget_delta_pct': float(rng.uniform(-0.8, 0.8)),
+            'population_impact_pct': float(rng.uniform(0, 3))
+        } for _ in range(10)]
+        scores = rng.random(10)
+
+        result = select_portfolio(options, scores, constraints, solver='branch_and_bound')
+
+        best = 0.0
+        for mask in range(1 << 10):
+            chosen = [i for i in range(10) if mask >> i & 1]
+            types = [options[i]['action_type'] for i in chosen]
+            if (len(chosen) <= 4 and len(set(types)) == len(types)
+                    and all(options[i]['domain'] != 'finance' for i in chosen)
+                    and abs(sum(options[i]['budget_delta_pct'] for i in chosen)) <= 1.0
+                    and sum(options[i]['population_impact_pct'] for i in chosen) <= 5.0):
+                best = max(best, float(scores[chosen].sum()))
+        assert result['status'] == 'optimal'
+        assert result['objective'] == pytest.approx(best)
+        assert abs(result['totals']['budget_delta_pct']) <= 1.0 + 1e-9
+
+def test_portfolio_branch_and_bound_scales_past_max_actions(monkeypatch):
+    """Many options under a max_actions limit are solved without deep recursion or a node blow-up"""
+    import packages.planner.portfolio as portfolio
+
+    rng = np.random.default_rng(5)
+    options = [{'action_type': f"action_{i}", 'domain': 'energy'} for i in range(1500)]
+    scores = rng.random(1500)
+
+    result = select_portfolio(options, scores, {'max_actions': 50, 'exclusive_key': 'action_type'},
+                              solver='branch_and_bound')
+    assert result['status'] == 'optimal'
+    assert result['objective'] == pytest.approx(np.sort(scores)[-50:].sum())
+
+    # A search that runs out of nodes reports it instead of raising
+    monkeypatch.setattr(portfolio, 'MAX_NODES', 10)
+    options = [{'action_type': f"action_{i}", 'domain': 'energy',
+                'budget_delta_pct': float(rng.uniform(-0.3, 0.3)),
+                'population_impact_pct': float(rng.uniform(0, 1))} for i in range(60)]
+    result = select_portfolio(options, rng.random(60), {'max_budget_delta_pct': 1.0,
+                                                        'max_population_impact_pct': 5.0, 'max_actions': 50},
+                              solver='branch_and_bound')
+    assert result['status'] == 'node_limit'
+
+def test_planning_cache_hits_and_invalidates():
+    """Repeated what-if calls are lookups; new options or KPI meta miss the cache"""
+    cache = PlanningCache()
+    optimizer = MultiObjectiveOptimizer(KPI_META)
+    options = [{'real_wage': 30, 'unemployment': 5}, {'real_wage': 40, 'unemployment': 8}]
+    weights = [0.5, 0.5, 0, 0, 0, 0]
+
+    first = cache.scores(optimizer, options, weights)
+    again = cache.scores(optimizer, [dict(reversed(list(o.items()))) for o in options], weights)
+    assert again is first
+    assert list(cache.pareto(optimizer, options)) == [0, 1]
+    assert not first.flags.writeable
+
+    changed = cache.scores(optimizer, options + [{'real_wage': 60, 'unemployment': 0}], weights)
+    assert len(changed) == 3
+
+    meta = {k: dict(v) for k, v in KPI_META.items()}
+    meta['real_wage']['max'] = 120
+    rescored = cache.scores(MultiObjectiveOptimizer(meta), options, weights)
+    assert rescored is not first and rescored[0] != pytest.approx(first[0])
+
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
+
+def test_weight_sweep_uses_every_core_only_for_large_sweeps(monkeypatch):
+    """By default small sweeps stay in-process and large ones fan out to all cores"""
+    import packages.planner.sweep as sweep
+
+    pools = []
+
+    class RecordingPool(sweep.ProcessPoolExecutor):
+        def __init__(self, max_workers=None, **kwargs):
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers, **kwargs)
+
+    monkeypatch.setattr(sweep, 'ProcessPoolExecutor', RecordingPool)
+    monkeypatch.setattr(sweep.os, 'cpu_count', lambda: 2)
+    meta = {'a': {'sense': 'max', 'min': 0, 'max': 1}, 'b': {'sense': 'max', 'min': 0, 'max': 1}}
+    optimizer = MultiObjectiveOptimizer(meta)
+    normalized = optimizer.normalize_options([{'a': 1.0, 'b': 0.0}, {'a': 0.0, 'b': 1.0}])
+    weights = sample_simplex(2, 1000)
+
+    small = sweep_winners(optimizer, normalized, weights, chunk_size=100)
+    assert pools == []
+    monkeypatch.setattr(sweep, 'PARALLEL_MIN_WORK', 1000)
+    assert np.array_equal(sweep_winners(optimizer, normalized, weights, chunk_size=100), small)
+    assert pools == [2]
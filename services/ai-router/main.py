@@ -95,8 +95,8 @@ async def create_task(request: TaskRequest, background_tasks: BackgroundTasks):
         **request.data
     }
     
-    # Publish task to agent
-    redis_client.publish(channel, json.dumps(task_payload))
+    # Enqueue task on the agent's stream (agents ack once the result is stored)
+    redis_client.xadd(channel, {"task": json.dumps(task_payload)})
     
     return TaskResponse(
         task_id=task_id,